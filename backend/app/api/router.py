@@ -2,7 +2,7 @@ import logging
 
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import form_drafts, letters
+from app.api.v1.endpoints import admin, ai, form_drafts, letters
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +23,20 @@ api_router.include_router(
 )
 logger.debug("Form drafts router included")
 
+api_router.include_router(
+    ai.router,
+    prefix="/ai",
+    tags=["ai"],
+)
+logger.debug("AI router included")
+
+api_router.include_router(
+    admin.router,
+    prefix="/admin",
+    tags=["admin"],
+)
+logger.debug("Admin router included")
+
 
 @api_router.get("/health")
 async def health_check() -> dict[str, str]:
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from starlette.responses import StreamingResponse
+
+from app.config import settings
+from app.core.letter_export import EXPORT_MEDIA_TYPES, ExportFormat, export_chunks
+from app.core.letter_import import LetterImporter, LetterImportResult
+from app.core.letter_repository import SqlcLetterRepository
+from app.db.connection import LazyConnection, db_pool
+from app.dependencies import (
+    get_letter_importer,
+    get_snapshot_letter_repository,
+    require_admin,
+)
+from app.models.letters import LetterPage
+from app.utils.exceptions import ProcessingError
+
+logger = logging.getLogger(__name__)
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+class LetterImportPayload(BaseModel):
+    letters: list[dict[str, Any]]  # validées ligne par ligne comme LetterRequest
+    all_or_nothing: bool = False
+
+
+@router.get("/letters")
+async def list_letters(
+    repository: Annotated[SqlcLetterRepository, Depends(get_snapshot_letter_repository)],
+    cursor: str | None = None,
+    page_size: Annotated[int, Query(ge=1, le=500)] = 50,
+) -> LetterPage:
+    try:
+        return await repository.list_letters_page(cursor, page_size)
+    except ProcessingError as e:
+        if e.error_code == "INVALID_CURSOR":
+            raise HTTPException(status_code=400, detail="Invalid cursor") from e
+        logger.error("Error listing letters: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to list letters") from e
+
+
+@router.get("/letters/export")
+async def export_letters(
+    format: ExportFormat = "ndjson",
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> StreamingResponse:
+    """Export de toutes les lettres créées dans [created_from, created_to[, en flux."""
+    start = created_from or _EPOCH
+    end = created_to or datetime.now(UTC)
+    logger.info("GET /admin/letters/export - %s, %s -> %s", format, start, end)
+
+    async def body() -> AsyncIterator[str]:
+        # Connexion propre au flux : les dépendances `yield` se terminent avant
+        # l'envoi du corps d'une StreamingResponse
+        connection = LazyConnection(db_pool, readonly=True, snapshot=True)
+        try:
+            repository = SqlcLetterRepository(connection, read_connection=connection)
+            async for chunk in export_chunks(repository.export_letters(start, end), format):
+                yield chunk
+        finally:
+            await connection.release(commit=False)
+
+    filename = f"letters-{datetime.now(UTC):%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/letters/import")
+async def import_letters(
+    payload: LetterImportPayload,
+    importer: Annotated[LetterImporter, Depends(get_letter_importer)],
+) -> LetterImportResult:
+    if len(payload.letters) > settings.LETTER_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.LETTER_IMPORT_MAX_ROWS} letters per import",
+        )
+    logger.info("POST /admin/letters/import - %d rows", len(payload.letters))
+    try:
+        return await importer.import_rows(payload.letters, payload.all_or_nothing)
+    except ProcessingError as e:
+        logger.error("Letter import failed: %s", e)
+        raise HTTPException(status_code=500, detail="Letter import failed") from e
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import logging
+
+from fastapi import APIRouter, Depends
+
+from app.core.ai_usage import AIUsageSummary, ai_usage_tracker
+from app.dependencies import require_admin
+
+logger = logging.getLogger(__name__)
+# Dépenses en tokens, modèles et taux d'erreur : réservé à l'admin
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/usage")
+async def get_ai_usage() -> AIUsageSummary:
+    """Résumé glissant des appels IA (tokens, latence, erreurs) par opération et modèle."""
+    logger.debug("GET /ai/usage - Building AI usage summary")
+    return ai_usage_tracker.summary()
@@ -1,15 +1,24 @@
 from __future__ import annotations
 
 import logging
+from datetime import date, datetime, timedelta
 from typing import Annotated, Any, TypedDict
+from zoneinfo import ZoneInfo
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from pydantic import BaseModel
 
+from app.config import settings
+from app.core.form_draft_repository import PostgresFormDraftRepository
 from app.core.form_draft_service import FormDraftService
 from app.core.letter_service import LetterService
-from app.dependencies import get_form_draft_service, get_letter_service
-from app.models.form_draft import DraftEventType, DraftStatus
+from app.dependencies import (
+    get_form_draft_service,
+    get_letter_service,
+    get_snapshot_form_draft_repository,
+    require_admin,
+)
+from app.models.form_draft import DraftEventType, DraftFunnelStats, DraftStatus
 from app.models.letters import Address, RemedyPreference, LetterRequest
 
 router = APIRouter(prefix="/form-drafts", tags=["form-drafts"])
@@ -44,6 +53,34 @@ class SubmitOK(TypedDict):
     redirect_url: str | None
 
 
+# Déclarée avant /{form_slug}, qu'elle masquerait sinon
+@router.get("/stats", dependencies=[Depends(require_admin)])
+async def get_funnel_stats(
+    repository: Annotated[
+        PostgresFormDraftRepository, Depends(get_snapshot_form_draft_repository)
+    ],
+    day_from: date | None = None,
+    day_to: date | None = None,
+    form_slug: str | None = None,
+) -> DraftFunnelStats:
+    """Funnel par jour (Europe/Paris), par défaut sur les 30 derniers jours."""
+    day_to = day_to or datetime.now(ZoneInfo(settings.DRAFT_FUNNEL_TIMEZONE)).date()
+    day_from = day_from or day_to - timedelta(days=29)
+    if day_from > day_to:
+        raise HTTPException(status_code=400, detail="day_from must be before day_to")
+    if (day_to - day_from).days >= settings.DRAFT_FUNNEL_STATS_MAX_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.DRAFT_FUNNEL_STATS_MAX_DAYS} days per request",
+        )
+
+    try:
+        return await repository.get_funnel_stats(day_from, day_to, form_slug)
+    except Exception as e:
+        logger.error("Error reading funnel stats: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Funnel stats failed") from e
+
+
 @router.get("/{form_slug}")
 async def get_form_draft(
     form_slug: str,
@@ -6,21 +6,24 @@ import logging
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from starlette.responses import HTMLResponse, Response
 
 from app.core.letter_service import LetterService
 from app.core.pdf_service import PDFType
-from app.dependencies import get_letter_service
+from app.dependencies import get_letter_service, get_readonly_letter_service
 from app.models.letters import Letter
-from app.utils.exceptions import ProcessingError
-from core.ai_service import (
+from app.config import settings
+from app.core.ai_dispatcher import AIPriority
+from app.core.ai_service import (
     ScalewayAIService,
     ReformulationResponse,
     ReformulationRequest,
+    ProductNormalizationBatchResponse,
     ProductNormalizationRequest,
     ProductNormalizationResponse,
 )
+from app.utils.exceptions import ProcessingError
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -45,13 +48,18 @@ class ReformulateTextPayload(BaseModel):
 
 class NormalizeProductNamePayload(BaseModel):
     declared_type: str  # "service" | "bien"
-    raw_name: str
+    # Même borne que ProductNormalizationRequest : 422 plutôt qu'une erreur dans le handler
+    raw_name: str = Field(..., max_length=200)
+
+
+class NormalizeProductNamesPayload(BaseModel):
+    items: list[NormalizeProductNamePayload]
 
 
 @router.get("/{letter_id}")
 async def get_letter(
     letter_id: str,
-    letter_service: Annotated[LetterService, Depends(get_letter_service)],
+    letter_service: Annotated[LetterService, Depends(get_readonly_letter_service)],
 ) -> Letter:
     logger.info("GET /letters/%s - Fetching letter", letter_id)
     try:
@@ -74,7 +82,7 @@ async def get_letter(
 @router.post("/preview-basic")
 async def preview_basic(
     payload: PreviewBasicPayload,
-    letter_service: Annotated[LetterService, Depends(get_letter_service)],
+    letter_service: Annotated[LetterService, Depends(get_readonly_letter_service)],
 ) -> HTMLResponse:
     logger.info("POST /letters/preview-basic - Letter ID: %s", payload.letter_id)
     try:
@@ -236,7 +244,7 @@ async def normalize_product_name(
     payload: NormalizeProductNamePayload,
 ) -> ProductNormalizationResponse:
     """
-    Normalise un nom de produit/service via l'IA (100% IA, sans heuristiques locales).
+    Normalise un nom de produit/service (règles locales pour les cas sûrs, IA sinon).
     """
     logger.info(
         "POST /letters/normalize-product-name - DeclaredType: %s, Raw: %s",
@@ -269,3 +277,57 @@ async def normalize_product_name(
             status_code=500,
             detail=f"Erreur technique lors de la normalisation produit: {str(e)[:100]}"
         ) from e
+
+
+@router.post("/normalize-product-names")
+async def normalize_product_names(
+    payload: NormalizeProductNamesPayload,
+) -> ProductNormalizationBatchResponse:
+    """
+    Normalise plusieurs noms de produit/service en un appel.
+    Résultats dans l'ordre des entrées ; un échec n'affecte que son élément.
+    """
+    logger.info("POST /letters/normalize-product-names - Items: %d", len(payload.items))
+    try:
+        if not payload.items:
+            raise HTTPException(status_code=400, detail="items must not be empty")
+        if len(payload.items) > settings.PRODUCT_NORMALIZATION_BATCH_MAX_ITEMS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"items cannot exceed {settings.PRODUCT_NORMALIZATION_BATCH_MAX_ITEMS} entries",
+            )
+        for index, item in enumerate(payload.items):
+            if item.declared_type not in ("service", "bien"):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f'items[{index}].declared_type must be "service" or "bien"',
+                )
+            if len(item.raw_name.strip()) < 2:
+                raise HTTPException(status_code=400, detail=f"items[{index}].raw_name is too short")
+
+        # Lot : travail de fond, délesté avant les appels interactifs si saturation
+        ai_service = ScalewayAIService(priority=AIPriority.BACKGROUND)
+        requests = [
+            ProductNormalizationRequest(
+                declared_type=item.declared_type,  # type: ignore
+                raw_name=item.raw_name.strip(),
+            )
+            for item in payload.items
+        ]
+        results = await ai_service.normalize_product_names(requests)
+
+        logger.info(
+            "Batch normalized - Items: %d, Failed: %d",
+            len(results),
+            sum(1 for r in results if not r.success),
+        )
+        return ProductNormalizationBatchResponse(results=results)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Unexpected error during batch product normalization: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur technique lors de la normalisation produit: {str(e)[:100]}"
+        ) from e
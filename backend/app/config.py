@@ -1,6 +1,19 @@
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings
 
 
+class AIRoute(BaseModel):
+    """Routage d'une opération IA : modèle principal, repli plus rapide, paramètres."""
+
+    primary_model: str | None = None  # None → SCALEWAY_AI_MODEL
+    fallback_model: str | None = None  # modèle plus rapide, utilisé si le SLO est dépassé
+    max_tokens: int
+    temperature: float
+    top_p: float
+    timeout_seconds: float
+    latency_slo_ms: float | None = None
+
+
 class Settings(BaseSettings):
     # App
     APP_NAME: str = "Je me défends"
@@ -17,6 +30,11 @@ class Settings(BaseSettings):
     STRIPE_PUBLISHABLE_KEY: str = ""
     STRIPE_WEBHOOK_SECRET: str = ""
 
+    # Endpoints /admin (export, listing), /ai/usage et /metrics : jeton Bearer ;
+    # vide = désactivés
+    ADMIN_API_TOKEN: str = ""
+    LETTER_IMPORT_MAX_ROWS: int = 5000  # lignes par lot d'import en masse
+
     # Services externes
     POSTAL_API_URL: str = ""
     POSTAL_API_KEY: str = ""
@@ -27,6 +45,64 @@ class Settings(BaseSettings):
     SCALEWAY_AI_REGION: str = "fr-par"
     SCALEWAY_AI_PROJECT_ID: str = ""
 
+    # Routage par opération (surchargeable en JSON via la variable AI_ROUTES)
+    AI_ROUTES: dict[str, AIRoute] = {
+        "reformulate": AIRoute(
+            fallback_model="llama-3.1-8b-instruct",
+            max_tokens=800,
+            temperature=0.3,
+            top_p=0.9,
+            timeout_seconds=30,
+            latency_slo_ms=8000,
+        ),
+        "normalize": AIRoute(
+            fallback_model="llama-3.1-8b-instruct",
+            max_tokens=120,
+            temperature=0.1,
+            top_p=0.7,
+            timeout_seconds=15,
+            latency_slo_ms=1500,
+        ),
+    }
+    AI_ROUTE_SLO_QUANTILE: float = 0.9
+    AI_ROUTE_MIN_SAMPLES: int = 10
+    AI_ROUTE_DOWNGRADE_SECONDS: int = 120
+    # Sortie JSON contrainte (response_format json_schema) pour la normalisation
+    AI_STRUCTURED_OUTPUT: bool = True
+    AI_USAGE_WINDOW_SIZE: int = 1000
+
+    # Hedging : seconde requête si la première dépasse le quantile de latence observé
+    AI_HEDGING_ENABLED: bool = True
+    AI_HEDGE_QUANTILE: float = 0.9
+    AI_HEDGE_MAX_RATIO: float = 0.1
+    AI_HEDGE_MIN_SAMPLES: int = 20
+    AI_HEDGE_WINDOW_SIZE: int = 500
+
+    # Répartition des appels IA par priorité (par worker)
+    AI_MAX_CONCURRENCY: int = 8
+    AI_INTERACTIVE_RESERVED_SLOTS: int = 2  # jamais occupés par le travail de fond
+    AI_BACKGROUND_MAX_QUEUE: int = 50
+    AI_BACKGROUND_MAX_WAIT_SECONDS: float = 10.0
+
+    # Reformulation : réutilisation pour les textes quasi identiques (MinHash/LSH, par worker)
+    AI_REFORMULATION_DEDUP_ENABLED: bool = True
+    AI_REFORMULATION_DEDUP_THRESHOLD: float = 0.95  # servie sans appel IA
+    AI_REFORMULATION_DEDUP_MAX_ENTRIES: int = 5000
+
+    # Normalisation produit : règles locales avant appel IA
+    PRODUCT_NORMALIZATION_LOCAL_RULES: bool = True
+    PRODUCT_NORMALIZATION_CACHE_SIZE: int = 5000
+    PRODUCT_NORMALIZATION_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    PRODUCT_NORMALIZATION_BATCH_MAX_ITEMS: int = 50
+    PRODUCT_NORMALIZATION_BATCH_CONCURRENCY: int = 4
+
+    # Normalisation spéculative déclenchée par l'autosave des brouillons
+    PRODUCT_PREFETCH_ENABLED: bool = True
+    PRODUCT_PREFETCH_MIN_INTERVAL_SECONDS: float = 1.5
+    PRODUCT_PREFETCH_MAX_CONCURRENCY: int = 4
+    PRODUCT_PREFETCH_MAX_DRAFTS: int = 500
+    PRODUCT_PREFETCH_RETRY_AFTER_SECONDS: float = 60.0  # après un échec
+
     # Uploads
     UPLOAD_FOLDER: str = "uploads"
     MAX_FILE_SIZE: int = 10 * 1024 * 1024
@@ -35,6 +111,48 @@ class Settings(BaseSettings):
     DATABASE_URL: str = ""
     DATABASE_POOL_SIZE: int = 10
     DATABASE_MAX_OVERFLOW: int = 20
+    DATABASE_POOL_WARMUP_CONNECTIONS: int = 2  # ouvertes au démarrage de chaque worker
+    DATABASE_POOL_RECYCLE_SECONDS: int = 1800
+    DATABASE_HEALTH_CHECK_INTERVAL_SECONDS: float = 30.0  # 0 = désactivé (pre-ping)
+    # Requêtes chaudes (autosave, lecture de lettre) en requêtes préparées asyncpg natives
+    DATABASE_PREPARED_QUERIES: bool = True
+    DATABASE_STATEMENT_CACHE_SIZE: int = 256  # cache de requêtes préparées du dialecte, par connexion
+    # Durée / lignes / erreurs par requête sqlc ; journal des requêtes plus lentes que le seuil
+    DATABASE_QUERY_METRICS: bool = True
+    DATABASE_SLOW_QUERY_MS: float = 100.0
+    # Réplicas en lecture (JSON : ["postgresql://..."]) ; lectures routées en tourniquet
+    DATABASE_REPLICA_URLS: list[str] = []
+    DATABASE_REPLICA_STICKY_SECONDS: float = 10.0  # lecture sur le primaire après une écriture
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DATABASE_REPLICA_RETRY_SECONDS: float = 30.0  # mise à l'écart d'un réplica en échec
+    # Cache des lettres par worker, invalidé par LISTEN/NOTIFY (canal letter_changed)
+    LETTER_CACHE_ENABLED: bool = True
+    LETTER_CACHE_SIZE: int = 2000
+    LETTER_CACHE_TTL_SECONDS: int = 10 * 60  # filet de sécurité
+
+    # Rétention des brouillons (tâche de fond, un seul worker à la fois)
+    DRAFT_RETENTION_ENABLED: bool = True
+    DRAFT_RETENTION_INTERVAL_SECONDS: float = 60 * 60
+    DRAFT_STALE_AFTER_DAYS: int = 30  # durée de vie du cookie de brouillon
+    DRAFT_PURGE_AFTER_DAYS: int = 30  # délai de grâce après expiration
+    DRAFT_RETENTION_BATCH_SIZE: int = 500
+    DRAFT_RETENTION_MAX_BATCHES: int = 200  # par passage
+    DRAFT_RETENTION_BATCH_PAUSE_SECONDS: float = 0.2
+    DRAFT_EVENT_RETENTION_MONTHS: int = 13  # mois complets conservés avant le mois courant
+    DRAFT_EVENT_PARTITIONS_AHEAD: int = 2  # mois créés d'avance (pas de partition DEFAULT)
+    # Agrégat incrémental du funnel (form_draft_funnel_daily), depuis un filigrane
+    DRAFT_FUNNEL_ROLLUP_ENABLED: bool = True
+    DRAFT_FUNNEL_ROLLUP_INTERVAL_SECONDS: float = 60
+    DRAFT_FUNNEL_LAG_SECONDS: int = 120  # événements de transactions encore ouvertes
+    DRAFT_FUNNEL_WINDOW_HOURS: int = 24  # événements agrégés par requête
+    DRAFT_FUNNEL_MAX_WINDOWS: int = 100  # par passage (rattrapage)
+    DRAFT_FUNNEL_TIMEZONE: str = "Europe/Paris"  # découpage des jours
+    DRAFT_FUNNEL_STATS_MAX_DAYS: int = 366
+    # Autosave en écriture différée (par worker) : patchs coalescés par brouillon.
+    # Prérequis : affinité de session (un brouillon servi par un seul worker)
+    DRAFT_AUTOSAVE_WRITE_BEHIND: bool = False
+    DRAFT_AUTOSAVE_FLUSH_INTERVAL_MS: int = 500
+    DRAFT_AUTOSAVE_FLUSH_MAX_DRAFTS: int = 200  # écriture anticipée au-delà
 
     # Logging
     LOG_LEVEL: str = "INFO"
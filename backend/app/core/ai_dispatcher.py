@@ -0,0 +1,173 @@
+"""Répartition des appels IA entre travail interactif et travail de fond.
+
+Un budget de concurrence global (par worker) est partagé entre deux classes :
+- interactive : un utilisateur attend la réponse (reformulation, normalisation
+  à l'affichage) ; servie en priorité, et quelques créneaux lui sont réservés ;
+- background : préchargement, lots, backfills ; délestée en premier quand le
+  service est chargé (file pleine, attente trop longue, ou interactif en attente).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from enum import Enum
+
+from app.config import settings
+from app.utils.exceptions import ProcessingError
+from app.utils.metrics import registry
+
+AI_DISPATCH_QUEUE_DEPTH = registry.gauge(
+    "ai_dispatch_queue_depth",
+    "Appels IA en attente d'un créneau, par priorité",
+    ("priority",),
+)
+AI_DISPATCH_IN_FLIGHT = registry.gauge(
+    "ai_dispatch_in_flight",
+    "Appels IA en cours (tous créneaux confondus)",
+)
+AI_DISPATCH_WAIT = registry.histogram(
+    "ai_dispatch_wait_seconds",
+    "Attente d'un créneau avant l'appel IA, par priorité",
+    ("priority",),
+)
+AI_DISPATCH_SHED_TOTAL = registry.counter(
+    "ai_dispatch_shed_total",
+    "Appels IA délestés (queue_full, interactive_waiting, timeout)",
+    ("priority", "reason"),
+)
+
+
+class AIPriority(str, Enum):
+    INTERACTIVE = "interactive"
+    BACKGROUND = "background"
+
+
+class AIOverloadedError(ProcessingError):
+    def __init__(self, reason: str) -> None:
+        super().__init__(f"Service IA saturé ({reason})", error_code="AI_OVERLOADED")
+        self.reason = reason
+
+
+class AIDispatcher:
+    def __init__(
+        self,
+        max_concurrency: int,
+        interactive_reserved: int,
+        background_max_queue: int,
+        background_max_wait: float,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.background_limit = max(1, max_concurrency - interactive_reserved)
+        self.background_max_queue = background_max_queue
+        self.background_max_wait = background_max_wait
+        self._active = 0
+        self._queues: dict[AIPriority, deque[asyncio.Future[None]]] = {
+            priority: deque() for priority in AIPriority
+        }
+
+    def _can_start(self, priority: AIPriority) -> bool:
+        limit = self.max_concurrency if priority is AIPriority.INTERACTIVE else self.background_limit
+        return self._active < limit
+
+    def _update_gauges(self) -> None:
+        AI_DISPATCH_IN_FLIGHT.set(self._active)
+        for priority, queue in self._queues.items():
+            AI_DISPATCH_QUEUE_DEPTH.set(len(queue), priority=priority.value)
+
+    def _shed(self, priority: AIPriority, reason: str) -> AIOverloadedError:
+        AI_DISPATCH_SHED_TOTAL.inc(priority=priority.value, reason=reason)
+        return AIOverloadedError(reason)
+
+    def _shed_background_queue(self) -> None:
+        """Un appel interactif doit attendre : le travail de fond en file est abandonné."""
+        queue = self._queues[AIPriority.BACKGROUND]
+        while queue:
+            waiter = queue.popleft()
+            if not waiter.done():
+                waiter.set_exception(self._shed(AIPriority.BACKGROUND, "interactive_waiting"))
+
+    def _wake(self) -> None:
+        for priority in AIPriority:  # interactive d'abord
+            queue = self._queues[priority]
+            while queue and self._can_start(priority):
+                waiter = queue.popleft()
+                if waiter.done():
+                    continue
+                self._active += 1
+                waiter.set_result(None)
+        self._update_gauges()
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._wake()
+
+    async def _acquire(self, priority: AIPriority) -> None:
+        interactive_waiting = bool(self._queues[AIPriority.INTERACTIVE])
+        queue = self._queues[priority]
+        if not queue and not interactive_waiting and self._can_start(priority):
+            self._active += 1
+            self._update_gauges()
+            return
+
+        timeout: float | None = None
+        if priority is AIPriority.BACKGROUND:
+            if interactive_waiting:
+                raise self._shed(priority, "interactive_waiting")
+            if len(queue) >= self.background_max_queue:
+                raise self._shed(priority, "queue_full")
+            timeout = self.background_max_wait
+        else:
+            self._shed_background_queue()
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        self._update_gauges()
+        try:
+            await asyncio.wait_for(waiter, timeout=timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                # Créneau attribué juste avant l'annulation : on le rend
+                self._release()
+            else:
+                with contextlib.suppress(ValueError):
+                    queue.remove(waiter)
+                self._update_gauges()
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._shed(priority, "timeout") from None
+            raise
+
+    def try_acquire(self, priority: AIPriority) -> bool:
+        """Créneau immédiat sans file d'attente (requête de couverture) ; à rendre
+        avec `release()`."""
+        waiting = self._queues[priority] or self._queues[AIPriority.INTERACTIVE]
+        if waiting or not self._can_start(priority):
+            return False
+        self._active += 1
+        self._update_gauges()
+        return True
+
+    def release(self) -> None:
+        self._release()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: AIPriority) -> AsyncIterator[None]:
+        """Réserve un créneau d'appel IA ; lève AIOverloadedError si délesté."""
+        started = time.perf_counter()
+        await self._acquire(priority)
+        AI_DISPATCH_WAIT.observe(time.perf_counter() - started, priority=priority.value)
+        try:
+            yield
+        finally:
+            self._release()
+
+
+ai_dispatcher = AIDispatcher(
+    max_concurrency=settings.AI_MAX_CONCURRENCY,
+    interactive_reserved=settings.AI_INTERACTIVE_RESERVED_SLOTS,
+    background_max_queue=settings.AI_BACKGROUND_MAX_QUEUE,
+    background_max_wait=settings.AI_BACKGROUND_MAX_WAIT_SECONDS,
+)
@@ -0,0 +1,177 @@
+"""Requêtes IA « couvertes » (hedging) pour couper la queue de latence.
+
+Si la requête principale n'a pas répondu au-delà du p90 observé pour
+l'opération, une seconde requête identique est lancée ; la première réponse
+valide l'emporte et l'autre est annulée. La part de requêtes couvertes est
+plafonnée pour borner le surcoût, et la seconde requête peut être refusée par
+l'appelant (pas de créneau libre) : on attend alors la première. Les latences
+sont suivies en mémoire, par worker, sur une fenêtre glissante.
+
+Le seuil porte sur toutes les requêtes principales, y compris les plus
+lentes : une principale abandonnée après le seuil (couverture gagnante,
+annulation) compte pour le temps déjà écoulé, échantillon censuré qui minore
+sa vraie latence. Sans cela, les requêtes lentes disparaîtraient de la fenêtre
+dès qu'elles sont couvertes et le p90 dériverait vers le bas.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from app.config import settings
+from app.core.ai_usage import percentile
+from app.utils.metrics import registry
+
+T = TypeVar("T")
+
+AI_HEDGED_REQUESTS_TOTAL = registry.counter(
+    "ai_hedged_requests_total",
+    "Requêtes IA couvertes par une seconde tentative, par gagnant (primary / hedge / none)",
+    ("operation", "winner"),
+)
+AI_HEDGE_THRESHOLD = registry.gauge(
+    "ai_hedge_threshold_seconds",
+    "Seuil de déclenchement du hedging (quantile de latence observé) par opération",
+    ("operation",),
+)
+
+
+class RequestHedger:
+    def __init__(
+        self,
+        window_size: int,
+        min_samples: int,
+        quantile: float,
+        max_hedge_ratio: float,
+    ) -> None:
+        self.window_size = window_size
+        self.min_samples = min_samples
+        self.quantile = quantile
+        self.max_hedge_ratio = max_hedge_ratio
+        self._latencies: dict[str, deque[float]] = {}
+        self._decisions: dict[str, deque[bool]] = {}
+
+    def observe_latency(self, operation: str, seconds: float) -> None:
+        """Latence observée d'une tentative (alimente le seuil de hedging)."""
+        window = self._latencies.setdefault(operation, deque(maxlen=self.window_size))
+        window.append(seconds)
+
+    def latency_quantile(self, operation: str, q: float) -> float | None:
+        window = self._latencies.get(operation)
+        if not window or len(window) < self.min_samples:
+            return None
+        return percentile(sorted(window), q)
+
+    def hedge_delay(self, operation: str) -> float | None:
+        delay = self.latency_quantile(operation, self.quantile)
+        if delay is not None:
+            AI_HEDGE_THRESHOLD.set(delay, operation=operation)
+        return delay
+
+    def _record_decision(self, operation: str, hedged: bool) -> None:
+        decisions = self._decisions.setdefault(operation, deque(maxlen=self.window_size))
+        decisions.append(hedged)
+
+    def _allow_hedge(self, operation: str) -> bool:
+        decisions = self._decisions.get(operation, ())
+        hedged = sum(decisions)
+        return (hedged + 1) / (len(decisions) + 1) <= self.max_hedge_ratio
+
+    async def run(
+        self,
+        operation: str,
+        attempt: Callable[[], Awaitable[T]],
+        is_success: Callable[[T], bool],
+        hedge_attempt: Callable[[], Awaitable[T] | None] | None = None,
+    ) -> tuple[T, bool]:
+        """Exécute `attempt`, en le doublant si la réponse tarde.
+
+        La seconde requête est `hedge_attempt` (par défaut `attempt`) ; None =
+        pas de couverture possible. Renvoie (résultat, couvert ?). Les
+        exceptions de la tentative retenue sont propagées telles quelles."""
+        delay = self.hedge_delay(operation) if settings.AI_HEDGING_ENABLED else None
+        primary: asyncio.Future[T] = asyncio.ensure_future(attempt())
+        self._observe(operation, primary, is_success, censor_after=delay)
+        tasks: list[asyncio.Future[T]] = [primary]
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait({primary}, timeout=delay)
+                second = None
+                if not done and self._allow_hedge(operation):
+                    second = (hedge_attempt or attempt)()
+                if second is not None:
+                    self._record_decision(operation, True)
+                    hedge: asyncio.Future[T] = asyncio.ensure_future(second)
+                    self._observe(operation, hedge, is_success, censor_after=None)
+                    tasks.append(hedge)
+                    return await self._first_success(operation, primary, hedge, is_success), True
+            self._record_decision(operation, False)
+            return await primary, False
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            for task in tasks:
+                with contextlib.suppress(asyncio.CancelledError, Exception):
+                    await task
+
+    def _observe(
+        self,
+        operation: str,
+        task: asyncio.Future[T],
+        is_success: Callable[[T], bool],
+        censor_after: float | None,
+    ) -> None:
+        """Note la latence de `task` à sa fin : aboutie, expirée, ou abandonnée
+        après `censor_after` secondes (temps écoulé jusque-là). Abandonnée plus
+        tôt, ou couverture ayant perdu contre la principale, son temps écoulé
+        sous-estimerait la queue : on l'ignore."""
+        started = time.perf_counter()
+
+        def _done(_: asyncio.Future[T]) -> None:
+            elapsed = time.perf_counter() - started
+            if task.cancelled():
+                counted = censor_after is not None and elapsed >= censor_after
+            elif (error := task.exception()) is not None:
+                counted = isinstance(error, asyncio.TimeoutError)
+            else:
+                counted = is_success(task.result())
+            if counted:
+                self.observe_latency(operation, elapsed)
+
+        task.add_done_callback(_done)
+
+    @staticmethod
+    async def _first_success(
+        operation: str,
+        primary: asyncio.Future[T],
+        hedge: asyncio.Future[T],
+        is_success: Callable[[T], bool],
+    ) -> T:
+        pending: set[asyncio.Future[T]] = {primary, hedge}
+        first_done: asyncio.Future[T] | None = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None and is_success(task.result()):
+                    winner = "primary" if task is primary else "hedge"
+                    AI_HEDGED_REQUESTS_TOTAL.inc(operation=operation, winner=winner)
+                    return task.result()
+                first_done = first_done or task
+        # Aucune tentative valide : on renvoie (ou relève) la première terminée
+        AI_HEDGED_REQUESTS_TOTAL.inc(operation=operation, winner="none")
+        assert first_done is not None
+        return first_done.result()
+
+
+ai_hedger = RequestHedger(
+    window_size=settings.AI_HEDGE_WINDOW_SIZE,
+    min_samples=settings.AI_HEDGE_MIN_SAMPLES,
+    quantile=settings.AI_HEDGE_QUANTILE,
+    max_hedge_ratio=settings.AI_HEDGE_MAX_RATIO,
+)
@@ -0,0 +1,117 @@
+"""Routage des opérations IA vers un modèle, avec repli automatique.
+
+Chaque opération (reformulate, normalize) a une route dans `settings.AI_ROUTES`.
+Si le quantile de latence du modèle principal dépasse le SLO de la route, les
+appels basculent sur le modèle de repli (plus rapide) pendant un temps donné,
+puis le principal est réévalué sur de nouvelles mesures.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+import time
+from collections import deque
+
+from app.config import AIRoute, settings
+from app.core.ai_usage import percentile
+from app.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+AI_MODEL_DOWNGRADES_TOTAL = registry.counter(
+    "ai_model_downgrades_total",
+    "Bascules vers le modèle de repli suite à un dépassement du SLO de latence",
+    ("operation",),
+)
+AI_ROUTE_DOWNGRADED = registry.gauge(
+    "ai_route_downgraded",
+    "1 si l'opération est servie par son modèle de repli, 0 sinon",
+    ("operation",),
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class RoutedModel:
+    operation: str
+    model: str
+    max_tokens: int
+    temperature: float
+    top_p: float
+    timeout_seconds: float
+    downgraded: bool = False
+
+
+class ModelRouter:
+    def __init__(self, routes: dict[str, AIRoute], default_model: str) -> None:
+        self.routes = routes
+        self.default_model = default_model
+        self._latencies: dict[tuple[str, str], deque[float]] = {}
+        self._downgraded_until: dict[str, float] = {}
+
+    def _primary_model(self, route: AIRoute) -> str:
+        return route.primary_model or self.default_model
+
+    def _is_downgraded(self, operation: str) -> bool:
+        until = self._downgraded_until.get(operation)
+        if until is None:
+            return False
+        if time.monotonic() < until:
+            return True
+        # Fin de la période de repli : le principal repart sur des mesures fraîches
+        del self._downgraded_until[operation]
+        route = self.routes[operation]
+        self._latencies.pop((operation, self._primary_model(route)), None)
+        AI_ROUTE_DOWNGRADED.set(0, operation=operation)
+        logger.info("AI route %s back on primary model", operation)
+        return False
+
+    def select(self, operation: str) -> RoutedModel:
+        route = self.routes[operation]
+        downgraded = route.fallback_model is not None and self._is_downgraded(operation)
+        model = route.fallback_model if downgraded and route.fallback_model else self._primary_model(route)
+        return RoutedModel(
+            operation=operation,
+            model=model,
+            max_tokens=route.max_tokens,
+            temperature=route.temperature,
+            top_p=route.top_p,
+            timeout_seconds=route.timeout_seconds,
+            downgraded=downgraded,
+        )
+
+    def observe(self, operation: str, model: str, seconds: float) -> None:
+        """Latence d'un appel abouti ; déclenche le repli si le SLO du principal est dépassé."""
+        route = self.routes.get(operation)
+        if route is None:
+            return
+        window = self._latencies.setdefault(
+            (operation, model), deque(maxlen=settings.AI_ROUTE_MIN_SAMPLES * 5)
+        )
+        window.append(seconds)
+
+        if (
+            route.fallback_model is None
+            or route.latency_slo_ms is None
+            or model != self._primary_model(route)
+            or operation in self._downgraded_until
+            or len(window) < settings.AI_ROUTE_MIN_SAMPLES
+        ):
+            return
+        observed_ms = percentile(sorted(window), settings.AI_ROUTE_SLO_QUANTILE) * 1000
+        if observed_ms > route.latency_slo_ms:
+            self._downgraded_until[operation] = time.monotonic() + settings.AI_ROUTE_DOWNGRADE_SECONDS
+            AI_MODEL_DOWNGRADES_TOTAL.inc(operation=operation)
+            AI_ROUTE_DOWNGRADED.set(1, operation=operation)
+            logger.warning(
+                "AI route %s downgraded to %s - %s p%d %.0fms > SLO %.0fms",
+                operation,
+                route.fallback_model,
+                model,
+                round(settings.AI_ROUTE_SLO_QUANTILE * 100),
+                observed_ms,
+                route.latency_slo_ms,
+            )
+
+
+ai_router = ModelRouter(settings.AI_ROUTES, default_model=settings.SCALEWAY_AI_MODEL)
@@ -2,20 +2,56 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import re
 import json
+import time
+from collections.abc import Awaitable
 from enum import Enum
 from typing import Any, Literal
 
 import aiohttp
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 from app.config import settings
+from app.core.ai_dispatcher import AIOverloadedError, AIPriority, ai_dispatcher
+from app.core.ai_hedging import ai_hedger
+from app.core.ai_routing import ai_router
+from app.core.ai_usage import AICallRecord, ai_usage_tracker
+from app.core.product_name_rules import join_article_and_nom, resolve_locally
 from app.utils.exceptions import ProcessingError
+from app.utils.metrics import registry
+from app.utils.near_duplicates import MinHashLSHIndex, normalize_for_shingles
+from app.utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+PRODUCT_NORMALIZATION_TOTAL = registry.counter(
+    "product_normalization_total",
+    "Normalisations de nom de produit, par source (local = règles, model = IA)",
+    ("source",),
+)
+PRODUCT_NORMALIZATION_LOCAL_RATIO = registry.gauge(
+    "product_normalization_local_ratio",
+    "Part des normalisations de nom de produit servies localement sans appel IA",
+)
+PRODUCT_NORMALIZATION_PARSE_FAILURES = registry.counter(
+    "product_normalization_parse_failures_total",
+    "Sorties IA de normalisation produit illisibles (initial = 1er appel, repair = après réparation)",
+    ("stage",),
+)
+REFORMULATION_DEDUP_TOTAL = registry.counter(
+    "reformulation_dedup_total",
+    "Recherches de reformulations quasi identiques (hit = servie, miss)",
+    ("result",),
+)
+PRODUCT_NORMALIZATION_CACHE_TOTAL = registry.counter(
+    "product_normalization_cache_total",
+    "Consultations du cache de normalisation produit (hit / miss)",
+    ("result",),
+)
+
 
 class ReformulationType(str, Enum):
     """Type unique de reformulation disponible (professionnelle/juridique)."""
@@ -36,9 +72,10 @@ class ReformulationResponse(BaseModel):
     type: ReformulationType
     success: bool = True
     error: str | None = None
+    cached: bool = False  # servie depuis une reformulation quasi identique
 
 
-# --------------------------- Product normalization (100% IA) ---------------------------
+# --------------------------- Product normalization ---------------------------
 
 class ProductNormalizationRequest(BaseModel):
     """
@@ -50,22 +87,131 @@ class ProductNormalizationRequest(BaseModel):
     raw_name: str = Field(..., min_length=2, max_length=200, description="Nom brut du produit/service saisi par l'utilisateur")
 
 
+AcquisitionPrefix = Literal["", "de ", "d’", "du ", "des "]
+
+
+class ProductNormalizationOutput(BaseModel):
+    """Sortie JSON attendue du modèle pour la normalisation produit."""
+    group_noun: str = Field(..., min_length=1, max_length=300)
+    acquisition_prefix: AcquisitionPrefix = ""
+
+    @field_validator("group_noun")
+    @classmethod
+    def _clean_group_noun(cls, v: str) -> str:
+        # Pas de point final, pas de majuscules forcées
+        cleaned = v.strip().rstrip(".!? ").strip()
+        if not cleaned:
+            raise ValueError("group_noun vide")
+        return cleaned
+
+    @field_validator("acquisition_prefix", mode="before")
+    @classmethod
+    def _normalize_prefix(cls, v: Any) -> Any:
+        if not isinstance(v, str):
+            return v
+        prefix = v.replace("'", "’").strip()
+        return prefix if prefix in ("", "d’") else f"{prefix} "
+
+
 class ProductNormalizationResponse(BaseModel):
     """Réponse de normalisation du nom de produit (groupe nominal prêt à injecter)."""
     declared_type: Literal["service", "bien"]
     raw_name: str
-    product_name_formatted: str | None = None  # ex. "un abonnement Freebox Pop"
+    product_name_formatted: str | None = None  # ex. "un abonnement Freebox Pop" (= group_noun)
+    group_noun: str | None = None
+    acquisition_prefix: AcquisitionPrefix | None = None  # ex. "d’" → "d’un abonnement …"
     success: bool = True
     error: str | None = None
 
 
+_PRODUCT_NORMALIZATION_RESPONSE_FORMAT: dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "product_normalization",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "group_noun": {"type": "string"},
+                "acquisition_prefix": {
+                    "type": "string",
+                    "enum": ["", "de ", "d’", "du ", "des "],
+                },
+            },
+            "required": ["group_noun", "acquisition_prefix"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+class ProductNormalizationBatchResponse(BaseModel):
+    """Réponse de normalisation par lot (même ordre que les entrées, erreurs par élément)."""
+    results: list[ProductNormalizationResponse]
+
+
+ProductCacheKey = tuple[str, str]
+
+# Cache des résultats de normalisation (par worker), partagé entre instances du service
+_product_name_cache: TTLCache[ProductCacheKey, ProductNormalizationResponse] = TTLCache(
+    maxsize=settings.PRODUCT_NORMALIZATION_CACHE_SIZE,
+    ttl_seconds=settings.PRODUCT_NORMALIZATION_CACHE_TTL_SECONDS,
+)
+
+
+def product_cache_key(declared_type: str, raw_name: str) -> ProductCacheKey:
+    return declared_type, " ".join(raw_name.split()).lower()
+
+
+def is_product_name_cached(declared_type: str, raw_name: str) -> bool:
+    return product_cache_key(declared_type, raw_name) in _product_name_cache
+
+
+# Index des reformulations déjà produites (par worker), pour les textes quasi
+# identiques : (mots du texte source, reformulation)
+_reformulation_index: MinHashLSHIndex[tuple[tuple[str, ...], str]] = MinHashLSHIndex(
+    maxsize=settings.AI_REFORMULATION_DEDUP_MAX_ENTRIES
+)
+
+# Négation et polarité : « chauffe » / « ne chauffe pas » restent proches en k-grammes
+_POLARITY_WORDS = frozenset(
+    {"ne", "n", "pas", "plus", "jamais", "aucun", "aucune", "rien", "sans", "ni", "non"}
+)
+# Mots ignorés pour réutiliser une reformulation telle quelle
+_REFORMULATION_STOPWORDS = frozenset(
+    {"le", "la", "les", "l", "un", "une", "des", "de", "du", "d", "au", "aux", "et"}
+)
+
+
+def _reformulation_namespace(
+    request: ReformulationRequest,
+) -> tuple[str, str, tuple[str, ...], tuple[str, ...]]:
+    # Les nombres (durées, dates, modèles) et la polarité doivent être identiques :
+    # « 2 mois » et « 8 mois » sont proches en k-grammes mais pas interchangeables
+    words = normalize_for_shingles(request.text).split()
+    return (
+        request.type.value,
+        (request.context or "").strip(),
+        tuple(re.findall(r"\d+", request.text)),
+        tuple(sorted(w for w in words if w in _POLARITY_WORDS)),
+    )
+
+
+def _reformulation_words(text: str) -> tuple[str, ...]:
+    """Mots du texte hors mots vides, triés : deux textes ne partagent une
+    reformulation que s'ils ont exactement les mêmes."""
+    words = normalize_for_shingles(text).split()
+    return tuple(sorted(w for w in words if w not in _REFORMULATION_STOPWORDS))
+
+
 # --------------------------------------------------------------------------------------
 
 
 class ScalewayAIService:
     """Service pour l'IA générative Scaleway."""
 
-    def __init__(self) -> None:
+    def __init__(self, priority: AIPriority = AIPriority.INTERACTIVE) -> None:
+        self.priority = priority
         self.api_url = settings.SCALEWAY_AI_API_URL
         self.api_key = settings.SCALEWAY_AI_API_KEY
         self.model = settings.SCALEWAY_AI_MODEL
@@ -75,6 +221,162 @@ class ScalewayAIService:
         if not self.api_key:
             logger.warning("SCALEWAY_AI_API_KEY not configured - AI features disabled")
 
+    # ========================= TRANSPORT (COMMUN) =========================
+
+    def _headers(self) -> dict[str, str]:
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "X-SCW-Region": self.region,
+        }
+        if self.project_id:
+            headers["X-SCW-Project-ID"] = self.project_id
+        return headers
+
+    async def _post_once(
+        self,
+        operation: str,
+        payload: dict[str, Any],
+        timeout: aiohttp.ClientTimeout,
+    ) -> tuple[int, dict[str, Any] | None, str]:
+        """Une tentative HTTP : (statut, JSON si 200, texte d'erreur sinon)."""
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.post(
+                f"{self.api_url}/chat/completions",
+                json=payload,
+                headers=self._headers(),
+            ) as response:
+                if response.status != 200:
+                    return response.status, None, await response.text()
+                result: dict[str, Any] = await response.json()
+        return 200, result, ""
+
+    async def _hedge_once(
+        self,
+        operation: str,
+        payload: dict[str, Any],
+        timeout: aiohttp.ClientTimeout,
+        attempts: list[tuple[float, int | None, dict[str, Any] | None, bool]],
+    ) -> tuple[int, dict[str, Any] | None, str]:
+        """Requête de couverture, dans son propre créneau (pris et rendu par
+        l'appelant) ; son issue est notée dans `attempts` (latence, statut,
+        usage, annulée ?)."""
+        started = time.perf_counter()
+        status: int | None = None
+        usage: dict[str, Any] | None = None
+        cancelled = False
+        try:
+            status, result, error_text = await self._post_once(
+                operation, payload, timeout
+            )
+            usage = result.get("usage") if result else None
+            return status, result, error_text
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            attempts.append((time.perf_counter() - started, status, usage, cancelled))
+
+    async def _chat_completion(
+        self,
+        operation: str,
+        messages: list[dict[str, str]],
+        response_format: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """POST /chat/completions avec routage de modèle et hedging, dans un
+        créneau du répartiteur selon la priorité.
+
+        Chaque appel logique est comptabilisé (tokens, latence, statut)."""
+        route = ai_router.select(operation)
+        model = route.model
+        payload: dict[str, Any] = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": route.max_tokens,
+            "temperature": route.temperature,
+            "top_p": route.top_p,
+            "stream": False,
+        }
+        if response_format:
+            payload["response_format"] = response_format
+        timeout = aiohttp.ClientTimeout(total=route.timeout_seconds)
+        hedged = False
+        status: int | None = None
+        started = time.perf_counter()
+        hedge_attempts: list[tuple[float, int | None, dict[str, Any] | None, bool]] = []
+
+        def _hedge() -> Awaitable[tuple[int, dict[str, Any] | None, str]] | None:
+            # La couverture consomme un créneau de plus, ou n'a pas lieu
+            if not ai_dispatcher.try_acquire(self.priority):
+                return None
+            task = asyncio.ensure_future(
+                self._hedge_once(operation, payload, timeout, hedge_attempts)
+            )
+            # Rendu même si la tâche est annulée avant d'avoir démarré
+            task.add_done_callback(lambda _: ai_dispatcher.release())
+            return task
+
+        def _record(usage: dict[str, Any] | None = None) -> None:
+            usage = usage or {}
+            for latency, attempt_status, attempt_usage, cancelled in hedge_attempts:
+                # Annulée en vol : même prompt, complétion estimée sur la gagnante
+                attempt_usage = attempt_usage or usage
+                ai_usage_tracker.record(
+                    AICallRecord(
+                        operation=operation,
+                        model=model,
+                        status=attempt_status,
+                        latency_seconds=latency,
+                        prompt_tokens=int(attempt_usage.get("prompt_tokens") or 0),
+                        completion_tokens=int(
+                            attempt_usage.get("completion_tokens") or 0
+                        ),
+                        hedged=True,
+                        hedge_attempt=True,
+                        cancelled=cancelled,
+                    )
+                )
+            hedge_attempts.clear()
+            ai_usage_tracker.record(
+                AICallRecord(
+                    operation=operation,
+                    model=model,
+                    status=status,
+                    latency_seconds=time.perf_counter() - started,
+                    prompt_tokens=int(usage.get("prompt_tokens") or 0),
+                    completion_tokens=int(usage.get("completion_tokens") or 0),
+                    hedged=hedged,
+                )
+            )
+
+        async with ai_dispatcher.slot(self.priority):
+            started = time.perf_counter()  # latence amont, hors attente de créneau
+            try:
+                (status, result, error_text), hedged = await ai_hedger.run(
+                    operation,
+                    lambda: self._post_once(operation, payload, timeout),
+                    lambda outcome: outcome[0] == 200,
+                    hedge_attempt=_hedge,
+                )
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                status = None
+                _record()
+                raise
+
+            if result is None:
+                _record()
+                logger.error(
+                    "Scaleway AI API error - Operation: %s, Status: %d, Response: %s",
+                    operation,
+                    status,
+                    error_text
+                )
+                raise ProcessingError(f"Erreur API Scaleway ({status}): {error_text}")
+
+        _record(result.get("usage"))
+        ai_router.observe(operation, model, time.perf_counter() - started)
+        return result
+
     # ========================= REFORMULATION (EXISTANT) =========================
 
     def _get_system_prompt(self, reformulation_type: ReformulationType) -> str:
@@ -195,7 +497,11 @@ de conformité."
         self,
         request: ReformulationRequest
     ) -> ReformulationResponse:
-        """Reformule un texte via l'IA Scaleway (reformulation uniquement)."""
+        """Reformule un texte via l'IA Scaleway (reformulation uniquement).
+
+        Un texte quasi identique à un texte déjà reformulé (similarité ≥
+        AI_REFORMULATION_DEDUP_THRESHOLD, mêmes mots hors mots vides) reçoit la
+        même reformulation sans appel IA."""
 
         if not self.api_key:
             logger.error("Scaleway AI not configured")
@@ -207,6 +513,29 @@ de conformité."
                 error="Service IA non configuré"
             )
 
+        namespace = _reformulation_namespace(request)
+        words = _reformulation_words(request.text)
+        if settings.AI_REFORMULATION_DEDUP_ENABLED:
+            duplicate = _reformulation_index.query(
+                request.text, settings.AI_REFORMULATION_DEDUP_THRESHOLD, namespace=namespace
+            )
+            # La similarité seule ne suffit pas pour servir la reformulation comme
+            # réponse : un mot changé (« gauche » / « droite ») la garde élevée
+            if duplicate is not None and duplicate.value[0] != words:
+                duplicate = None
+            REFORMULATION_DEDUP_TOTAL.inc(result="hit" if duplicate else "miss")
+            if duplicate is not None:
+                logger.info(
+                    "Reformulation served from near-duplicate - Similarity: %.2f",
+                    duplicate.similarity,
+                )
+                return ReformulationResponse(
+                    original_text=request.text,
+                    reformulated_text=duplicate.value[1],
+                    type=request.type,
+                    cached=True,
+                )
+
         try:
             logger.info(
                 "Reformulating text via Scaleway AI - Type: %s, Length: %d chars",
@@ -214,43 +543,14 @@ de conformité."
                 len(request.text)
             )
 
-            payload = {
-                "model": self.model,
-                "messages": [
-                    {"role": "system", "content": self._get_system_prompt(request.type)},
-                    {"role": "user", "content": self._get_user_prompt(request.text, request.type, request.context)},
-                ],
-                "max_tokens": 800,      # Réponses courtes/robustes
-                "temperature": 0.3,     # Fidélité > créativité
-                "top_p": 0.9,
-                "stream": False,
-            }
-
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-                "X-SCW-Region": self.region,
-            }
-            if self.project_id:
-                headers["X-SCW-Project-ID"] = self.project_id
-
-            timeout = aiohttp.ClientTimeout(total=30)
-
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(
-                    f"{self.api_url}/chat/completions",
-                    json=payload,
-                    headers=headers
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(
-                            "Scaleway AI API error - Status: %d, Response: %s",
-                            response.status,
-                            error_text
-                        )
-                        raise ProcessingError(f"Erreur API Scaleway ({response.status}): {error_text}")
-                    result = await response.json()
+            # Modèle, max_tokens (réponses courtes), température (fidélité > créativité)
+            # et timeout : cf. settings.AI_ROUTES["reformulate"]
+            messages = [
+                {"role": "system", "content": self._get_system_prompt(request.type)},
+                {"role": "user", "content": self._get_user_prompt(request.text, request.type, request.context)},
+            ]
+
+            result = await self._chat_completion("reformulate", messages)
 
             # Extraction de la réponse
             if "choices" not in result or not result["choices"]:
@@ -289,6 +589,10 @@ de conformité."
                 len(ai_text),
                 ai_text[:50] + "..." if len(ai_text) > 50 else ai_text
             )
+            if settings.AI_REFORMULATION_DEDUP_ENABLED:
+                _reformulation_index.add(
+                    request.text, (words, ai_text), namespace=namespace
+                )
 
             return ReformulationResponse(
                 original_text=request.text,
@@ -369,22 +673,118 @@ ENTRÉES
             t = re.sub(r"^```(?:json)?\s*|\s*```$", "", t, flags=re.IGNORECASE).strip()
         return t
 
+    @classmethod
+    def _parse_product_output(cls, ai_raw: str) -> ProductNormalizationOutput | None:
+        """Parse la sortie JSON du modèle ; None si elle est inexploitable."""
+        text = cls._strip_code_fences(ai_raw)
+        if not text.startswith("{"):
+            match = re.search(r"\{.*\}", text, flags=re.DOTALL)
+            if not match:
+                return None
+            text = match.group(0)
+        try:
+            data = json.loads(text)
+            return ProductNormalizationOutput.model_validate(data)
+        except (ValueError, TypeError):
+            return None
+
     @staticmethod
     def _join_article_and_nom(article: str, nom: str) -> str:
-        a = (article or "").strip()
-        n = (nom or "").strip()
-        # Uniformiser l'apostrophe d'élision
-        a = a.replace("'", "’")
-        if a.lower().startswith("l"):
-            if not a.endswith("’"):
-                a = "l’"
-            return f"{a}{n.lstrip()}"
-        return f"{a} {n}".strip()
+        return join_article_and_nom(article, nom)
+
+    @staticmethod
+    def _record_normalization_source(source: Literal["local", "model"]) -> None:
+        PRODUCT_NORMALIZATION_TOTAL.inc(source=source)
+        local = PRODUCT_NORMALIZATION_TOTAL.value(source="local")
+        total = local + PRODUCT_NORMALIZATION_TOTAL.value(source="model")
+        PRODUCT_NORMALIZATION_LOCAL_RATIO.set(local / total)
+
+    @staticmethod
+    def _lookup_cached_product_name(
+        request: ProductNormalizationRequest,
+    ) -> ProductNormalizationResponse | None:
+        cached = _product_name_cache.get(product_cache_key(request.declared_type, request.raw_name))
+        PRODUCT_NORMALIZATION_CACHE_TOTAL.inc(result="hit" if cached else "miss")
+        if cached is None:
+            return None
+        return cached.model_copy(update={"raw_name": request.raw_name})
 
     async def normalize_product_name(
         self,
         request: ProductNormalizationRequest
     ) -> ProductNormalizationResponse:
+        cached = self._lookup_cached_product_name(request)
+        if cached is not None:
+            return cached
+        return await self._normalize_product_name_uncached(request)
+
+    async def normalize_product_names(
+        self,
+        requests: list[ProductNormalizationRequest],
+    ) -> list[ProductNormalizationResponse]:
+        """Normalise un lot : cache d'abord, puis les absents (dédupliqués) avec une
+        concurrence bornée. Résultats dans l'ordre des entrées, erreurs par élément."""
+        results: list[ProductNormalizationResponse | None] = [
+            self._lookup_cached_product_name(req) for req in requests
+        ]
+        misses: dict[ProductCacheKey, ProductNormalizationRequest] = {}
+        for req, res in zip(requests, results):
+            if res is None:
+                misses.setdefault(product_cache_key(req.declared_type, req.raw_name), req)
+
+        semaphore = asyncio.Semaphore(settings.PRODUCT_NORMALIZATION_BATCH_CONCURRENCY)
+
+        async def _resolve(req: ProductNormalizationRequest) -> ProductNormalizationResponse:
+            async with semaphore:
+                return await self._normalize_product_name_uncached(req)
+
+        resolved = dict(
+            zip(misses, await asyncio.gather(*(_resolve(r) for r in misses.values())))
+        )
+        logger.info(
+            "Batch product normalization - Items: %d, Cache hits: %d, Misses: %d",
+            len(requests),
+            sum(1 for r in results if r is not None),
+            len(misses),
+        )
+
+        ordered: list[ProductNormalizationResponse] = []
+        for req, res in zip(requests, results):
+            if res is None:
+                key = product_cache_key(req.declared_type, req.raw_name)
+                res = resolved[key].model_copy(update={"raw_name": req.raw_name})
+            ordered.append(res)
+        return ordered
+
+    async def _normalize_product_name_uncached(
+        self,
+        request: ProductNormalizationRequest
+    ) -> ProductNormalizationResponse:
+        # Fast path : cas triviaux résolus par règles locales, sans appel IA
+        if settings.PRODUCT_NORMALIZATION_LOCAL_RULES:
+            local = resolve_locally(request.declared_type, request.raw_name)
+            if local is not None:
+                self._record_normalization_source("local")
+                logger.info(
+                    "Product name resolved locally: %s -> %s",
+                    request.raw_name,
+                    local.group_noun,
+                )
+                response = ProductNormalizationResponse(
+                    declared_type=request.declared_type,
+                    raw_name=request.raw_name,
+                    product_name_formatted=local.group_noun,
+                    group_noun=local.group_noun,
+                    acquisition_prefix=local.acquisition_prefix,
+                    success=True,
+                )
+                # Mis en cache comme une réponse du modèle : is_product_name_cached
+                # (pré-normalisation) les voit comme déjà résolus
+                _product_name_cache.set(
+                    product_cache_key(request.declared_type, request.raw_name), response
+                )
+                return response
+
         if not self.api_key:
             logger.error("Scaleway AI not configured")
             return ProductNormalizationResponse(
@@ -457,49 +857,71 @@ ENTRÉES
                 "Renvoie UNIQUEMENT : {\"group_noun\":\"...\",\"acquisition_prefix\":\"...\"}"
             )
 
-            payload = {
-                "model": self.model,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    *fewshots,
-                    {"role": "user", "content": user_prompt},
-                ],
-                "max_tokens": 120,
-                "temperature": 0.1,
-                "top_p": 0.7,
-                "stream": False,
-            }
-
-
-
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-                "X-SCW-Region": self.region,
-            }
-            if self.project_id:
-                headers["X-SCW-Project-ID"] = self.project_id
-
-            async with aiohttp.ClientSession() as session:
-                async with session.post(f"{self.api_url}/chat/completions", json=payload, headers=headers) as response:
-                    if response.status != 200:
-                        err_text = await response.text()
-                        raise ProcessingError(f"Erreur API Scaleway ({response.status}): {err_text}")
-
-                    result = await response.json()
+            messages = [
+                {"role": "system", "content": system_prompt},
+                *fewshots,
+                {"role": "user", "content": user_prompt},
+            ]
 
+            response_format = (
+                _PRODUCT_NORMALIZATION_RESPONSE_FORMAT if settings.AI_STRUCTURED_OUTPUT else None
+            )
+            result = await self._chat_completion(
+                "normalize", messages, response_format=response_format
+            )
             ai_raw = result["choices"][0]["message"]["content"].strip()
-
-            # Nettoyage minimal : pas de point final, pas de majuscules forcées
-            ai_text = ai_raw.rstrip(".!? ").strip()
-
-            return ProductNormalizationResponse(
+            self._record_normalization_source("model")
+
+            parsed = self._parse_product_output(ai_raw)
+            if parsed is None:
+                # Une seule tentative de réparation, bornée : on renvoie la sortie fautive
+                PRODUCT_NORMALIZATION_PARSE_FAILURES.inc(stage="initial")
+                logger.warning("Unparseable product normalization output: %s", ai_raw[:200])
+                repair_messages = [
+                    *messages,
+                    {"role": "assistant", "content": ai_raw},
+                    {
+                        "role": "user",
+                        "content": (
+                            "Sortie invalide. Renvoie UNIQUEMENT le JSON compact "
+                            '{"group_noun":"...","acquisition_prefix":"..."} '
+                            'avec acquisition_prefix parmi "", "de ", "d’", "du ", "des ".'
+                        ),
+                    },
+                ]
+                result = await self._chat_completion(
+                    "normalize", repair_messages, response_format=response_format
+                )
+                ai_raw = result["choices"][0]["message"]["content"].strip()
+                parsed = self._parse_product_output(ai_raw)
+                if parsed is None:
+                    PRODUCT_NORMALIZATION_PARSE_FAILURES.inc(stage="repair")
+                    raise ProcessingError(
+                        "Réponse IA de normalisation illisible",
+                        error_code="AI_PARSE_FAILED",
+                    )
+
+            response = ProductNormalizationResponse(
                 declared_type=request.declared_type,
                 raw_name=request.raw_name,
-                product_name_formatted=ai_text,
+                product_name_formatted=parsed.group_noun,
+                group_noun=parsed.group_noun,
+                acquisition_prefix=parsed.acquisition_prefix,
                 success=True,
             )
+            _product_name_cache.set(
+                product_cache_key(request.declared_type, request.raw_name), response
+            )
+            return response
 
+        except AIOverloadedError as e:
+            logger.warning("Normalisation délestée (%s): %s", self.priority.value, request.raw_name)
+            return ProductNormalizationResponse(
+                declared_type=request.declared_type,
+                raw_name=request.raw_name,
+                success=False,
+                error=e.message,
+            )
         except Exception as e:
             logger.error("Erreur IA normalize_product_name: %s", e, exc_info=True)
             return ProductNormalizationResponse(
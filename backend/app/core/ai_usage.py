@@ -0,0 +1,153 @@
+"""Comptabilité des appels IA : tokens, latence et statut HTTP.
+
+Chaque appel `/chat/completions` est enregistré dans les métriques Prometheus
+et dans une fenêtre glissante (par worker) servant au résumé `GET /ai/usage`.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import math
+import time
+from collections import deque
+from collections.abc import Sequence
+
+from pydantic import BaseModel
+
+from app.config import settings
+from app.utils.metrics import registry
+
+AI_REQUESTS_TOTAL = registry.counter(
+    "ai_requests_total",
+    "Appels à l'API IA, par opération, modèle et statut HTTP (error = pas de réponse)",
+    ("operation", "model", "status"),
+)
+AI_REQUEST_DURATION = registry.histogram(
+    "ai_request_duration_seconds",
+    "Latence amont des appels IA",
+    ("operation", "model"),
+)
+AI_TOKENS_TOTAL = registry.counter(
+    "ai_tokens_total",
+    "Tokens consommés par les appels IA (kind = prompt | completion)",
+    ("operation", "model", "kind"),
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class AICallRecord:
+    operation: str
+    model: str
+    status: int | None  # None : erreur réseau / timeout, pas de réponse HTTP
+    latency_seconds: float
+    prompt_tokens: int
+    completion_tokens: int
+    hedged: bool = False
+    # Seconde requête d'un appel couvert : comptée pour ses tokens, pas comme appel
+    hedge_attempt: bool = False
+    cancelled: bool = False  # perdante annulée : tokens estimés sur la gagnante
+    timestamp: float = dataclasses.field(default_factory=time.time)
+
+
+class AIOperationUsage(BaseModel):
+    operation: str
+    model: str
+    calls: int
+    errors: int
+    hedged: int
+    hedge_attempts: int
+    prompt_tokens_total: int
+    completion_tokens_total: int
+    prompt_tokens_avg: float
+    completion_tokens_avg: float
+    latency_p50_ms: float
+    latency_p95_ms: float
+    latency_max_ms: float
+
+
+class AIUsageSummary(BaseModel):
+    window_size: int
+    calls: int
+    since: float | None
+    operations: list[AIOperationUsage]
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Percentile (interpolation linéaire) d'une séquence déjà triée."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * q
+    low, high = math.floor(rank), math.ceil(rank)
+    if low == high:
+        return sorted_values[low]
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+class AIUsageTracker:
+    def __init__(self, window_size: int) -> None:
+        self._records: deque[AICallRecord] = deque(maxlen=window_size)
+
+    def record(self, call: AICallRecord) -> None:
+        self._records.append(call)
+        status = (
+            "cancelled"
+            if call.cancelled
+            else str(call.status)
+            if call.status is not None
+            else "error"
+        )
+        AI_REQUESTS_TOTAL.inc(operation=call.operation, model=call.model, status=status)
+        AI_REQUEST_DURATION.observe(
+            call.latency_seconds, operation=call.operation, model=call.model
+        )
+        if call.prompt_tokens:
+            AI_TOKENS_TOTAL.inc(
+                call.prompt_tokens, operation=call.operation, model=call.model, kind="prompt"
+            )
+        if call.completion_tokens:
+            AI_TOKENS_TOTAL.inc(
+                call.completion_tokens,
+                operation=call.operation,
+                model=call.model,
+                kind="completion",
+            )
+
+    def summary(self) -> AIUsageSummary:
+        groups: dict[tuple[str, str], list[AICallRecord]] = {}
+        for call in self._records:
+            groups.setdefault((call.operation, call.model), []).append(call)
+
+        operations = []
+        for (operation, model), records in sorted(groups.items()):
+            # Tokens : toutes les requêtes ; appels, erreurs, latences : appels logiques
+            calls = [c for c in records if not c.hedge_attempt] or records
+            latencies = sorted(c.latency_seconds * 1000 for c in calls)
+            prompt = sum(c.prompt_tokens for c in records)
+            completion = sum(c.completion_tokens for c in records)
+            operations.append(
+                AIOperationUsage(
+                    operation=operation,
+                    model=model,
+                    calls=len(calls),
+                    errors=sum(1 for c in calls if c.status != 200),
+                    hedged=sum(1 for c in calls if c.hedged),
+                    hedge_attempts=sum(1 for c in records if c.hedge_attempt),
+                    prompt_tokens_total=prompt,
+                    completion_tokens_total=completion,
+                    prompt_tokens_avg=round(prompt / len(calls), 1),
+                    completion_tokens_avg=round(completion / len(calls), 1),
+                    latency_p50_ms=round(percentile(latencies, 0.5), 1),
+                    latency_p95_ms=round(percentile(latencies, 0.95), 1),
+                    latency_max_ms=round(latencies[-1], 1),
+                )
+            )
+
+        return AIUsageSummary(
+            window_size=self._records.maxlen or 0,
+            calls=sum(1 for c in self._records if not c.hedge_attempt),
+            since=self._records[0].timestamp if self._records else None,
+            operations=operations,
+        )
+
+
+ai_usage_tracker = AIUsageTracker(window_size=settings.AI_USAGE_WINDOW_SIZE)
@@ -0,0 +1,172 @@
+"""Autosave en écriture différée (write-behind), par worker.
+
+Le formulaire s'enregistre presque à chaque frappe. En mode écriture différée,
+les patchs d'un même brouillon sont fusionnés en mémoire puis écrits toutes
+les `DRAFT_AUTOSAVE_FLUSH_INTERVAL_MS` ms, ou dès que
+`DRAFT_AUTOSAVE_FLUSH_MAX_DRAFTS` brouillons sont en attente, par un seul
+`UPDATE ... FROM unnest(...)` : le débit d'écriture suit le nombre
+d'utilisateurs actifs, plus le nombre de frappes.
+
+- le premier autosave d'un brouillon (inconnu du worker) reste synchrone : il
+  crée le brouillon et le cookie si besoin, et vérifie qu'il n'a pas expiré ;
+- une lecture du brouillon, un événement du funnel, la soumission et l'arrêt
+  du worker forcent l'écriture ; un échec remet les patchs en attente (sous
+  les plus récents) et rend ces brouillons inconnus : leur prochain autosave
+  écrit d'abord le patch en attente, puis redevient synchrone, et l'état
+  renvoyé au client est de nouveau celui de la base ;
+- au-delà de deux fois le seuil en attente (base indisponible), l'autosave
+  redevient synchrone pour que l'erreur remonte au client.
+
+Prérequis : affinité de session (un brouillon toujours servi par le même
+worker). Le tampon est propre à chaque worker ; sans affinité, deux workers
+écrivent dans le désordre les patchs d'un même brouillon et renvoient chacun
+un état incomplet. Mode désactivé par défaut (`DRAFT_AUTOSAVE_WRITE_BEHIND`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import uuid
+from typing import Any
+
+from app.config import settings
+from app.core.form_draft_repository import PostgresFormDraftRepository
+from app.db.connection import DatabasePool, db_pool
+from app.utils.metrics import registry
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+DRAFT_AUTOSAVE_TOTAL = registry.counter(
+    "draft_autosave_total",
+    "Autosaves de brouillon (buffered / direct)",
+    ("mode",),
+)
+DRAFT_AUTOSAVE_FLUSH_TOTAL = registry.counter(
+    "draft_autosave_flush_total",
+    "Écritures du tampon d'autosave (ok / failed)",
+    ("result",),
+)
+DRAFT_AUTOSAVE_FLUSHED_DRAFTS_TOTAL = registry.counter(
+    "draft_autosave_flushed_drafts_total",
+    "Brouillons écrits par le tampon d'autosave",
+)
+
+
+class DraftAutosaveBuffer:
+    def __init__(self, pool: DatabasePool, flush_interval_ms: int, max_drafts: int) -> None:
+        self._pool = pool
+        self._interval = flush_interval_ms / 1000
+        self._max_drafts = max_drafts
+        self._pending: dict[uuid.UUID, dict[str, Any]] = {}
+        # Brouillons déjà écrits de façon synchrone par ce worker (existants, non
+        # expirés) et leur état complet tel que ce worker le connaît
+        self._known: TTLCache[uuid.UUID, dict[str, Any]] = TTLCache(10_000, 5 * 60)
+        # Sérialise les écritures : les patchs d'un brouillon partent dans l'ordre
+        self._lock = asyncio.Lock()
+        self._full = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._task is not None
+
+    def mark_known(self, draft_id: uuid.UUID, data: dict[str, Any]) -> None:
+        self._known.set(draft_id, dict(data))
+
+    def add(
+        self, draft_id: uuid.UUID, patch: dict[str, Any]
+    ) -> tuple[dict[str, Any], dict[str, Any]] | None:
+        """Met le patch en attente et renvoie l'état complet du brouillon (écrit +
+        en attente) avant et après le patch ; None si l'autosave doit être
+        synchrone."""
+        known = self._known.get(draft_id) if self.enabled else None
+        if known is None or len(self._pending) >= 2 * self._max_drafts:
+            DRAFT_AUTOSAVE_TOTAL.inc(mode="direct")
+            return None
+        previous = dict(known)
+        self._pending[draft_id] = {**self._pending.get(draft_id, {}), **patch}
+        # Mis à jour sur place : l'échéance de revérification reste inchangée
+        known.update(patch)
+        if len(self._pending) >= self._max_drafts:
+            self._full.set()
+        DRAFT_AUTOSAVE_TOTAL.inc(mode="buffered")
+        return previous, dict(known)
+
+    def _requeue(self, batch: dict[uuid.UUID, dict[str, Any]]) -> None:
+        for draft_id, patch in batch.items():
+            self._pending[draft_id] = {**patch, **self._pending.get(draft_id, {})}
+
+    async def _write(self, batch: dict[uuid.UUID, dict[str, Any]]) -> None:
+        engine = await self._pool.get_engine()
+        try:
+            async with engine.begin() as conn:
+                updated = await PostgresFormDraftRepository(conn).apply_patches(batch)
+        except Exception:
+            self._requeue(batch)
+            # L'état connu inclut des patchs non écrits : retour au synchrone
+            for draft_id in batch:
+                self._known.pop(draft_id)
+            DRAFT_AUTOSAVE_FLUSH_TOTAL.inc(result="failed")
+            raise
+        DRAFT_AUTOSAVE_FLUSH_TOTAL.inc(result="ok")
+        DRAFT_AUTOSAVE_FLUSHED_DRAFTS_TOTAL.inc(updated)
+        if updated < len(batch):
+            logger.warning(
+                "Autosave flush - %d of %d drafts missing or expired",
+                len(batch) - updated,
+                len(batch),
+            )
+
+    async def flush(self) -> None:
+        async with self._lock:
+            batch, self._pending = self._pending, {}
+            if batch:
+                await self._write(batch)
+
+    async def flush_draft(self, draft_id: uuid.UUID) -> None:
+        """Écrit tout de suite le patch en attente du brouillon (avant une lecture
+        ou une soumission)."""
+        # Écriture en cours : elle peut contenir un patch de ce brouillon
+        if draft_id not in self._pending and not self._lock.locked():
+            return
+        async with self._lock:
+            patch = self._pending.pop(draft_id, None)
+            if patch is not None:
+                await self._write({draft_id: patch})
+
+    async def _loop(self) -> None:
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._full.wait(), timeout=self._interval)
+            self._full.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("Autosave flush failed: %s", e)
+
+    def start(self) -> None:
+        if settings.DRAFT_AUTOSAVE_WRITE_BEHIND and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(
+                "Autosave flush on shutdown failed, %d drafts lost: %s", len(self._pending), e
+            )
+
+
+draft_autosave_buffer = DraftAutosaveBuffer(
+    db_pool,
+    flush_interval_ms=settings.DRAFT_AUTOSAVE_FLUSH_INTERVAL_MS,
+    max_drafts=settings.DRAFT_AUTOSAVE_FLUSH_MAX_DRAFTS,
+)
@@ -0,0 +1,112 @@
+"""Agrégat incrémental du funnel des brouillons (tâche de fond).
+
+`form_draft_funnel_daily` compte, par jour, formulaire et type d'événement, les
+événements et les brouillons atteignant l'étape pour la première fois. Ce
+premier passage est gardé dans `form_draft_funnel_reached` (une ligne par
+brouillon et étape) : la suppression des partitions d'événements ne le fait pas
+recompter.
+
+Chaque passage n'agrège que les événements postérieurs au filigrane
+(`rollup_watermark`), par fenêtres bornées dans des transactions courtes ;
+l'agrégat, les premiers passages et le filigrane avancent dans la même requête.
+
+Les événements des `DRAFT_FUNNEL_LAG_SECONDS` dernières secondes sont laissés
+au passage suivant : une transaction encore ouverte peut y insérer des
+événements datés d'avant son commit. Un verrou consultatif garantit qu'un seul
+worker exécute le passage.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from datetime import UTC, datetime
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config import settings
+from app.db.connection import DatabasePool, db_pool, try_advisory_lock
+from app.db.prepared import form_draft_querier
+from app.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Clé du verrou consultatif (pg_try_advisory_lock) de l'agrégat du funnel
+_FUNNEL_LOCK_KEY = 7_301_047
+
+DRAFT_FUNNEL_ROLLUP_GROUPS_TOTAL = registry.counter(
+    "draft_funnel_rollup_groups_total",
+    "Lignes (jour, formulaire, événement) mises à jour par l'agrégat du funnel",
+)
+DRAFT_FUNNEL_ROLLUP_DELAY = registry.gauge(
+    "draft_funnel_rollup_delay_seconds",
+    "Retard du filigrane de l'agrégat du funnel sur l'heure courante",
+)
+
+
+class DraftFunnelRollupJob:
+    def __init__(self, pool: DatabasePool) -> None:
+        self._pool = pool
+        self._task: asyncio.Task[None] | None = None
+
+    async def run_once(self) -> None:
+        engine = await self._pool.get_engine()
+        async with engine.connect() as conn:
+            async with try_advisory_lock(conn, _FUNNEL_LOCK_KEY) as locked:
+                if not locked:
+                    logger.debug("Draft funnel rollup already running on another worker")
+                    return
+                await self._run_locked(conn)
+
+    async def _run_locked(self, conn: AsyncConnection) -> None:
+        querier = form_draft_querier(conn)
+        groups, windows = 0, 0
+        processed_until: datetime | None = None
+        for _ in range(settings.DRAFT_FUNNEL_MAX_WINDOWS):
+            row = await querier.rollup_draft_funnel(
+                lag_seconds=settings.DRAFT_FUNNEL_LAG_SECONDS,
+                window_hours=settings.DRAFT_FUNNEL_WINDOW_HOURS,
+                time_zone=settings.DRAFT_FUNNEL_TIMEZONE,
+            )
+            await conn.commit()
+            if row is None:
+                break
+            windows += 1
+            groups += row.groups
+            processed_until = row.processed_until
+            if row.caught_up:
+                break
+
+        DRAFT_FUNNEL_ROLLUP_GROUPS_TOTAL.inc(groups)
+        if processed_until is not None:
+            delay = (datetime.now(UTC) - processed_until).total_seconds()
+            DRAFT_FUNNEL_ROLLUP_DELAY.set(max(delay, 0.0))
+        logger.debug(
+            "Draft funnel rollup - Windows: %d, groups: %d, processed until: %s",
+            windows,
+            groups,
+            processed_until,
+        )
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error("Draft funnel rollup failed: %s", e)
+            await asyncio.sleep(settings.DRAFT_FUNNEL_ROLLUP_INTERVAL_SECONDS)
+
+    def start(self) -> None:
+        if settings.DRAFT_FUNNEL_ROLLUP_ENABLED and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+draft_funnel_rollup_job = DraftFunnelRollupJob(db_pool)
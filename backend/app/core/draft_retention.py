@@ -0,0 +1,177 @@
+"""Rétention des brouillons et des événements du funnel (tâche de fond).
+
+À chaque passage :
+- partitions mensuelles de `form_draft_event` créées d'avance (pas de
+  partition DEFAULT : un mois sans partition ferait échouer les insertions,
+  d'où la jauge `draft_event_partitions_covered_until_seconds` à surveiller) ;
+- partitions sorties de la rétention détachées (DETACH ... CONCURRENTLY, hors
+  transaction, sans bloquer les écritures) puis supprimées (DROP TABLE, sans
+  DELETE ni vacuum) ;
+- brouillons `editing` inactifs passés en `expired`, puis brouillons expirés
+  (ou abandonnés) supprimés après un délai de grâce, une fois leurs événements
+  agrégés par le funnel (filigrane au-delà de leur dernière activité).
+
+Expiration et purge se font par petits lots, chacun dans sa transaction
+(verrous courts, `SKIP LOCKED`), avec une pause entre les lots. Un verrou
+consultatif garantit qu'un seul worker exécute le passage.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.config import settings
+from app.db.connection import DatabasePool, db_pool, try_advisory_lock
+from app.db.prepared import form_draft_querier
+from app.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Clé du verrou consultatif (pg_try_advisory_lock) du passage de rétention
+_RETENTION_LOCK_KEY = 7_301_046
+
+DRAFT_RETENTION_ROWS_TOTAL = registry.counter(
+    "draft_retention_rows_total",
+    "Brouillons traités par la rétention (expired / purged)",
+    ("action",),
+)
+DRAFT_EVENT_PARTITIONS_TOTAL = registry.counter(
+    "draft_event_partitions_total",
+    "Partitions mensuelles de form_draft_event (created / dropped)",
+    ("action",),
+)
+DRAFT_EVENT_PARTITIONS_COVERED_UNTIL = registry.gauge(
+    "draft_event_partitions_covered_until_seconds",
+    "Fin (timestamp Unix) de la dernière partition de form_draft_event ; "
+    "au-delà, les événements sont refusés (alerter à moins de 7 jours)",
+)
+
+# En deçà, la création des partitions à venir a manifestement échoué
+_PARTITIONS_COVERAGE_WARNING_SECONDS = 7 * 24 * 3600
+
+
+class DraftRetentionJob:
+    def __init__(self, pool: DatabasePool) -> None:
+        self._pool = pool
+        self._task: asyncio.Task[None] | None = None
+
+    async def _in_batches(
+        self, conn: AsyncConnection, batch: Callable[[], Awaitable[int]]
+    ) -> int:
+        total = 0
+        for _ in range(settings.DRAFT_RETENTION_MAX_BATCHES):
+            count = await batch()
+            await conn.commit()
+            total += count
+            if count < settings.DRAFT_RETENTION_BATCH_SIZE:
+                break
+            await asyncio.sleep(settings.DRAFT_RETENTION_BATCH_PAUSE_SECONDS)
+        return total
+
+    async def run_once(self) -> None:
+        engine = await self._pool.get_engine()
+        async with engine.connect() as conn:
+            async with try_advisory_lock(conn, _RETENTION_LOCK_KEY) as locked:
+                if not locked:
+                    logger.debug("Draft retention already running on another worker")
+                    return
+                await self._run_locked(engine, conn)
+
+    async def _drop_expired_partitions(
+        self, engine: AsyncEngine, conn: AsyncConnection
+    ) -> int:
+        querier = form_draft_querier(conn)
+        expired = [
+            row
+            async for row in querier.list_expired_draft_event_partitions(
+                retention_months=settings.DRAFT_EVENT_RETENTION_MONTHS
+            )
+        ]
+        await conn.commit()
+        if not expired:
+            return 0
+        # DETACH ... CONCURRENTLY est refusé dans un bloc de transaction
+        async with engine.connect() as ddl:
+            ddl = await ddl.execution_options(isolation_level="AUTOCOMMIT")
+            for row in expired:
+                # Nom issu de pg_class, filtré par ^form_draft_event_[0-9]{6}$
+                partition = f'"{row.partition_name}"'
+                detach = f"ALTER TABLE form_draft_event DETACH PARTITION {partition}"
+                if row.detach_pending:
+                    # DETACH CONCURRENTLY interrompu lors d'un passage précédent
+                    await ddl.execute(text(f"{detach} FINALIZE"))
+                elif row.attached:
+                    await ddl.execute(text(f"{detach} CONCURRENTLY"))
+                await ddl.execute(text(f"DROP TABLE {partition}"))
+        return len(expired)
+
+    async def _run_locked(self, engine: AsyncEngine, conn: AsyncConnection) -> None:
+        querier = form_draft_querier(conn)
+
+        created = await querier.ensure_draft_event_partitions(
+            months_ahead=settings.DRAFT_EVENT_PARTITIONS_AHEAD
+        )
+        covered_until = await querier.get_draft_event_partitions_covered_until()
+        await conn.commit()
+        DRAFT_EVENT_PARTITIONS_TOTAL.inc(created or 0, action="created")
+        if covered_until is not None:
+            DRAFT_EVENT_PARTITIONS_COVERED_UNTIL.set(covered_until.timestamp())
+        remaining = covered_until.timestamp() - time.time() if covered_until else 0.0
+        if remaining < _PARTITIONS_COVERAGE_WARNING_SECONDS:
+            logger.warning("Draft event partitions only cover until %s", covered_until)
+
+        dropped = await self._drop_expired_partitions(engine, conn)
+        DRAFT_EVENT_PARTITIONS_TOTAL.inc(dropped, action="dropped")
+
+        expired = await self._in_batches(
+            conn,
+            lambda: querier.expire_stale_drafts(
+                stale_after_days=settings.DRAFT_STALE_AFTER_DAYS,
+                batch_size=settings.DRAFT_RETENTION_BATCH_SIZE,
+            ),
+        )
+        purged = await self._in_batches(
+            conn,
+            lambda: querier.purge_expired_drafts(
+                purge_after_days=settings.DRAFT_PURGE_AFTER_DAYS,
+                batch_size=settings.DRAFT_RETENTION_BATCH_SIZE,
+            ),
+        )
+        DRAFT_RETENTION_ROWS_TOTAL.inc(expired, action="expired")
+        DRAFT_RETENTION_ROWS_TOTAL.inc(purged, action="purged")
+        logger.info(
+            "Draft retention - Partitions created: %d, dropped: %d, drafts expired: %d, purged: %d",
+            created or 0,
+            dropped,
+            expired,
+            purged,
+        )
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error("Draft retention failed: %s", e)
+            await asyncio.sleep(settings.DRAFT_RETENTION_INTERVAL_SECONDS)
+
+    def start(self) -> None:
+        if settings.DRAFT_RETENTION_ENABLED and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+draft_retention_job = DraftRetentionJob(db_pool)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import contextlib
+import datetime
 import json
 import logging
 import os
@@ -9,10 +10,17 @@ from typing import Any, Protocol
 
 from fastapi import Request, Response
 from itsdangerous import BadSignature, URLSafeSerializer
-from sqlalchemy.ext.asyncio import AsyncConnection
 
-from app.db.generated import form_draft as form_draft_sqlc
-from app.models.form_draft import DraftEventType, FormDraft
+from app.db.connection import DBConnection
+from app.db.prepared import form_draft_querier
+from app.models.form_draft import (
+    DraftEventType,
+    DraftFunnelCount,
+    DraftFunnelStats,
+    DraftMergeResult,
+    DraftStatus,
+    FormDraft,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +45,29 @@ def _unsign(token: str) -> dict[str, Any] | None:
     return None
 
 
+def _draft_id_from_cookie(request: Request, form_slug: str | None) -> uuid.UUID | None:
+    """Identifiant du brouillon signé dans le cookie, s'il est pour ce formulaire
+    (`None` : quel que soit le formulaire)."""
+    token = request.cookies.get(DRAFT_COOKIE_NAME)
+    data = _unsign(token) if token else None
+    if data and form_slug in (None, data.get("form_slug")):
+        with contextlib.suppress(ValueError):
+            return uuid.UUID(str(data["draft_id"]))
+    return None
+
+
+def _set_draft_cookie(response: Response, draft_id: uuid.UUID, form_slug: str) -> None:
+    response.set_cookie(
+        DRAFT_COOKIE_NAME,
+        _sign(draft_id, form_slug),
+        httponly=True,
+        secure=IS_PRODUCTION,
+        samesite="lax",
+        max_age=60 * 60 * 24 * 30,
+        path="/",
+    )
+
+
 def _client_ip_ua(request: Request) -> tuple[str | None, str | None]:
     ip = request.headers.get("x-forwarded-for") or (
         request.client.host if request.client else None
@@ -91,6 +122,9 @@ def _row_to_form_draft(row: Any) -> FormDraft:
         except Exception as exc:
             raise TypeError(f"Unsupported sqlc row type: {type(row)!r}") from exc
 
+    # Colonne annexe de MergeDraftData, hors FormDraft
+    data.pop("previous_data", None)
+
     # Nettoyer les données JSONB si nécessaire
     if data.get("data"):
         try:
@@ -110,41 +144,69 @@ class FormDraftRepositoryProtocol(Protocol):
         self, request: Request, response: Response, form_slug: str
     ) -> FormDraft: ...
 
+    def draft_id_from_cookie(
+        self, request: Request, form_slug: str | None = None
+    ) -> uuid.UUID | None: ...
+
     async def get_from_cookie(self, request: Request) -> FormDraft | None: ...
 
-    async def update_data(
+    async def merge_from_cookie(
         self,
-        draft_id: uuid.UUID,
-        data: dict[str, Any],
+        request: Request,
+        response: Response,
+        form_slug: str,
+        patch: dict[str, Any],
         last_event: str | None = None,
-    ) -> None: ...
+    ) -> DraftMergeResult: ...
+
+    async def apply_patches(self, patches: dict[uuid.UUID, dict[str, Any]]) -> int: ...
 
     async def mark_submitted(self, draft_id: uuid.UUID) -> None: ...
 
-    async def add_event(
+    async def record_event(
         self,
         draft_id: uuid.UUID,
         event_type: DraftEventType,
         meta: dict[str, Any] | None,
-    ) -> None: ...
+    ) -> bool: ...
+
+    async def record_event_from_cookie(
+        self,
+        request: Request,
+        response: Response,
+        form_slug: str,
+        event_type: DraftEventType,
+        meta: dict[str, Any] | None,
+    ) -> uuid.UUID: ...
+
+    async def get_funnel_stats(
+        self, day_from: datetime.date, day_to: datetime.date, form_slug: str | None
+    ) -> DraftFunnelStats: ...
 
 
 class PostgresFormDraftRepository(FormDraftRepositoryProtocol):
     """Repository fin au-dessus du code sqlc (psycopg AsyncConnection)."""
 
-    def __init__(self, db_connection: AsyncConnection):
-        self._querier = form_draft_sqlc.AsyncQuerier(db_connection)
+    def __init__(
+        self,
+        db_connection: DBConnection,
+        read_connection: DBConnection | None = None,
+    ):
+        # Lectures pures (get_from_cookie) sur `read_connection` (réplica possible) ;
+        # lecture avant écriture (autosave) et écritures sur le primaire
+        self._querier = form_draft_querier(db_connection)
+        self._read_querier = (
+            form_draft_querier(read_connection) if read_connection is not None else self._querier
+        )
 
     async def get_from_cookie_or_create(
         self, request: Request, response: Response, form_slug: str
     ) -> FormDraft:
-        if token := request.cookies.get(DRAFT_COOKIE_NAME):
-            data = _unsign(token)
-            if data and data.get("form_slug") == form_slug:
-                draft_id = uuid.UUID(str(data["draft_id"]))
-                row = await self._querier.get_draft(id=draft_id)
-                if row:
-                    return _row_to_form_draft(row)
+        if draft_id := _draft_id_from_cookie(request, form_slug):
+            row = await self._querier.get_draft(id=draft_id)
+            # Un brouillon expiré va être purgé : on en recommence un
+            if row and row.status != DraftStatus.EXPIRED:
+                return _row_to_form_draft(row)
 
         ip, ua = _client_ip_ua(request)
         row = await self._querier.create_draft(
@@ -152,17 +214,44 @@ class PostgresFormDraftRepository(FormDraftRepositoryProtocol):
             data=_safe_json_dumps({}),
         )
         draft = _row_to_form_draft(row)
+        _set_draft_cookie(response, draft.id, form_slug)
+        return draft
+
+    def draft_id_from_cookie(
+        self, request: Request, form_slug: str | None = None
+    ) -> uuid.UUID | None:
+        return _draft_id_from_cookie(request, form_slug)
 
-        response.set_cookie(
-            DRAFT_COOKIE_NAME,
-            _sign(draft.id, form_slug),
-            httponly=True,
-            secure=IS_PRODUCTION,
-            samesite="lax",
-            max_age=60 * 60 * 24 * 30,
-            path="/",
+    async def merge_from_cookie(
+        self,
+        request: Request,
+        response: Response,
+        form_slug: str,
+        patch: dict[str, Any],
+        last_event: str | None = None,
+    ) -> DraftMergeResult:
+        """Autosave en une requête : `data || patch` côté serveur, sans lecture
+        préalable ; crée le brouillon (et le cookie) s'il n'y en a pas. Renvoie
+        aussi les données d'avant la fusion."""
+        json_patch = _safe_json_dumps(_clean_data_for_json(patch))
+        row = None
+        if draft_id := _draft_id_from_cookie(request, form_slug):
+            row = await self._querier.merge_draft_data(
+                id=draft_id, form_slug=form_slug, patch=json_patch, last_event=last_event
+            )
+        if row is None:
+            # Pas de cookie, ou brouillon expiré : on en recommence un
+            draft_id = uuid.uuid4()
+            row = await self._querier.merge_draft_data(
+                id=draft_id, form_slug=form_slug, patch=json_patch, last_event=last_event
+            )
+            _set_draft_cookie(response, draft_id, form_slug)
+        previous = row.previous_data
+        if isinstance(previous, str):
+            previous = json.loads(previous)
+        return DraftMergeResult(
+            draft=_row_to_form_draft(row), previous_data=previous or {}
         )
-        return draft
 
     async def get_from_cookie(self, request: Request) -> FormDraft | None:
         token = request.cookies.get(DRAFT_COOKIE_NAME)
@@ -179,7 +268,7 @@ class PostgresFormDraftRepository(FormDraftRepositoryProtocol):
             draft_id = uuid.UUID(str(data["draft_id"]))
             logger.info("Attempting to retrieve draft: %s", draft_id)
 
-            row = await self._querier.get_draft(id=draft_id)
+            row = await self._read_querier.get_draft(id=draft_id)
             if row:
                 draft = _row_to_form_draft(row)
                 logger.info(
@@ -196,44 +285,76 @@ class PostgresFormDraftRepository(FormDraftRepositoryProtocol):
             logger.error("Error retrieving draft: %s", e)
             return None
 
-    async def update_data(
-        self,
-        draft_id: uuid.UUID,
-        data: dict[str, Any],
-        last_event: str | None = None,
-    ) -> None:
-        existing_row = await self._querier.get_draft(id=draft_id)
-        if existing_row and existing_row.data:
-            existing_data = existing_row.data
-            merged_data = {**existing_data, **data}
-        else:
-            merged_data = data
-
-        # Nettoyer et sérialiser les données
-        cleaned_data = _clean_data_for_json(merged_data)
-        json_data = _safe_json_dumps(cleaned_data)
-
-        await self._querier.update_draft_data(
-            id=draft_id,
-            data=json_data,
-            last_event=last_event,
+    async def apply_patches(self, patches: dict[uuid.UUID, dict[str, Any]]) -> int:
+        """Un patch (fusion `data || patch`) par brouillon, tous en une requête ;
+        renvoie le nombre de brouillons mis à jour."""
+        ids = list(patches)
+        return await self._querier.apply_draft_patches(
+            ids=ids,
+            patches=[_safe_json_dumps(_clean_data_for_json(patches[i])) for i in ids],
         )
 
     async def mark_submitted(self, draft_id: uuid.UUID) -> None:
         await self._querier.mark_draft_submitted(id=draft_id)
 
-    async def add_event(
+    async def record_event(
         self,
         draft_id: uuid.UUID,
         event_type: DraftEventType,
         meta: dict[str, Any] | None,
-    ) -> None:
-        # Nettoyer les métadonnées
-        cleaned_meta = _clean_data_for_json(meta or {})
-        json_meta = _safe_json_dumps(cleaned_meta)
-
-        await self._querier.add_draft_event(
+    ) -> bool:
+        """Événement + last_event en une requête ; False si le brouillon n'existe
+        pas ou a expiré."""
+        recorded = await self._querier.record_draft_event(
             draft_id=draft_id,
             event_type=event_type.value,
-            meta=json_meta,
+            meta=_safe_json_dumps(_clean_data_for_json(meta or {})),
+        )
+        return bool(recorded)
+
+    async def record_event_from_cookie(
+        self,
+        request: Request,
+        response: Response,
+        form_slug: str,
+        event_type: DraftEventType,
+        meta: dict[str, Any] | None,
+    ) -> uuid.UUID:
+        """`record_event` sur le brouillon du cookie, sans le relire ; sans
+        brouillon utilisable, en crée un (et le cookie) puis enregistre."""
+        draft_id = _draft_id_from_cookie(request, form_slug)
+        if draft_id is not None and await self.record_event(draft_id, event_type, meta):
+            return draft_id
+        draft = await self.get_from_cookie_or_create(request, response, form_slug)
+        await self.record_event(draft.id, event_type, meta)
+        return draft.id
+
+    async def get_funnel_stats(
+        self, day_from: datetime.date, day_to: datetime.date, form_slug: str | None
+    ) -> DraftFunnelStats:
+        """Funnel servi par l'agrégat `form_draft_funnel_daily` (pas de parcours
+        des événements)."""
+        processed_until = await self._read_querier.get_draft_funnel_watermark()
+        days = [
+            DraftFunnelCount(
+                day=row.day,
+                form_slug=row.form_slug,
+                event_type=DraftEventType(row.event_type),
+                events=row.events,
+                drafts=row.drafts,
+            )
+            async for row in self._read_querier.list_draft_funnel_daily(
+                day_from=day_from, day_to=day_to, form_slug=form_slug
+            )
+        ]
+        totals = dict.fromkeys(DraftEventType, 0)
+        for count in days:
+            totals[count.event_type] += count.drafts
+        return DraftFunnelStats(
+            day_from=day_from,
+            day_to=day_to,
+            form_slug=form_slug,
+            processed_until=processed_until,
+            totals=totals,
+            days=days,
         )
@@ -6,24 +6,42 @@ from uuid import UUID
 
 from fastapi import Request, Response
 
+from app.core.autosave_buffer import DraftAutosaveBuffer
 from app.core.form_draft_repository import FormDraftRepositoryProtocol
-from app.models.form_draft import DraftEventType, DraftUpdateResult, FormDraft
+from app.core.product_prefetch import ProductNormalizationPrefetcher
+from app.models.form_draft import (
+    DraftEventType,
+    DraftMergeResult,
+    DraftUpdateResult,
+    FormDraft,
+)
 
 logger = logging.getLogger(__name__)
 
+# Champs du brouillon dont dépend la normalisation du nom de produit
+_PRODUCT_KEYS = frozenset({"product_name", "declared_type", "product_condition", "digital"})
+
 
 class FormDraftService:
     """Unified service for form draft lifecycle.
 
     Responsibilities:
     - Create/get draft bound to a signed cookie
-    - Autosave (local form -> server JSONB)
+    - Autosave (local form -> server JSONB), optionally write-behind
     - Record funnel events (enum)
     - Mark as submitted
+    - Warm the product-name normalization cache when the product changes
     """
 
-    def __init__(self, repository: FormDraftRepositoryProtocol) -> None:
+    def __init__(
+        self,
+        repository: FormDraftRepositoryProtocol,
+        product_prefetcher: ProductNormalizationPrefetcher | None = None,
+        autosave_buffer: DraftAutosaveBuffer | None = None,
+    ) -> None:
         self.repo = repository
+        self.product_prefetcher = product_prefetcher
+        self.autosave_buffer = autosave_buffer
 
     # -------------------------
     # Public API
@@ -33,12 +51,14 @@ class FormDraftService:
         self, form_slug: str, request: Request, response: Response
     ) -> FormDraft:
         """Return current draft from cookie or create a new one and set cookie."""
+        await self._flush_pending(request, form_slug)
         draft = await self.repo.get_from_cookie_or_create(request, response, form_slug)
         logger.debug("Draft loaded/created: %s (%s)", draft.id, draft.form_slug)
         return draft
 
     async def get_current(self, request: Request) -> FormDraft | None:
         """Return current draft from cookie, or None."""
+        await self._flush_pending(request)
         draft = await self.repo.get_from_cookie(request)
         if draft:
             logger.debug("Draft from cookie: %s", draft.id)
@@ -51,22 +71,31 @@ class FormDraftService:
         request: Request,
         response: Response,
     ) -> DraftUpdateResult:
-        """Persist current form values into JSONB (server-side)."""
-        draft = await self.repo.get_from_cookie_or_create(request, response, form_slug)
-
-        # 🔥 CORRECTION : Fusionner avec les données existantes
-        existing_data = draft.data or {}
-        merged_data = {**existing_data, **data}
-
-        logger.info(
-            f"Draft autosave - existing: {len(existing_data)} fields, new: {len(data)} fields, merged: {len(merged_data)} fields"
-        )
-        logger.info(f"Merged data keys: {list(merged_data.keys())}")
+        """Persist current form values into JSONB (server-side).
 
-        await self.repo.update_data(
-            draft_id=draft.id, data=merged_data, last_event="autosave"
-        )
-        logger.info("Draft autosaved: %s (%s total fields)", draft.id, len(merged_data))
+        One atomic upsert: the patch is merged into the stored JSONB by
+        PostgreSQL, so concurrent autosaves never drop each other's fields.
+        In write-behind mode, patches of a known draft are buffered and
+        written in batches instead.
+        """
+        merge = self._buffer_autosave(form_slug, data, request)
+        if merge is None:
+            # Patchs en attente d'abord (écriture différée en échec ou saturée)
+            await self._flush_pending(request, form_slug)
+            merge = await self.repo.merge_from_cookie(
+                request, response, form_slug, data, last_event="autosave"
+            )
+            if self.autosave_buffer:
+                self.autosave_buffer.mark_known(merge.draft.id, merge.draft.data)
+            logger.info(
+                "Draft autosaved: %s (%s fields patched)", merge.draft.id, len(data)
+            )
+
+        draft = merge.draft
+        if self.product_prefetcher and _PRODUCT_KEYS.intersection(data):
+            self.product_prefetcher.on_draft_change(
+                draft.id, merge.previous_data, draft.data
+            )
         return DraftUpdateResult(draft=draft, saved=True)
 
     async def record_basic_download(
@@ -76,9 +105,8 @@ class FormDraftService:
         response: Response,
         meta: dict[str, Any] | None = None,
     ) -> None:
-        draft = await self.repo.get_from_cookie_or_create(request, response, form_slug)
-        await self._record_event_and_touch(
-            draft.id, DraftEventType.BASIC_DOWNLOAD, meta
+        await self._record_event_from_cookie(
+            form_slug, request, response, DraftEventType.BASIC_DOWNLOAD, meta
         )
 
     async def record_preview_view(
@@ -88,8 +116,9 @@ class FormDraftService:
         response: Response,
         meta: dict[str, Any] | None = None,
     ) -> None:
-        draft = await self.repo.get_from_cookie_or_create(request, response, form_slug)
-        await self._record_event_and_touch(draft.id, DraftEventType.PREVIEW_VIEW, meta)
+        await self._record_event_from_cookie(
+            form_slug, request, response, DraftEventType.PREVIEW_VIEW, meta
+        )
 
     async def record_pdf_download(
         self,
@@ -98,8 +127,9 @@ class FormDraftService:
         response: Response,
         meta: dict[str, Any] | None = None,
     ) -> None:
-        draft = await self.repo.get_from_cookie_or_create(request, response, form_slug)
-        await self._record_event_and_touch(draft.id, DraftEventType.PDF_DOWNLOAD, meta)
+        await self._record_event_from_cookie(
+            form_slug, request, response, DraftEventType.PDF_DOWNLOAD, meta
+        )
 
     async def record_premium_checkout(
         self,
@@ -108,9 +138,8 @@ class FormDraftService:
         response: Response,
         meta: dict[str, Any] | None = None,
     ) -> None:
-        draft = await self.repo.get_from_cookie_or_create(request, response, form_slug)
-        await self._record_event_and_touch(
-            draft.id, DraftEventType.PREMIUM_CHECKOUT, meta
+        await self._record_event_from_cookie(
+            form_slug, request, response, DraftEventType.PREMIUM_CHECKOUT, meta
         )
 
     async def record_premium_paid(
@@ -127,11 +156,15 @@ class FormDraftService:
         if not _id:
             logger.warning("premium_paid ignored: missing draft_id")
             return
-        await self._record_event_and_touch(_id, DraftEventType.PREMIUM_PAID, meta)
+        if self.autosave_buffer:
+            await self.autosave_buffer.flush_draft(_id)
+        if not await self.repo.record_event(_id, DraftEventType.PREMIUM_PAID, meta):
+            logger.warning("premium_paid ignored: draft %s not found or expired", _id)
 
     async def mark_submitted_and_clear_cookie(
         self, form_slug: str, request: Request, response: Response
     ) -> None:
+        await self._flush_pending(request, form_slug)
         draft = await self.repo.get_from_cookie_or_create(request, response, form_slug)
         await self.repo.mark_submitted(draft.id)
 
@@ -139,11 +172,53 @@ class FormDraftService:
     # Internal helpers
     # -------------------------
 
-    async def _record_event_and_touch(
-        self, draft_id: UUID, event: DraftEventType, meta: dict[str, Any] | None
+    def _buffer_autosave(
+        self, form_slug: str, data: dict[str, Any], request: Request
+    ) -> DraftMergeResult | None:
+        """Write-behind: queue the patch of a draft already known to this worker.
+
+        The returned draft carries the full state known to the buffer (stored
+        data plus pending patches), not just the patch; the previous data is
+        that state before the patch.
+        """
+        if self.autosave_buffer is None:
+            return None
+        draft_id = self.repo.draft_id_from_cookie(request, form_slug)
+        if draft_id is None:
+            return None
+        states = self.autosave_buffer.add(draft_id, data)
+        if states is None:
+            return None
+        previous, merged = states
+        logger.debug("Draft autosave buffered: %s (%s fields)", draft_id, len(data))
+        draft = FormDraft(
+            id=draft_id, form_slug=form_slug, data=merged, last_event="autosave"
+        )
+        return DraftMergeResult(draft=draft, previous_data=previous)
+
+    async def _flush_pending(self, request: Request, form_slug: str | None = None) -> None:
+        """Write-behind: write this draft's buffered patches before reading it."""
+        if self.autosave_buffer and (
+            draft_id := self.repo.draft_id_from_cookie(request, form_slug)
+        ):
+            await self.autosave_buffer.flush_draft(draft_id)
+
+    async def _record_event_from_cookie(
+        self,
+        form_slug: str,
+        request: Request,
+        response: Response,
+        event: DraftEventType,
+        meta: dict[str, Any] | None,
     ) -> None:
-        """Insert funnel event, and reflect last_event in draft row for fast reporting."""
-        await self.repo.add_event(draft_id=draft_id, event_type=event, meta=meta or {})
-        # On met aussi à jour last_event pour faciliter des reporting rapides.
-        await self.repo.update_data(draft_id=draft_id, data={}, last_event=event.value)
+        """Insert funnel event and reflect last_event in the draft row, in one
+        round trip (draft id from the signed cookie, no read of the draft).
+
+        Buffered autosaves are written first, so that their batched update
+        does not overwrite the event's last_event afterwards.
+        """
+        await self._flush_pending(request, form_slug)
+        draft_id = await self.repo.record_event_from_cookie(
+            request, response, form_slug, event, meta
+        )
         logger.debug("Draft %s event recorded: %s", draft_id, event.value)
@@ -0,0 +1,140 @@
+"""Cache en mémoire (par worker) des lettres, invalidé par LISTEN/NOTIFY.
+
+Un parcours type charge plusieurs fois la même lettre (GET, aperçu, PDF). Les
+`Letter` déjà converties sont gardées dans un cache LRU borné. Un trigger sur
+la table `letter` émet `NOTIFY letter_changed, '<id>'` à chaque mise à jour ou
+suppression ; chaque worker écoute ce canal sur une connexion dédiée au
+primaire et retire l'entrée concernée.
+
+- le cache n'est utilisé que lorsque l'écoute est active : connexion perdue =
+  cache vidé et contourné jusqu'à la reconnexion ;
+- un identifiant invalidé récemment n'est pas remis en cache pendant un court
+  délai (lecture concurrente de l'ancienne version, retard d'un réplica) ;
+- l'expiration des entrées reste un filet de sécurité.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from typing import Any
+
+import asyncpg
+
+from app.config import settings
+from app.models.letters import Letter
+from app.utils.metrics import registry
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+LETTER_CHANGED_CHANNEL = "letter_changed"
+
+LETTER_CACHE_TOTAL = registry.counter(
+    "letter_cache_total",
+    "Lectures de lettre via le cache (hit / miss / bypass)",
+    ("result",),
+)
+LETTER_CACHE_INVALIDATIONS_TOTAL = registry.counter(
+    "letter_cache_invalidations_total",
+    "Invalidations du cache de lettres (notify / local / reset)",
+    ("source",),
+)
+
+
+class LetterCache:
+    def __init__(self, maxsize: int, ttl_seconds: float, quarantine_seconds: float) -> None:
+        self._letters: TTLCache[str, Letter] = TTLCache(maxsize, ttl_seconds)
+        self._recently_changed: TTLCache[str, bool] = TTLCache(maxsize, quarantine_seconds)
+        self._connection: asyncpg.Connection | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def active(self) -> bool:
+        return (
+            settings.LETTER_CACHE_ENABLED
+            and self._connection is not None
+            and not self._connection.is_closed()
+        )
+
+    def get(self, letter_id: str) -> Letter | None:
+        if not self.active:
+            LETTER_CACHE_TOTAL.inc(result="bypass")
+            return None
+        letter = self._letters.get(letter_id)
+        LETTER_CACHE_TOTAL.inc(result="hit" if letter is not None else "miss")
+        return letter
+
+    def set(self, letter: Letter) -> None:
+        if self.active and letter.id not in self._recently_changed:
+            self._letters.set(letter.id, letter)
+
+    def invalidate(self, letter_id: str, source: str = "local") -> None:
+        self._recently_changed.set(letter_id, True)
+        if self._letters.pop(letter_id) is not None:
+            LETTER_CACHE_INVALIDATIONS_TOTAL.inc(source=source)
+
+    def _reset(self) -> None:
+        self._letters.clear()
+        LETTER_CACHE_INVALIDATIONS_TOTAL.inc(source="reset")
+
+    # ------------------------- Écoute -------------------------
+
+    def _on_notify(self, _conn: Any, _pid: int, _channel: str, payload: str) -> None:
+        self.invalidate(payload, source="notify")
+
+    def _on_terminate(self, _conn: Any) -> None:
+        logger.warning("Letter cache listener connection lost - cache disabled")
+        self._connection = None
+        self._reset()
+
+    async def _listen_loop(self, dsn: str) -> None:
+        retry_delay = 1.0
+        while True:
+            if self._connection is None:
+                try:
+                    conn = await asyncpg.connect(dsn)
+                    conn.add_termination_listener(self._on_terminate)
+                    await conn.add_listener(LETTER_CHANGED_CHANNEL, self._on_notify)
+                    # Des notifications ont pu être manquées hors connexion
+                    self._reset()
+                    self._connection = conn
+                    retry_delay = 1.0
+                    logger.info("Letter cache listening on %s", LETTER_CHANGED_CHANNEL)
+                except Exception as e:
+                    logger.warning("Letter cache listener connection failed: %s", e)
+                    retry_delay = min(retry_delay * 2, 60.0)
+            else:
+                # Une coupure réseau silencieuse ne ferme pas la connexion : sonde
+                try:
+                    await asyncio.wait_for(self._connection.execute("SELECT 1"), timeout=5.0)
+                except Exception as e:
+                    logger.warning("Letter cache listener probe failed: %s", e)
+                    conn, self._connection = self._connection, None
+                    self._reset()
+                    conn.terminate()
+            await asyncio.sleep(retry_delay)
+
+    def start(self, dsn: str) -> None:
+        if settings.LETTER_CACHE_ENABLED and self._task is None:
+            self._task = asyncio.create_task(self._listen_loop(dsn))
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        conn, self._connection = self._connection, None
+        if conn is not None:
+            with contextlib.suppress(Exception):
+                await conn.close()
+        self._letters.clear()
+
+
+letter_cache = LetterCache(
+    maxsize=settings.LETTER_CACHE_SIZE,
+    ttl_seconds=settings.LETTER_CACHE_TTL_SECONDS,
+    quarantine_seconds=max(settings.DATABASE_REPLICA_MAX_LAG_SECONDS, 2.0),
+)
@@ -0,0 +1,79 @@
+"""Sérialisation en flux (NDJSON / CSV) des lignes `letter` pour l'export admin.
+
+Les lignes arrivent d'un curseur serveur et repartent par blocs : la mémoire
+reste constante quelle que soit la taille de l'export.
+"""
+
+from __future__ import annotations
+
+import csv
+import dataclasses
+import enum
+import io
+import json
+from collections.abc import AsyncIterator
+from datetime import date
+from decimal import Decimal
+from typing import Any, Literal
+from uuid import UUID
+
+from app.db.generated import models as models_sqlc
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+LETTER_EXPORT_COLUMNS = [field.name for field in dataclasses.fields(models_sqlc.Letter)]
+
+_ROWS_PER_CHUNK = 200
+
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, date):  # date et datetime
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+def _export_row(letter: models_sqlc.Letter) -> list[Any]:
+    return [_export_value(getattr(letter, column)) for column in LETTER_EXPORT_COLUMNS]
+
+
+async def _ndjson_chunks(rows: AsyncIterator[models_sqlc.Letter]) -> AsyncIterator[str]:
+    lines: list[str] = []
+    async for letter in rows:
+        record = dict(zip(LETTER_EXPORT_COLUMNS, _export_row(letter)))
+        lines.append(json.dumps(record, ensure_ascii=False))
+        if len(lines) >= _ROWS_PER_CHUNK:
+            yield "\n".join(lines) + "\n"
+            lines.clear()
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+async def _csv_chunks(rows: AsyncIterator[models_sqlc.Letter]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(LETTER_EXPORT_COLUMNS)
+    count = 0
+    async for letter in rows:
+        writer.writerow(_export_row(letter))
+        count += 1
+        if count % _ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_chunks(
+    rows: AsyncIterator[models_sqlc.Letter], export_format: ExportFormat
+) -> AsyncIterator[str]:
+    return _csv_chunks(rows) if export_format == "csv" else _ndjson_chunks(rows)
@@ -0,0 +1,223 @@
+"""Import en masse de lettres pré-remplies (associations partenaires).
+
+Chaque ligne est validée comme un `LetterRequest`, les pays sont résolus une
+fois par valeur distincte, puis toutes les lignes valides sont chargées par
+`COPY` dans une seule transaction. Les erreurs sont rapportées ligne par ligne
+(index dans le lot d'origine) ; les contraintes de la table (longueurs, prix)
+sont vérifiées avant le COPY pour qu'une ligne invalide ne fasse pas échouer
+tout le lot.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+import uuid
+from collections.abc import Mapping
+from decimal import Decimal
+from typing import Any
+
+from pycountry import countries
+from pydantic import BaseModel, ValidationError
+
+from app.core.letter_repository import SqlcLetterRepository
+from app.models.letters import LetterRequest
+from app.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+LETTER_IMPORT_ROWS_TOTAL = registry.counter(
+    "letter_import_rows_total",
+    "Lignes des imports de lettres en masse (inserted / rejected)",
+    ("result",),
+)
+
+# Longueurs maximales des colonnes VARCHAR de `letter` (cf. schema.sql)
+_MAX_LENGTHS: dict[str, int] = {
+    "buyer_name": 255,
+    "buyer_email": 255,
+    "buyer_phone": 20,
+    "buyer_address.line1": 255,
+    "buyer_address.line2": 255,
+    "buyer_address.postal_code": 20,
+    "buyer_address.city": 100,
+    "seller_name": 255,
+    "seller_address.line1": 255,
+    "seller_address.line2": 255,
+    "seller_address.postal_code": 20,
+    "seller_address.city": 100,
+    "product_name": 500,
+    "order_reference": 100,
+}
+_MAX_PRICE = Decimal("99999999.99")  # DECIMAL(10, 2)
+
+
+class LetterImportRowError(BaseModel):
+    index: int
+    field: str | None = None
+    message: str
+
+
+class LetterImportResult(BaseModel):
+    created_ids: list[str]
+    errors: list[LetterImportRowError]
+    rows_received: int
+    rows_inserted: int
+    duration_seconds: float
+    rows_per_second: float
+
+
+def _field_value(letter: LetterRequest, path: str) -> Any:
+    value: Any = letter
+    for part in path.split("."):
+        value = getattr(value, part)
+    return value
+
+
+def _check_constraints(index: int, letter: LetterRequest) -> list[LetterImportRowError]:
+    errors = [
+        LetterImportRowError(index=index, field=path, message=f"{max_length} caractères maximum")
+        for path, max_length in _MAX_LENGTHS.items()
+        if len(_field_value(letter, path) or "") > max_length
+    ]
+    if not Decimal(0) < letter.product_price <= _MAX_PRICE:
+        errors.append(
+            LetterImportRowError(index=index, field="product_price", message="Prix invalide")
+        )
+    return errors
+
+
+def _resolve_country(value: str) -> str | None:
+    """Nom pycountry à partir d'un code alpha-2/alpha-3 ou d'un nom."""
+    value = value.strip()
+    country = (
+        countries.get(alpha_2=value.upper())
+        if len(value) == 2
+        else countries.get(alpha_3=value.upper())
+        if len(value) == 3
+        else None
+    ) or countries.get(name=value)
+    if country is None:
+        try:
+            country = countries.lookup(value)
+        except LookupError:
+            return None
+    return str(country.name)
+
+
+def _to_record(
+    letter_id: uuid.UUID, letter: LetterRequest, buyer_country: str, seller_country: str
+) -> tuple[Any, ...]:
+    # Ordre de LETTER_COPY_COLUMNS
+    return (
+        letter_id,
+        letter.buyer_name,
+        letter.buyer_email,
+        letter.buyer_phone,
+        letter.buyer_address.line1,
+        letter.buyer_address.line2,
+        letter.buyer_address.postal_code,
+        letter.buyer_address.city,
+        buyer_country,
+        letter.seller_name,
+        letter.seller_address.line1,
+        letter.seller_address.line2,
+        letter.seller_address.postal_code,
+        letter.seller_address.city,
+        seller_country,
+        letter.purchase_date,
+        letter.product_name,
+        letter.order_reference or None,
+        letter.product_price,
+        letter.defect_description,
+        letter.remedy_preference.value,
+        letter.used,
+        letter.digital,
+    )
+
+
+class LetterImporter:
+    def __init__(self, repository: SqlcLetterRepository) -> None:
+        self._repository = repository
+
+    async def import_rows(
+        self, rows: list[Mapping[str, Any]], all_or_nothing: bool = False
+    ) -> LetterImportResult:
+        """Valide puis insère `rows` ; avec `all_or_nothing`, rien n'est inséré
+        si une seule ligne est en erreur."""
+        started = time.perf_counter()
+        errors: list[LetterImportRowError] = []
+        valid: list[tuple[int, LetterRequest]] = []
+
+        for index, row in enumerate(rows):
+            try:
+                letter = LetterRequest.model_validate(row)
+            except ValidationError as e:
+                errors.extend(
+                    LetterImportRowError(
+                        index=index,
+                        field=".".join(str(part) for part in error["loc"]) or None,
+                        message=error["msg"],
+                    )
+                    for error in e.errors()
+                )
+                continue
+            row_errors = _check_constraints(index, letter)
+            if row_errors:
+                errors.extend(row_errors)
+            else:
+                valid.append((index, letter))
+
+        # Une résolution par pays distinct
+        country_names = {
+            value: _resolve_country(value)
+            for _, letter in valid
+            for value in (letter.buyer_address.country, letter.seller_address.country)
+        }
+
+        records: list[tuple[Any, ...]] = []
+        created_ids: list[str] = []
+        for index, letter in valid:
+            buyer_country = country_names[letter.buyer_address.country]
+            seller_country = country_names[letter.seller_address.country]
+            if buyer_country is None or seller_country is None:
+                errors.extend(
+                    LetterImportRowError(
+                        index=index,
+                        field=f"{side}_address.country",
+                        message=f"Pays inconnu: {address.country}",
+                    )
+                    for side, address in (
+                        ("buyer", letter.buyer_address),
+                        ("seller", letter.seller_address),
+                    )
+                    if country_names[address.country] is None
+                )
+                continue
+            letter_id = uuid.uuid4()
+            records.append(_to_record(letter_id, letter, buyer_country, seller_country))
+            created_ids.append(str(letter_id))
+
+        if errors and all_or_nothing:
+            records, created_ids = [], []
+        inserted = await self._repository.copy_letters(records)
+
+        duration = time.perf_counter() - started
+        rejected = len({error.index for error in errors})
+        LETTER_IMPORT_ROWS_TOTAL.inc(inserted, result="inserted")
+        LETTER_IMPORT_ROWS_TOTAL.inc(rejected, result="rejected")
+        logger.info(
+            "Letter import - Received: %d, Inserted: %d, Rejected: %d, %.0f rows/s",
+            len(rows),
+            inserted,
+            rejected,
+            inserted / duration if duration else 0.0,
+        )
+        return LetterImportResult(
+            created_ids=created_ids,
+            errors=sorted(errors, key=lambda error: error.index),
+            rows_received=len(rows),
+            rows_inserted=inserted,
+            duration_seconds=round(duration, 4),
+            rows_per_second=round(inserted / duration, 1) if duration else 0.0,
+        )
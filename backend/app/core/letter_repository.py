@@ -2,14 +2,26 @@
 
 from __future__ import annotations
 
+import base64
+import binascii
 import uuid
-from typing import Protocol
-from sqlalchemy.ext.asyncio import AsyncConnection
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any, Protocol
 
+from app.core.letter_cache import letter_cache
 from app.db.generated import letter as letter_sqlc
+from app.db.connection import DBConnection, LazyConnection
 from app.db.generated import models as models_sqlc
+from app.db.prepared import asyncpg_connection, letter_querier
 from app.models.letters import (
-    Address, Letter, LetterRequest, LetterStatus, RemedyPreference
+    Address,
+    Letter,
+    LetterPage,
+    LetterRequest,
+    LetterStatus,
+    LetterSummary,
+    RemedyPreference,
 )
 from app.utils.exceptions import ProcessingError
 from pycountry import countries
@@ -18,16 +30,82 @@ from pycountry import countries
 class LetterRepositoryProtocol(Protocol):
     async def create_letter(self, letter: LetterRequest) -> Letter: ...
     async def get_letter_by_id(self, letter_id: str) -> Letter | None: ...
+    async def get_letter_for_render(self, letter_id: str) -> Letter | None: ...
     async def update_content(self, letter_id: str, content: str, status: LetterStatus) -> bool: ...
     async def update_letter_status(self, letter_id: str, status: LetterStatus) -> bool: ...
+    async def release_connection(self) -> None: ...
+
+
+# Colonnes alimentées par l'import en masse (COPY) ; les autres prennent leur défaut
+LETTER_COPY_COLUMNS = (
+    "id",
+    "buyer_name",
+    "buyer_email",
+    "buyer_phone",
+    "buyer_address_line_1",
+    "buyer_address_line_2",
+    "buyer_postal_code",
+    "buyer_city",
+    "buyer_country",
+    "seller_name",
+    "seller_address_line_1",
+    "seller_address_line_2",
+    "seller_postal_code",
+    "seller_city",
+    "seller_country",
+    "purchase_date",
+    "product_name",
+    "order_reference",
+    "product_price",
+    "defect_description",
+    "remedy_preference",
+    "used",
+    "digital",
+)
+
+
+def encode_letter_cursor(created_at: datetime, letter_id: uuid.UUID) -> str:
+    raw = f"{created_at.isoformat()}|{letter_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_letter_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, letter_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(letter_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ProcessingError(
+            f"Invalid cursor: {cursor}",
+            error_code="INVALID_CURSOR",
+        ) from e
 
 
 class SqlcLetterRepository:
-    def __init__(self, db_connection: AsyncConnection) -> None:
-        self._querier = letter_sqlc.AsyncQuerier(db_connection)
+    def __init__(
+        self,
+        db_connection: DBConnection,
+        read_connection: DBConnection | None = None,
+    ) -> None:
+        """`read_connection` (réplica possible) sert les lectures pures ; les
+        écritures passent toujours par `db_connection` (primaire)."""
+        self._connections = [db_connection]
+        self._querier = letter_querier(db_connection)
+        self._read_querier = self._querier
+        if read_connection is not None and read_connection is not db_connection:
+            self._connections.append(read_connection)
+            self._read_querier = letter_querier(read_connection)
+
+    async def release_connection(self) -> None:
+        """Valide et rend la connexion au pool avant un long traitement sans base."""
+        for connection in self._connections:
+            if isinstance(connection, LazyConnection):
+                await connection.release()
 
     @staticmethod
-    def _db_to_letter(db_letter: models_sqlc.Letter) -> Letter:
+    def _db_to_letter(
+        db_letter: models_sqlc.Letter | letter_sqlc.GetLetterForRenderRow,
+    ) -> Letter:
         return Letter(
             id=str(db_letter.id),
             buyer_name=db_letter.buyer_name,
@@ -54,7 +132,8 @@ class SqlcLetterRepository:
             order_reference=db_letter.order_reference,
             defect_description=db_letter.defect_description,
             remedy_preference=RemedyPreference(db_letter.remedy_preference),
-            content=db_letter.content,
+            # Absent de la projection des gabarits
+            content=getattr(db_letter, "content", None),
             status=LetterStatus(db_letter.status),
             used=db_letter.used,
             digital=db_letter.digital,
@@ -95,9 +174,31 @@ class SqlcLetterRepository:
                 digital=letter_request.digital,
             )
 
-            letter = await self._querier.create_letter(params)
-            if letter:
-                return self._db_to_letter(letter)
+            # RETURNING id : le reste de la lettre est ce qui vient d'être inséré
+            letter_id = await self._querier.create_letter(params)
+            if letter_id:
+                return Letter(
+                    id=str(letter_id),
+                    buyer_name=letter_request.buyer_name,
+                    buyer_address=letter_request.buyer_address.model_copy(
+                        update={"country": buyer_country_name}
+                    ),
+                    buyer_email=letter_request.buyer_email,
+                    buyer_phone=letter_request.buyer_phone,
+                    seller_name=letter_request.seller_name,
+                    seller_address=letter_request.seller_address.model_copy(
+                        update={"country": seller_country_name}
+                    ),
+                    purchase_date=letter_request.purchase_date,
+                    product_name=letter_request.product_name,
+                    product_price=letter_request.product_price,
+                    order_reference=letter_request.order_reference or None,
+                    defect_description=letter_request.defect_description,
+                    remedy_preference=letter_request.remedy_preference,
+                    status=LetterStatus.DRAFT,
+                    used=letter_request.used,
+                    digital=letter_request.digital,
+                )
             else:
                 raise ProcessingError(
                     "Failed to create letter - no letter returned",
@@ -110,24 +211,117 @@ class SqlcLetterRepository:
                 error_code="LETTER_CREATION_FAILED",
             ) from e
 
+    async def copy_letters(self, records: list[tuple[Any, ...]]) -> int:
+        """Insère les lignes (ordre de LETTER_COPY_COLUMNS) par COPY, dans la
+        transaction de la connexion d'écriture."""
+        if not records:
+            return 0
+        try:
+            driver = await asyncpg_connection(self._connections[0])
+            await driver.copy_records_to_table(
+                "letter", records=records, columns=LETTER_COPY_COLUMNS
+            )
+            return len(records)
+        except Exception as e:
+            raise ProcessingError(
+                f"Failed to copy letters: {e}",
+                error_code="LETTER_COPY_FAILED",
+            ) from e
+
     async def get_letter_by_id(self, letter_id: str) -> Letter | None:
+        cached = letter_cache.get(letter_id)
+        if cached is not None:
+            return cached
         try:
-            db_letter = await self._querier.get_letter_by_id(id=uuid.UUID(letter_id))
-            return self._db_to_letter(db_letter) if db_letter else None
+            db_letter = await self._read_querier.get_letter_by_id(id=uuid.UUID(letter_id))
+            if not db_letter:
+                return None
+            letter = self._db_to_letter(db_letter)
+            letter_cache.set(letter)
+            return letter
         except Exception as e:
             raise ProcessingError(
                 f"Failed to get letter: {e}",
                 error_code="LETTER_GET_FAILED",
             ) from e
 
+    async def get_letter_for_render(self, letter_id: str) -> Letter | None:
+        """Lettre sans `content` (inutile aux gabarits) ; non mise en cache."""
+        cached = letter_cache.get(letter_id)
+        if cached is not None:
+            return cached
+        try:
+            row = await self._read_querier.get_letter_for_render(id=uuid.UUID(letter_id))
+            return self._db_to_letter(row) if row else None
+        except Exception as e:
+            raise ProcessingError(
+                f"Failed to get letter: {e}",
+                error_code="LETTER_GET_FAILED",
+            ) from e
+
+    async def list_letters_page(self, cursor: str | None, page_size: int) -> LetterPage:
+        """Lettres les plus récentes d'abord, à partir du curseur (exclu).
+
+        Connexion en mode `snapshot` requise (curseur serveur)."""
+        after = decode_letter_cursor(cursor) if cursor else None
+        rows: list[letter_sqlc.ListLettersFirstPageRow | letter_sqlc.ListLettersPageAfterRow]
+        try:
+            # Une ligne de plus pour savoir s'il existe une page suivante
+            if after is None:
+                rows = [
+                    row
+                    async for row in self._read_querier.list_letters_first_page(
+                        page_size=page_size + 1
+                    )
+                ]
+            else:
+                rows = [
+                    row
+                    async for row in self._read_querier.list_letters_page_after(
+                        cursor_created_at=after[0],
+                        cursor_id=after[1],
+                        page_size=page_size + 1,
+                    )
+                ]
+        except Exception as e:
+            raise ProcessingError(
+                f"Failed to list letters: {e}",
+                error_code="LETTER_LIST_FAILED",
+            ) from e
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = encode_letter_cursor(rows[-1].created_at, rows[-1].id)
+        items = [
+            LetterSummary(
+                id=str(row.id),
+                buyer_name=row.buyer_name,
+                seller_name=row.seller_name,
+                product_name=row.product_name,
+                product_price=row.product_price,
+                status=LetterStatus(row.status),
+                created_at=row.created_at,
+            )
+            for row in rows
+        ]
+        return LetterPage(items=items, next_cursor=next_cursor)
+
+    def export_letters(
+        self, created_from: datetime, created_to: datetime
+    ) -> AsyncIterator[models_sqlc.Letter]:
+        """Lignes brutes, par ordre de création, lues au fil de l'eau (curseur serveur)."""
+        return self._read_querier.export_letters(created_from=created_from, created_to=created_to)
+
     async def update_content(self, letter_id: str, content: str, status: LetterStatus) -> bool:
+        # Le NOTIFY n'arrive qu'au commit : on invalide aussi localement tout de suite
+        letter_cache.invalidate(letter_id)
         try:
-            await self._querier.update_content(
+            updated = await self._querier.update_content(
                 id=uuid.UUID(letter_id),
                 content=content,
                 status=models_sqlc.LetterStatusEnum(status),
             )
-            return True
+            return updated > 0
         except Exception as e:
             raise ProcessingError(
                 f"Failed to update content: {e}",
@@ -135,12 +329,13 @@ class SqlcLetterRepository:
             ) from e
 
     async def update_letter_status(self, letter_id: str, status: LetterStatus) -> bool:
+        letter_cache.invalidate(letter_id)
         try:
-            await self._querier.update_letter_status(
+            updated = await self._querier.update_letter_status(
                 id=uuid.UUID(letter_id),
                 status=models_sqlc.LetterStatusEnum(status),
             )
-            return True
+            return updated > 0
         except Exception as e:
             raise ProcessingError(
                 f"Failed to update status: {e}",
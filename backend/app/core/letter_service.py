@@ -10,11 +10,11 @@ from uuid import UUID
 from jinja2 import Environment
 
 from app.core.letter_repository import LetterRepositoryProtocol
+from app.core.letter_generator import LetterGenerator
+from app.core.pdf_generator import PDFGenerator
+from app.core.pdf_service import PDFService, PDFType
 from app.models.letters import LetterRequest, Letter, LetterStatus, PDFOptions
-from core.letter_generator import LetterGenerator
-from core.pdf_generator import PDFGenerator
-from core.pdf_service import PDFService, PDFType
-from utils.exceptions import ProcessingError
+from app.utils.exceptions import ProcessingError
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +54,10 @@ class LetterService:
         letter = await self._repository.get_letter_by_id(letter_id)
         return Letter.model_validate(letter) if letter else None
 
+    async def _get_letter_for_render(self, letter_id: str) -> Optional[Letter]:
+        """Lettre pour les gabarits : projection sans le contenu généré"""
+        return await self._repository.get_letter_for_render(letter_id)
+
     def _format_date(self, date_obj) -> str:
         """Formater une date pour affichage français"""
         if isinstance(date_obj, str):
@@ -77,7 +81,7 @@ class LetterService:
         """
         logger.info(f"Génération HTML basique pour lettre {letter_id}")
 
-        letter = await self.get_letter(letter_id)
+        letter = await self._get_letter_for_render(letter_id)
         if not letter:
             raise ValueError(f"Lettre {letter_id} non trouvée")
 
@@ -128,7 +132,7 @@ class LetterService:
         """
         logger.info(f"Génération HTML PDF pour lettre {letter_id}")
 
-        letter = await self.get_letter(letter_id)
+        letter = await self._get_letter_for_render(letter_id)
         if not letter:
             raise ValueError(f"Lettre {letter_id} non trouvée")
 
@@ -181,12 +185,14 @@ class LetterService:
         try:
             logger.info(f"Generating PDF for letter {letter_id}")
 
-            letter = await self._repository.get_letter_by_id(letter_id)
+            letter = await self._repository.get_letter_for_render(letter_id)
             if not letter:
                 raise ProcessingError(
                     f"Letter not found: {letter_id}",
                     error_code="LETTER_NOT_FOUND",
                 )
+            # Le rendu PDF peut durer : la connexion retourne au pool pendant ce temps
+            await self._repository.release_connection()
 
             context = {
                 "letter": letter,
@@ -0,0 +1,239 @@
+"""Résolution locale (sans IA) des noms de produits triviaux.
+
+Applique les mêmes règles que le prompt de `normalize_product_name` :
+- déterminant déjà présent → groupe nominal inchangé, préfixe déduit ;
+- famille de produit / marque connue → hyperonyme + nom, article selon le genre ;
+- nom commun connu → article + nom.
+
+Tout cas incertain renvoie `None` : l'appelant se rabat alors sur le modèle.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import re
+from typing import Literal
+
+DeclaredType = Literal["service", "bien"]
+Gender = Literal["m", "f", "pl"]
+
+_ARTICLES: dict[Gender, str] = {"m": "un", "f": "une", "pl": "des"}
+
+# Préfixe d'acquisition selon le déterminant initial (cf. prompt système).
+# « le » / « les » sont volontairement absents : cas ambigus, laissés au modèle.
+_DETERMINER_PREFIXES: dict[str, str] = {
+    "un": "d’",
+    "une": "d’",
+    "des": "des ",
+    "la": "",
+}
+_ELISION_RE = re.compile(r"^l[’'](?=\w)", re.IGNORECASE)
+
+# Mots autorisés après une famille de produit (suffixes de gamme).
+_MODEL_WORDS = frozenset(
+    {
+        "air",
+        "digital",
+        "edge",
+        "edition",
+        "familial",
+        "famille",
+        "fe",
+        "flip",
+        "fold",
+        "lite",
+        "max",
+        "mini",
+        "neo",
+        "oled",
+        "plus",
+        "pop",
+        "pro",
+        "professionnel",
+        "se",
+        "slim",
+        "ultra",
+    }
+)
+_MODEL_CODE_RE = re.compile(r"^(?=.*\d)[a-z0-9+\-]+$|^[a-z]\+?$")
+
+
+@dataclasses.dataclass(frozen=True)
+class _Family:
+    pattern: re.Pattern[str]
+    display: str
+    hypernym: str | None
+    gender: Gender | None
+    declared_types: tuple[DeclaredType, ...]
+
+
+def _family(
+    pattern: str,
+    display: str,
+    hypernym: str | None,
+    gender: Gender | None,
+    declared_types: tuple[DeclaredType, ...] = ("bien",),
+) -> _Family:
+    return _Family(re.compile(pattern), display, hypernym, gender, declared_types)
+
+
+# Familles mono-catégorie : l'hyperonyme est évident. hypernym=None → nom propre
+# sans article (ex. « Windows Familial »), préfixe « de ».
+_FAMILIES: tuple[_Family, ...] = (
+    _family(r"^(apple )?iphone\b", "iPhone", "smartphone", "m"),
+    _family(r"^(apple )?ipad\b", "iPad", "tablette", "f"),
+    _family(r"^(apple )?macbook\b", "MacBook", "ordinateur portable", "m"),
+    _family(r"^(apple )?airpods\b", "AirPods", "écouteurs", "pl"),
+    _family(r"^apple watch\b", "Apple Watch", "montre connectée", "f"),
+    _family(r"^samsung galaxy (?=[asz]\d)", "Samsung Galaxy", "smartphone", "m"),
+    _family(r"^samsung (?=[asz]\d)", "Samsung", "smartphone", "m"),
+    _family(r"^(google )?pixel (?=\d)", "Google Pixel", "smartphone", "m"),
+    _family(r"^(sony )?(playstation|ps)(?= ?\d)", "PlayStation", "console", "f"),
+    _family(r"^(nintendo )?switch\b", "Nintendo Switch", "console", "f"),
+    _family(r"^(microsoft )?xbox\b", "Xbox", "console", "f"),
+    _family(r"^(amazon )?kindle\b", "Kindle", "liseuse", "f"),
+    _family(r"^gopro\b", "GoPro", "caméra", "f"),
+    _family(r"^thermomix\b", "Thermomix", "robot culinaire", "m"),
+    _family(r"^freebox\b", "Freebox", "abonnement", "m", ("service",)),
+    _family(r"^livebox\b", "Livebox", "abonnement", "m", ("service",)),
+    _family(r"^bbox\b", "Bbox", "abonnement", "m", ("service",)),
+    _family(r"^netflix\b", "Netflix", "abonnement", "m", ("service",)),
+    _family(r"^spotify\b", "Spotify", "abonnement", "m", ("service",)),
+    _family(r"^deezer\b", "Deezer", "abonnement", "m", ("service",)),
+    _family(r"^(microsoft )?windows\b", "Windows", None, None, ("service", "bien")),
+)
+
+# Noms communs fréquents (entrée complète, en minuscules) → genre.
+_COMMON_NOUNS: dict[str, Gender] = {
+    "aspirateur": "m",
+    "canapé": "m",
+    "casque audio": "m",
+    "congélateur": "m",
+    "console de jeux": "f",
+    "écouteurs": "pl",
+    "four": "m",
+    "imprimante": "f",
+    "lave-linge": "m",
+    "lave-vaisselle": "m",
+    "liseuse": "f",
+    "machine à café": "f",
+    "machine à laver": "f",
+    "matelas": "m",
+    "micro-ondes": "m",
+    "montre connectée": "f",
+    "ordinateur": "m",
+    "ordinateur portable": "m",
+    "réfrigérateur": "m",
+    "sèche-linge": "m",
+    "smartphone": "m",
+    "tablette": "f",
+    "téléphone": "m",
+    "téléviseur": "m",
+    "télévision": "f",
+    "trottinette électrique": "f",
+    "vélo": "m",
+    "vélo électrique": "m",
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class LocalNormalization:
+    group_noun: str
+    acquisition_prefix: str
+
+
+def join_article_and_nom(article: str, nom: str) -> str:
+    a = (article or "").strip()
+    n = (nom or "").strip()
+    # Uniformiser l'apostrophe d'élision
+    a = a.replace("'", "’")
+    if a.lower().startswith("l"):
+        if not a.endswith("’"):
+            a = "l’"
+        return f"{a}{n.lstrip()}"
+    return f"{a} {n}".strip()
+
+
+def _prefix_for_article(article: str) -> str:
+    return "d’" if article in ("un", "une") else "des "
+
+
+def _normalize_spaces(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _format_model_tail(tail: str) -> str | None:
+    """Met en forme la fin de nom (« 13 pro max » → « 13 Pro Max »).
+
+    Renvoie None si un mot n'est ni un code modèle ni un suffixe de gamme connu.
+    """
+    words: list[str] = []
+    for word in tail.split():
+        lower = word.lower()
+        if lower in _MODEL_WORDS:
+            words.append(lower.capitalize() if len(lower) > 2 else lower.upper())
+        elif _MODEL_CODE_RE.match(lower):
+            words.append(word.upper())
+        else:
+            return None
+    return " ".join(words)
+
+
+def _from_determiner(name: str) -> LocalNormalization | None:
+    if _ELISION_RE.match(name):
+        return LocalNormalization(group_noun=name, acquisition_prefix="de ")
+    first, _, rest = name.partition(" ")
+    prefix = _DETERMINER_PREFIXES.get(first.lower())
+    if prefix is None or not rest:
+        return None
+    return LocalNormalization(group_noun=name, acquisition_prefix=prefix)
+
+
+def _from_family(name: str, declared_type: DeclaredType) -> LocalNormalization | None:
+    lower = name.lower()
+    for family in _FAMILIES:
+        match = family.pattern.match(lower)
+        if not match:
+            continue
+        if declared_type not in family.declared_types:
+            return None
+        tail = _format_model_tail(lower[match.end() :])
+        if tail is None:
+            return None
+        product = f"{family.display} {tail}".strip()
+        if family.hypernym is None or family.gender is None:
+            return LocalNormalization(group_noun=product, acquisition_prefix="de ")
+        article = _ARTICLES[family.gender]
+        return LocalNormalization(
+            group_noun=join_article_and_nom(article, f"{family.hypernym} {product}"),
+            acquisition_prefix=_prefix_for_article(article),
+        )
+    return None
+
+
+def _from_common_noun(name: str, declared_type: DeclaredType) -> LocalNormalization | None:
+    if declared_type != "bien":
+        return None
+    noun = name.lower()
+    gender = _COMMON_NOUNS.get(noun)
+    if gender is None:
+        return None
+    article = _ARTICLES[gender]
+    return LocalNormalization(
+        group_noun=join_article_and_nom(article, noun),
+        acquisition_prefix=_prefix_for_article(article),
+    )
+
+
+def resolve_locally(
+    declared_type: DeclaredType, raw_name: str
+) -> LocalNormalization | None:
+    """Résout localement les cas sûrs ; None si le modèle doit trancher."""
+    name = _normalize_spaces(raw_name)
+    if not name:
+        return None
+    return (
+        _from_determiner(name)
+        or _from_family(name, declared_type)
+        or _from_common_noun(name, declared_type)
+    )
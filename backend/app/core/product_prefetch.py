@@ -0,0 +1,151 @@
+"""Normalisation spéculative du nom de produit déclenchée par l'autosave.
+
+Quand `product_name` ou le type déclaré change dans un brouillon, on lance en
+tâche de fond la normalisation qui alimente le cache de résultats : lorsque
+l'utilisateur atteint l'étape qui l'affiche, la réponse est déjà prête.
+
+- détection de changement : rien si le produit est le même qu'avant le patch ;
+- déduplication : rien si le résultat est en cache ou déjà en cours de calcul ;
+- cache négatif : un nom dont la normalisation a échoué n'est pas retenté
+  avant `PRODUCT_PREFETCH_RETRY_AFTER_SECONDS` (les résolutions locales sont
+  déjà dans le cache de résultats) ;
+- limitation par brouillon : au plus un appel par intervalle, seule la dernière
+  valeur saisie est traitée (anti-rebond) ;
+- concurrence globale bornée.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from typing import Any, Literal
+
+from app.config import settings
+from app.core.ai_dispatcher import AIPriority
+from app.core.ai_service import (
+    ProductCacheKey,
+    ProductNormalizationRequest,
+    ScalewayAIService,
+    is_product_name_cached,
+    product_cache_key,
+)
+from app.utils.metrics import registry
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_PREFETCH_TOTAL = registry.counter(
+    "product_prefetch_total",
+    "Normalisations spéculatives (scheduled, skipped_cached, skipped_inflight, "
+    "skipped_failed, done, failed, dropped)",
+    ("outcome",),
+)
+
+
+def declared_type_from_draft(data: dict[str, Any]) -> Literal["service", "bien"]:
+    declared = data.get("declared_type")
+    if declared in ("service", "bien"):
+        return declared  # type: ignore[no-any-return]
+    if data.get("product_condition") == "digital" or data.get("digital") is True:
+        return "service"
+    return "bien"
+
+
+def _product_fields(data: dict[str, Any]) -> tuple[str, str]:
+    return declared_type_from_draft(data), str(data.get("product_name") or "").strip()
+
+
+class ProductNormalizationPrefetcher:
+    def __init__(self) -> None:
+        self._pending: dict[uuid.UUID, ProductNormalizationRequest] = {}
+        self._tasks: dict[uuid.UUID, asyncio.Task[None]] = {}
+        self._in_flight: set[ProductCacheKey] = set()
+        self._failed: TTLCache[ProductCacheKey, bool] = TTLCache(
+            settings.PRODUCT_PREFETCH_MAX_DRAFTS,
+            settings.PRODUCT_PREFETCH_RETRY_AFTER_SECONDS,
+        )
+        self._semaphore = asyncio.Semaphore(settings.PRODUCT_PREFETCH_MAX_CONCURRENCY)
+
+    def on_draft_change(
+        self,
+        draft_id: uuid.UUID,
+        previous_data: dict[str, Any],
+        new_data: dict[str, Any],
+    ) -> None:
+        """À appeler après un autosave ; ne bloque jamais la requête."""
+        if not settings.PRODUCT_PREFETCH_ENABLED:
+            return
+        previous, current = _product_fields(previous_data), _product_fields(new_data)
+        declared_type, raw_name = current
+        if current == previous or not 2 <= len(raw_name) <= 200:
+            return
+        if is_product_name_cached(declared_type, raw_name):
+            PRODUCT_PREFETCH_TOTAL.inc(outcome="skipped_cached")
+            return
+        if product_cache_key(declared_type, raw_name) in self._failed:
+            PRODUCT_PREFETCH_TOTAL.inc(outcome="skipped_failed")
+            return
+        if draft_id not in self._tasks and len(self._tasks) >= settings.PRODUCT_PREFETCH_MAX_DRAFTS:
+            PRODUCT_PREFETCH_TOTAL.inc(outcome="dropped")
+            return
+
+        self._pending[draft_id] = ProductNormalizationRequest(
+            declared_type=declared_type, raw_name=raw_name
+        )
+        if draft_id not in self._tasks:
+            self._tasks[draft_id] = asyncio.create_task(self._run(draft_id))
+        PRODUCT_PREFETCH_TOTAL.inc(outcome="scheduled")
+
+    async def _run(self, draft_id: uuid.UUID) -> None:
+        try:
+            while True:
+                # Anti-rebond : on attend la fin de la rafale de frappe
+                await asyncio.sleep(settings.PRODUCT_PREFETCH_MIN_INTERVAL_SECONDS)
+                request = self._pending.pop(draft_id, None)
+                if request is None:
+                    return
+                await self._prefetch(request)
+        finally:
+            self._tasks.pop(draft_id, None)
+            self._pending.pop(draft_id, None)
+
+    async def _prefetch(self, request: ProductNormalizationRequest) -> None:
+        key = product_cache_key(request.declared_type, request.raw_name)
+        if is_product_name_cached(request.declared_type, request.raw_name):
+            PRODUCT_PREFETCH_TOTAL.inc(outcome="skipped_cached")
+            return
+        if key in self._in_flight:
+            PRODUCT_PREFETCH_TOTAL.inc(outcome="skipped_inflight")
+            return
+        if key in self._failed:
+            PRODUCT_PREFETCH_TOTAL.inc(outcome="skipped_failed")
+            return
+
+        self._in_flight.add(key)
+        try:
+            async with self._semaphore:
+                result = await ScalewayAIService(
+                    priority=AIPriority.BACKGROUND
+                ).normalize_product_name(request)
+            if not result.success:
+                self._failed.set(key, True)
+            PRODUCT_PREFETCH_TOTAL.inc(outcome="done" if result.success else "failed")
+            logger.debug(
+                "Product name prefetched: %s -> %s", request.raw_name, result.product_name_formatted
+            )
+        except Exception as e:
+            self._failed.set(key, True)
+            PRODUCT_PREFETCH_TOTAL.inc(outcome="failed")
+            logger.warning("Product name prefetch failed for %s: %s", request.raw_name, e)
+        finally:
+            self._in_flight.discard(key)
+
+    async def close(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+product_prefetcher = ProductNormalizationPrefetcher()
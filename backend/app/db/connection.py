@@ -1,51 +1,404 @@
 from __future__ import annotations
 
-from collections.abc import AsyncGenerator
+import asyncio
+import contextlib
+import itertools
+import logging
+import time
+from collections.abc import AsyncGenerator, AsyncIterator, Callable
+from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncResult,
+    create_async_engine,
+)
+from sqlalchemy.engine import CursorResult
 
 from app.config import settings
+from app.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+DB_HEALTH_CHECKS_TOTAL = registry.counter(
+    "db_health_checks_total",
+    "Vérifications de fond des connexions inactives du pool (ok / invalidated / error)",
+    ("result",),
+)
+DB_POOL_CHECKOUT = registry.histogram(
+    "db_pool_checkout_seconds",
+    "Attente d'une connexion du pool, par mode (read = autocommit, write = transaction)",
+    ("mode",),
+)
+DB_CONNECTION_HOLD = registry.histogram(
+    "db_connection_hold_seconds",
+    "Durée de détention d'une connexion du pool, par mode",
+    ("mode",),
+)
+DB_READS_TOTAL = registry.counter(
+    "db_reads_total",
+    "Connexions de lecture seule, par cible (primary / replica) et raison",
+    ("target", "reason"),
+)
+DB_POOL_CONNECTIONS = registry.gauge(
+    "db_pool_connections",
+    "Connexions du pool par moteur et état (checked_out / idle / overflow)",
+    ("pool", "state"),
+)
+DB_POOL_SIZE = registry.gauge(
+    "db_pool_size",
+    "Taille configurée du pool, par moteur",
+    ("pool",),
+)
+DB_REPLICA_HEALTHY = registry.gauge(
+    "db_replica_healthy",
+    "1 si le réplica est utilisable (joignable et retard sous le seuil), 0 sinon",
+    ("replica",),
+)
+
+
+def _asyncpg_url(url: str) -> str:
+    sqlalchemy_url = url.replace("postgresql://", "postgresql+asyncpg://")
+    if sqlalchemy_url.startswith("postgres://"):
+        sqlalchemy_url = sqlalchemy_url.replace("postgres://", "postgresql+asyncpg://")
+    return sqlalchemy_url
+
+
+def _new_engine(url: str) -> AsyncEngine:
+    # pool_pre_ping coûte un aller-retour à chaque checkout : inutile quand les
+    # connexions inactives sont vérifiées en tâche de fond (health_check_idle),
+    # conservé si cette vérification est désactivée
+    return create_async_engine(
+        _asyncpg_url(url),
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DATABASE_HEALTH_CHECK_INTERVAL_SECONDS <= 0,
+        connect_args={
+            "prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE
+        },
+        echo=False,
+    )
 
 
 class DatabasePool:
     def __init__(self) -> None:
         self._engine: AsyncEngine | None = None
+        self._replicas: list[AsyncEngine] = []
+        self._replica_down_until: list[float] = []
+        self._round_robin = itertools.count()
+        self._health_task: asyncio.Task[None] | None = None
+
+    @property
+    def engine(self) -> AsyncEngine | None:
+        return self._engine
 
     async def create_engine(self) -> None:
-        sqlalchemy_url = settings.DATABASE_URL.replace(
-            "postgresql://", "postgresql+asyncpg://"
+        self._engine = _new_engine(settings.DATABASE_URL)
+        self._replicas = [_new_engine(url) for url in settings.DATABASE_REPLICA_URLS]
+        self._replica_down_until = [0.0] * len(self._replicas)
+        for index in range(len(self._replicas)):
+            DB_REPLICA_HEALTHY.set(1, replica=str(index))
+
+    async def warm_up(self, connections: int) -> None:
+        """Ouvre `connections` connexions d'avance par moteur ; elles restent dans le pool."""
+        if not self._engine or connections <= 0:
+            return
+        count = min(connections, settings.DATABASE_POOL_SIZE)
+        for engine in (self._engine, *self._replicas):
+            async with contextlib.AsyncExitStack() as stack:
+                conns = await asyncio.gather(
+                    *(stack.enter_async_context(engine.connect()) for _ in range(count))
+                )
+                for conn in conns:
+                    await conn.execute(text("SELECT 1"))
+        logger.info(
+            "Database pool warmed up - Connections: %d, Replicas: %d",
+            count,
+            len(self._replicas),
         )
-        if sqlalchemy_url.startswith("postgres://"):
-            sqlalchemy_url = sqlalchemy_url.replace(
-                "postgres://", "postgresql+asyncpg://"
-            )
-
-        self._engine = create_async_engine(
-            sqlalchemy_url,
-            pool_size=settings.DATABASE_POOL_SIZE,
-            max_overflow=10,
-            pool_pre_ping=True,
-            echo=False,
+
+    def collect_pool_metrics(self) -> None:
+        """Jauges d'occupation des pools (appelé au rendu de /metrics)."""
+        engines = [("primary", self._engine)] if self._engine else []
+        engines += [(f"replica-{index}", engine) for index, engine in enumerate(self._replicas)]
+        for name, engine in engines:
+            pool: Any = engine.pool  # QueuePool
+            DB_POOL_CONNECTIONS.set(pool.checkedout(), pool=name, state="checked_out")
+            DB_POOL_CONNECTIONS.set(pool.checkedin(), pool=name, state="idle")
+            DB_POOL_CONNECTIONS.set(max(pool.overflow(), 0), pool=name, state="overflow")
+            DB_POOL_SIZE.set(pool.size(), pool=name)
+
+    # ------------------------- Réplicas -------------------------
+
+    def replica_engine(self) -> AsyncEngine | None:
+        """Réplica suivant (tourniquet) parmi ceux jugés sains, sinon None."""
+        now = time.monotonic()
+        for _ in range(len(self._replicas)):
+            index = next(self._round_robin) % len(self._replicas)
+            if self._replica_down_until[index] <= now:
+                return self._replicas[index]
+        return None
+
+    def _set_replica_health(self, index: int, healthy: bool) -> None:
+        self._replica_down_until[index] = (
+            0.0 if healthy else time.monotonic() + settings.DATABASE_REPLICA_RETRY_SECONDS
         )
+        DB_REPLICA_HEALTHY.set(1 if healthy else 0, replica=str(index))
+
+    def mark_replica_down(self, engine: AsyncEngine) -> None:
+        with contextlib.suppress(ValueError):
+            index = self._replicas.index(engine)
+            logger.warning("Database replica %d marked down", index)
+            self._set_replica_health(index, False)
+
+    async def check_replicas(self) -> None:
+        """Joignabilité et retard de réplication de chaque réplica."""
+        for index, engine in enumerate(self._replicas):
+            try:
+                async with engine.connect() as conn:
+                    lag = (
+                        await conn.execute(
+                            text(
+                                "SELECT COALESCE(EXTRACT(EPOCH FROM now() - "
+                                "pg_last_xact_replay_timestamp()), 0)"
+                            )
+                        )
+                    ).scalar_one()
+                healthy = float(lag) <= settings.DATABASE_REPLICA_MAX_LAG_SECONDS
+                if not healthy:
+                    logger.warning("Database replica %d lagging: %.1fs", index, float(lag))
+            except Exception as e:
+                logger.warning("Database replica %d unreachable: %s", index, e)
+                healthy = False
+            self._set_replica_health(index, healthy)
+
+    # ------------------------- Santé -------------------------
+
+    async def health_check_idle(self) -> None:
+        """Vérifie chaque connexion inactive du pool et invalide les connexions mortes.
+
+        Le pool est FIFO : des checkouts successifs parcourent les connexions
+        inactives, de la plus ancienne à la plus récente."""
+        if not self._engine:
+            return
+        for _ in range(self._engine.pool.checkedin()):  # type: ignore[attr-defined]
+            try:
+                async with self._engine.connect() as conn:
+                    try:
+                        await conn.execute(text("SELECT 1"))
+                        DB_HEALTH_CHECKS_TOTAL.inc(result="ok")
+                    except Exception as e:
+                        logger.warning("Idle database connection invalidated: %s", e)
+                        await conn.invalidate()
+                        DB_HEALTH_CHECKS_TOTAL.inc(result="invalidated")
+            except Exception as e:
+                logger.error("Database health check failed: %s", e)
+                DB_HEALTH_CHECKS_TOTAL.inc(result="error")
+                return
+
+    async def _health_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.health_check_idle()
+            await self.check_replicas()
+
+    def start_health_checks(self, interval: float) -> None:
+        if self._engine and interval > 0 and self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop(interval))
 
     async def close_engine(self) -> None:
+        if self._health_task:
+            self._health_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._health_task
+            self._health_task = None
+        for replica in self._replicas:
+            await replica.dispose()
+        self._replicas = []
         if self._engine:
             await self._engine.dispose()
+            self._engine = None
 
-    async def get_connection(
-        self,
-    ) -> AsyncGenerator[AsyncConnection, None]:
+    async def get_engine(self) -> AsyncEngine:
         if not self._engine:
             await self.create_engine()
+        assert self._engine is not None
+        return self._engine
 
-        if self._engine:
-            async with self._engine.begin() as connection:
-                yield connection
+class LazyConnection:
+    """Connexion du pool acquise à la première requête, rendue dès que possible.
+
+    Expose le sous-ensemble d'AsyncConnection utilisé par les queriers sqlc.
+    En mode lecture seule, la connexion est en autocommit (pas de BEGIN/COMMIT)
+    et prise sur un réplica quand il y en a un de sain, sauf `prefer_primary`
+    (lecture de ses propres écritures) ; `snapshot` remplace l'autocommit par
+    une transaction REPEATABLE READ en lecture seule (instantané cohérent,
+    nécessaire aux curseurs serveur de `stream`). Sinon une transaction est
+    ouverte sur le primaire à l'acquisition. `release()` valide et rend la connexion avant un
+    traitement long sans base (rendu PDF, appel IA) ; la requête suivante en
+    acquiert une nouvelle.
+
+    Une connexion de lecture liée à la connexion d'écriture de la même requête
+    (`writer`) lit ses écritures : tant que la transaction d'écriture est
+    ouverte, les lectures passent par elle (données non encore validées) ;
+    une fois validée, elles vont sur le primaire jusqu'à la fin de la requête."""
+
+    def __init__(
+        self,
+        pool: DatabasePool,
+        readonly: bool = False,
+        prefer_primary: bool = False,
+        on_write: Callable[[], None] | None = None,
+        snapshot: bool = False,
+        writer: LazyConnection | None = None,
+    ) -> None:
+        self._pool = pool
+        self.readonly = readonly
+        self.prefer_primary = prefer_primary
+        self.snapshot = snapshot
+        self.wrote = False
+        self._on_write = on_write
+        self._writer = writer
+        self._mode = "read" if readonly else "write"
+        self._conn: AsyncConnection | None = None
+        self._acquired_at = 0.0
+
+    async def _connect(self) -> AsyncConnection:
+        primary = await self._pool.get_engine()
+        if not self.readonly:
+            return await primary.connect()
+
+        replica = None if self.prefer_primary else self._pool.replica_engine()
+        if replica is not None:
+            try:
+                conn = await replica.connect()
+                DB_READS_TOTAL.inc(target="replica", reason="routed")
+                return conn
+            except Exception as e:
+                logger.warning("Replica connection failed, reading from primary: %s", e)
+                self._pool.mark_replica_down(replica)
+        reason = "read_your_writes" if self.prefer_primary else "no_replica"
+        DB_READS_TOTAL.inc(target="primary", reason=reason)
+        return await primary.connect()
+
+    async def _acquire(self) -> AsyncConnection:
+        if self._writer is not None and self._writer.wrote:
+            if self._writer.in_transaction():
+                # Lecture après écriture : dans la transaction, non encore validée
+                if self._conn is not None:
+                    await self.release()
+                return await self._writer._acquire()
+            if not self.prefer_primary:
+                # Écriture déjà validée : le réplica peut ne pas l'avoir reçue
+                self.prefer_primary = True
+                await self.release()
+        if self._conn is None:
+            started = time.perf_counter()
+            conn = await self._connect()
+            self._acquired_at = time.perf_counter()
+            DB_POOL_CHECKOUT.observe(self._acquired_at - started, mode=self._mode)
+            try:
+                if self.readonly and self.snapshot:
+                    conn = await conn.execution_options(
+                        isolation_level="REPEATABLE READ", postgresql_readonly=True
+                    )
+                    await conn.begin()
+                elif self.readonly:
+                    conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                else:
+                    await conn.begin()
+                    self.wrote = True
+                    if self._on_write:
+                        self._on_write()
+            except BaseException:
+                await conn.close()
+                raise
+            self._conn = conn
+        return self._conn
+
+    async def execute(self, *args: Any, **kwargs: Any) -> CursorResult[Any]:
+        return await (await self._acquire()).execute(*args, **kwargs)
+
+    async def stream(self, *args: Any, **kwargs: Any) -> AsyncResult[Any]:
+        return await (await self._acquire()).stream(*args, **kwargs)
+
+    async def get_raw_connection(self) -> Any:
+        return await (await self._acquire()).get_raw_connection()
 
+    def in_transaction(self) -> bool:
+        if self._writer is not None and self._writer.in_transaction():
+            return True
+        return self._conn is not None and self._conn.in_transaction()
+
+    async def release(self, commit: bool = True) -> None:
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        try:
+            if conn.in_transaction():
+                if commit and not self.readonly:
+                    await conn.commit()
+                else:
+                    await conn.rollback()
+        finally:
+            await conn.close()
+            DB_CONNECTION_HOLD.observe(time.perf_counter() - self._acquired_at, mode=self._mode)
+
+
+DBConnection = AsyncConnection | LazyConnection
 
 db_pool = DatabasePool()
+registry.add_collector(db_pool.collect_pool_metrics)
+
+
+async def _lazy_connection(connection: LazyConnection) -> AsyncGenerator[LazyConnection, None]:
+    try:
+        yield connection
+    except BaseException:
+        await connection.release(commit=False)
+        raise
+    else:
+        await connection.release()
 
 
-async def get_db_connection() -> AsyncGenerator[AsyncConnection, None]:
-    async for connection in db_pool.get_connection():
+async def get_db_connection(
+    on_write: Callable[[], None] | None = None,
+) -> AsyncGenerator[LazyConnection, None]:
+    async for connection in _lazy_connection(LazyConnection(db_pool, on_write=on_write)):
         yield connection
+
+
+async def get_readonly_db_connection(
+    prefer_primary: bool = False,
+    snapshot: bool = False,
+    writer: LazyConnection | None = None,
+) -> AsyncGenerator[LazyConnection, None]:
+    connection = LazyConnection(
+        db_pool,
+        readonly=True,
+        prefer_primary=prefer_primary,
+        snapshot=snapshot,
+        writer=writer,
+    )
+    async for conn in _lazy_connection(connection):
+        yield conn
+
+
+@contextlib.asynccontextmanager
+async def try_advisory_lock(conn: AsyncConnection, key: int) -> AsyncIterator[bool]:
+    """Verrou consultatif de session (pg_try_advisory_lock) pour les tâches de fond
+    qu'un seul worker doit exécuter ; renvoie False s'il est déjà pris."""
+    locked = (
+        await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key})
+    ).scalar_one()
+    await conn.commit()
+    try:
+        yield bool(locked)
+    finally:
+        if locked:
+            await conn.rollback()
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+            await conn.commit()
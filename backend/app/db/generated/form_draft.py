@@ -2,7 +2,9 @@
 # versions:
 #   sqlc v1.22.0
 # source: form_draft.sql
-from typing import Any, Optional
+import dataclasses
+import datetime
+from typing import Any, AsyncIterator, List, Optional
 import uuid
 
 import sqlalchemy
@@ -11,17 +13,14 @@ import sqlalchemy.ext.asyncio
 from app.db.generated import models
 
 
-ADD_DRAFT_EVENT = """-- name: add_draft_event \\:exec
-INSERT INTO form_draft_event (
-    draft_id,
-    event_type,
-    meta
-)
-VALUES (
-    :p1\\:\\:uuid,
-    :p2\\:\\:form_draft_event_type,
-    :p3\\:\\:jsonb
-)
+APPLY_DRAFT_PATCHES = """-- name: apply_draft_patches \\:execrows
+UPDATE form_draft AS d
+SET
+    data = d.data || p.patch\\:\\:jsonb,
+    last_event = 'autosave',
+    updated_at = now()
+FROM unnest(:p1\\:\\:uuid[], :p2\\:\\:text[]) AS p (id, patch)
+WHERE d.id = p.id AND d.status != 'expired'
 """
 
 
@@ -45,6 +44,29 @@ RETURNING
 """
 
 
+ENSURE_DRAFT_EVENT_PARTITIONS = """-- name: ensure_draft_event_partitions \\:one
+SELECT ensure_form_draft_event_partitions(:p1\\:\\:int)\\:\\:int AS created
+"""
+
+
+EXPIRE_STALE_DRAFTS = """-- name: expire_stale_drafts \\:execrows
+UPDATE form_draft
+SET
+    status = 'expired',
+    updated_at = now()
+WHERE id IN (
+    SELECT id
+    FROM form_draft
+    WHERE
+        status = 'editing'
+        AND updated_at < now() - make_interval(days => :p1\\:\\:int)
+    ORDER BY updated_at
+    LIMIT :p2\\:\\:int
+    FOR UPDATE SKIP LOCKED
+)
+"""
+
+
 GET_DRAFT = """-- name: get_draft \\:one
 SELECT
     id,
@@ -60,6 +82,113 @@ LIMIT 1
 """
 
 
+GET_DRAFT_EVENT_PARTITIONS_COVERED_UNTIL = """-- name: get_draft_event_partitions_covered_until \\:one
+SELECT max(to_date(right(c.relname, 6), 'YYYYMM') + INTERVAL '1 month')\\:\\:timestamptz
+    AS covered_until
+FROM pg_inherits AS i
+INNER JOIN pg_class AS c ON i.inhrelid = c.oid
+WHERE
+    i.inhparent = 'form_draft_event'\\:\\:regclass
+    AND NOT i.inhdetachpending
+    AND c.relname ~ '^form_draft_event_[0-9]{6}$'
+"""
+
+
+GET_DRAFT_FUNNEL_WATERMARK = """-- name: get_draft_funnel_watermark \\:one
+SELECT processed_until
+FROM rollup_watermark
+WHERE name = 'form_draft_funnel'
+"""
+
+
+LIST_DRAFT_FUNNEL_DAILY = """-- name: list_draft_funnel_daily \\:many
+SELECT
+    day,
+    form_slug,
+    event_type,
+    events,
+    drafts
+FROM form_draft_funnel_daily
+WHERE
+    day BETWEEN :p1\\:\\:date AND :p2\\:\\:date
+    AND (:p3\\:\\:text IS NULL OR form_slug = :p3\\:\\:text)
+ORDER BY day, form_slug, event_type
+"""
+
+
+LIST_EXPIRED_DRAFT_EVENT_PARTITIONS = """-- name: list_expired_draft_event_partitions \\:many
+SELECT
+    c.relname\\:\\:text AS partition_name,
+    i.inhrelid IS NOT NULL AS attached,
+    COALESCE(i.inhdetachpending, FALSE) AS detach_pending
+FROM pg_class AS c
+LEFT JOIN pg_inherits AS i
+    ON c.oid = i.inhrelid AND i.inhparent = 'form_draft_event'\\:\\:regclass
+WHERE
+    c.relkind = 'r'
+    AND c.relnamespace = current_schema()\\:\\:regnamespace
+    AND c.relname ~ '^form_draft_event_[0-9]{6}$'
+    AND right(c.relname, 6) < to_char(
+        date_trunc('month', now()) - make_interval(months => :p1\\:\\:int),
+        'YYYYMM'
+    )
+ORDER BY c.relname
+"""
+
+
+@dataclasses.dataclass()
+class ListExpiredDraftEventPartitionsRow:
+    partition_name: str
+    attached: bool
+    detach_pending: bool
+
+
+MERGE_DRAFT_DATA = """-- name: merge_draft_data \\:one
+WITH previous AS (
+    SELECT data FROM form_draft WHERE id = :p1\\:\\:uuid
+)
+INSERT INTO form_draft (
+    id,
+    form_slug,
+    data,
+    last_event
+)
+VALUES (
+    :p1\\:\\:uuid,
+    :p2\\:\\:text,
+    :p3\\:\\:jsonb,
+    :p4\\:\\:text
+)
+ON CONFLICT (id) DO UPDATE
+    SET
+        data = form_draft.data || excluded.data,
+        last_event = excluded.last_event,
+        updated_at = now()
+    WHERE form_draft.status != 'expired'
+RETURNING
+    id,
+    form_slug,
+    data,
+    status,
+    created_at,
+    updated_at,
+    last_event,
+    (SELECT p.data FROM previous AS p) AS previous_data
+"""
+
+
+@dataclasses.dataclass()
+class MergeDraftDataRow:
+    id: uuid.UUID
+    form_slug: str
+    data: Any
+    status: Any
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+    last_event: Optional[str]
+    previous_data: Optional[Any]
+
+
 MARK_DRAFT_SUBMITTED = """-- name: mark_draft_submitted \\:exec
 UPDATE form_draft
 SET
@@ -69,22 +198,164 @@ WHERE id = :p1\\:\\:uuid
 """
 
 
-UPDATE_DRAFT_DATA = """-- name: update_draft_data \\:exec
-UPDATE form_draft
-SET
-    data = :p1\\:\\:jsonb,
-    last_event = :p2\\:\\:text,
-    updated_at = now()
-WHERE id = :p3\\:\\:uuid
+PURGE_EXPIRED_DRAFTS = """-- name: purge_expired_drafts \\:execrows
+DELETE FROM form_draft
+WHERE id IN (
+    SELECT id
+    FROM form_draft
+    WHERE
+        status IN ('expired', 'abandoned')
+        AND updated_at < now() - make_interval(days => :p1\\:\\:int)
+        AND updated_at < COALESCE(
+            (SELECT processed_until FROM rollup_watermark WHERE name = 'form_draft_funnel'),
+            'infinity'\\:\\:timestamptz
+        )
+    ORDER BY updated_at
+    LIMIT :p2\\:\\:int
+    FOR UPDATE SKIP LOCKED
+)
+"""
+
+
+RECORD_DRAFT_EVENT = """-- name: record_draft_event \\:one
+WITH touched AS (
+    UPDATE form_draft
+    SET
+        last_event = (:p1\\:\\:form_draft_event_type)\\:\\:text,
+        updated_at = now()
+    WHERE id = :p2\\:\\:uuid AND status != 'expired'
+    RETURNING id
+),
+
+inserted AS (
+    INSERT INTO form_draft_event (
+        draft_id,
+        event_type,
+        meta
+    )
+    SELECT
+        id,
+        :p1\\:\\:form_draft_event_type,
+        :p3\\:\\:jsonb
+    FROM touched
+    RETURNING draft_id
+)
+
+SELECT count(*)\\:\\:int AS recorded
+FROM inserted
+"""
+
+
+ROLLUP_DRAFT_FUNNEL = """-- name: rollup_draft_funnel \\:one
+WITH bounds AS (
+    SELECT
+        w.lo,
+        GREATEST(
+            w.lo,
+            LEAST(
+                now() - make_interval(secs => :p1\\:\\:int),
+                w.lo + make_interval(hours => :p2\\:\\:int)
+            )
+        ) AS hi
+    FROM (
+        SELECT
+            COALESCE(
+                (SELECT processed_until FROM rollup_watermark WHERE name = 'form_draft_funnel'),
+                (SELECT min(occurred_at) FROM form_draft_event),
+                now() - make_interval(secs => :p1\\:\\:int)
+            ) AS lo
+    ) AS w
+),
+
+new_events AS (
+    SELECT
+        e.id,
+        e.draft_id,
+        d.form_slug,
+        e.event_type,
+        e.occurred_at
+    FROM form_draft_event AS e
+    INNER JOIN form_draft AS d ON e.draft_id = d.id
+    CROSS JOIN bounds AS b
+    WHERE e.occurred_at >= b.lo AND e.occurred_at < b.hi
+),
+
+reached AS (
+    INSERT INTO form_draft_funnel_reached (draft_id, event_type, form_slug, reached_at)
+    SELECT DISTINCT ON (draft_id, event_type)
+        draft_id,
+        event_type,
+        form_slug,
+        occurred_at
+    FROM new_events
+    ORDER BY draft_id, event_type, occurred_at, id
+    ON CONFLICT (draft_id, event_type) DO NOTHING
+    RETURNING form_slug, event_type, reached_at
+),
+
+counts AS (
+    SELECT
+        (occurred_at AT TIME ZONE :p3\\:\\:text)\\:\\:date AS day,
+        form_slug,
+        event_type,
+        1 AS events,
+        0 AS drafts
+    FROM new_events
+    UNION ALL
+    SELECT
+        (reached_at AT TIME ZONE :p3\\:\\:text)\\:\\:date AS day,
+        form_slug,
+        event_type,
+        0 AS events,
+        1 AS drafts
+    FROM reached
+),
+
+upserted AS (
+    INSERT INTO form_draft_funnel_daily (day, form_slug, event_type, events, drafts)
+    SELECT
+        day,
+        form_slug,
+        event_type,
+        sum(events)\\:\\:int,
+        sum(drafts)\\:\\:int
+    FROM counts
+    GROUP BY day, form_slug, event_type
+    ON CONFLICT (day, form_slug, event_type) DO UPDATE
+        SET
+            events = form_draft_funnel_daily.events + excluded.events,
+            drafts = form_draft_funnel_daily.drafts + excluded.drafts
+    RETURNING 1
+),
+
+watermark AS (
+    INSERT INTO rollup_watermark (name, processed_until)
+    SELECT 'form_draft_funnel', hi FROM bounds
+    ON CONFLICT (name) DO UPDATE SET processed_until = excluded.processed_until
+)
+
+SELECT
+    b.hi AS processed_until,
+    b.hi >= now() - make_interval(secs => :p1\\:\\:int) AS caught_up,
+    (SELECT count(*) FROM upserted)\\:\\:int AS groups
+FROM bounds AS b
 """
 
 
+@dataclasses.dataclass()
+class RollupDraftFunnelRow:
+    processed_until: datetime.datetime
+    caught_up: bool
+    groups: int
+
+
 class AsyncQuerier:
     def __init__(self, conn: sqlalchemy.ext.asyncio.AsyncConnection):
         self._conn = conn
 
-    async def add_draft_event(self, *, draft_id: uuid.UUID, event_type: Any, meta: Any) -> None:
-        await self._conn.execute(sqlalchemy.text(ADD_DRAFT_EVENT), {"p1": draft_id, "p2": event_type, "p3": meta})
+    async def apply_draft_patches(self, *, ids: List[uuid.UUID], patches: List[str]) -> int:
+        result = await self._conn.execute(sqlalchemy.text(APPLY_DRAFT_PATCHES), {"p1": ids, "p2": patches})
+        return result.rowcount
 
     async def create_draft(self, *, form_slug: str, data: Any) -> Optional[models.FormDraft]:
         row = (await self._conn.execute(sqlalchemy.text(CREATE_DRAFT), {"p1": form_slug, "p2": data})).first()
@@ -100,6 +371,16 @@ class AsyncQuerier:
             last_event=row[6],
         )
 
+    async def ensure_draft_event_partitions(self, *, months_ahead: int) -> Optional[int]:
+        row = (await self._conn.execute(sqlalchemy.text(ENSURE_DRAFT_EVENT_PARTITIONS), {"p1": months_ahead})).first()
+        if row is None:
+            return None
+        return row[0]
+
+    async def expire_stale_drafts(self, *, stale_after_days: int, batch_size: int) -> int:
+        result = await self._conn.execute(sqlalchemy.text(EXPIRE_STALE_DRAFTS), {"p1": stale_after_days, "p2": batch_size})
+        return result.rowcount
+
     async def get_draft(self, *, id: uuid.UUID) -> Optional[models.FormDraft]:
         row = (await self._conn.execute(sqlalchemy.text(GET_DRAFT), {"p1": id})).first()
         if row is None:
@@ -114,8 +395,72 @@ class AsyncQuerier:
             last_event=row[6],
         )
 
+    async def get_draft_event_partitions_covered_until(self) -> Optional[datetime.datetime]:
+        row = (await self._conn.execute(sqlalchemy.text(GET_DRAFT_EVENT_PARTITIONS_COVERED_UNTIL))).first()
+        if row is None:
+            return None
+        return row[0]
+
+    async def get_draft_funnel_watermark(self) -> Optional[datetime.datetime]:
+        row = (await self._conn.execute(sqlalchemy.text(GET_DRAFT_FUNNEL_WATERMARK))).first()
+        if row is None:
+            return None
+        return row[0]
+
+    async def list_draft_funnel_daily(self, *, day_from: datetime.date, day_to: datetime.date, form_slug: Optional[str]) -> AsyncIterator[models.FormDraftFunnelDaily]:
+        result = await self._conn.stream(sqlalchemy.text(LIST_DRAFT_FUNNEL_DAILY), {"p1": day_from, "p2": day_to, "p3": form_slug})
+        async for row in result:
+            yield models.FormDraftFunnelDaily(
+                day=row[0],
+                form_slug=row[1],
+                event_type=row[2],
+                events=row[3],
+                drafts=row[4],
+            )
+
+    async def list_expired_draft_event_partitions(self, *, retention_months: int) -> AsyncIterator[ListExpiredDraftEventPartitionsRow]:
+        result = await self._conn.stream(sqlalchemy.text(LIST_EXPIRED_DRAFT_EVENT_PARTITIONS), {"p1": retention_months})
+        async for row in result:
+            yield ListExpiredDraftEventPartitionsRow(
+                partition_name=row[0],
+                attached=row[1],
+                detach_pending=row[2],
+            )
+
+    async def merge_draft_data(self, *, id: uuid.UUID, form_slug: str, patch: Any, last_event: Optional[str]) -> Optional[MergeDraftDataRow]:
+        row = (await self._conn.execute(sqlalchemy.text(MERGE_DRAFT_DATA), {"p1": id, "p2": form_slug, "p3": patch, "p4": last_event})).first()
+        if row is None:
+            return None
+        return MergeDraftDataRow(
+            id=row[0],
+            form_slug=row[1],
+            data=row[2],
+            status=row[3],
+            created_at=row[4],
+            updated_at=row[5],
+            last_event=row[6],
+            previous_data=row[7],
+        )
+
     async def mark_draft_submitted(self, *, id: uuid.UUID) -> None:
         await self._conn.execute(sqlalchemy.text(MARK_DRAFT_SUBMITTED), {"p1": id})
 
-    async def update_draft_data(self, *, data: Any, last_event: Optional[str], id: uuid.UUID) -> None:
-        await self._conn.execute(sqlalchemy.text(UPDATE_DRAFT_DATA), {"p1": data, "p2": last_event, "p3": id})
+    async def purge_expired_drafts(self, *, purge_after_days: int, batch_size: int) -> int:
+        result = await self._conn.execute(sqlalchemy.text(PURGE_EXPIRED_DRAFTS), {"p1": purge_after_days, "p2": batch_size})
+        return result.rowcount
+
+    async def record_draft_event(self, *, event_type: Any, draft_id: uuid.UUID, meta: Any) -> Optional[int]:
+        row = (await self._conn.execute(sqlalchemy.text(RECORD_DRAFT_EVENT), {"p1": event_type, "p2": draft_id, "p3": meta})).first()
+        if row is None:
+            return None
+        return row[0]
+
+    async def rollup_draft_funnel(self, *, lag_seconds: int, window_hours: int, time_zone: str) -> Optional[RollupDraftFunnelRow]:
+        row = (await self._conn.execute(sqlalchemy.text(ROLLUP_DRAFT_FUNNEL), {"p1": lag_seconds, "p2": window_hours, "p3": time_zone})).first()
+        if row is None:
+            return None
+        return RollupDraftFunnelRow(
+            processed_until=row[0],
+            caught_up=row[1],
+            groups=row[2],
+        )
@@ -62,7 +62,7 @@ INSERT INTO letter (
              :p21\\:\\:boolean,
              :p22\\:\\:boolean
          )
-RETURNING id, buyer_name, buyer_email, buyer_phone, buyer_address_line_1, buyer_address_line_2, buyer_postal_code, buyer_city, buyer_country, seller_name, seller_email, seller_address_line_1, seller_address_line_2, seller_postal_code, seller_city, seller_country, purchase_date, product_name, product_price, order_reference, used, digital, defect_description, remedy_preference, content, status, created_at, updated_at
+RETURNING id
 """
 
 
@@ -98,6 +98,14 @@ WHERE id = :p1\\:\\:uuid
 """
 
 
+EXPORT_LETTERS = """-- name: export_letters \\:many
+SELECT id, buyer_name, buyer_email, buyer_phone, buyer_address_line_1, buyer_address_line_2, buyer_postal_code, buyer_city, buyer_country, seller_name, seller_email, seller_address_line_1, seller_address_line_2, seller_postal_code, seller_city, seller_country, purchase_date, product_name, product_price, order_reference, used, digital, defect_description, remedy_preference, content, status, created_at, updated_at
+FROM letter
+WHERE created_at >= :p1\\:\\:timestamptz AND created_at < :p2\\:\\:timestamptz
+ORDER BY created_at ASC, id ASC
+"""
+
+
 GET_LETTER_BY_ID = """-- name: get_letter_by_id \\:one
 SELECT id, buyer_name, buyer_email, buyer_phone, buyer_address_line_1, buyer_address_line_2, buyer_postal_code, buyer_city, buyer_country, seller_name, seller_email, seller_address_line_1, seller_address_line_2, seller_postal_code, seller_city, seller_country, purchase_date, product_name, product_price, order_reference, used, digital, defect_description, remedy_preference, content, status, created_at, updated_at
 FROM letter
@@ -106,32 +114,135 @@ LIMIT 1
 """
 
 
-LIST_LETTERS = """-- name: list_letters \\:many
-SELECT id, buyer_name, buyer_email, buyer_phone, buyer_address_line_1, buyer_address_line_2, buyer_postal_code, buyer_city, buyer_country, seller_name, seller_email, seller_address_line_1, seller_address_line_2, seller_postal_code, seller_city, seller_country, purchase_date, product_name, product_price, order_reference, used, digital, defect_description, remedy_preference, content, status, created_at, updated_at
+GET_LETTER_FOR_RENDER = """-- name: get_letter_for_render \\:one
+SELECT
+    id,
+    buyer_name,
+    buyer_email,
+    buyer_phone,
+    buyer_address_line_1,
+    buyer_address_line_2,
+    buyer_postal_code,
+    buyer_city,
+    buyer_country,
+    seller_name,
+    seller_address_line_1,
+    seller_address_line_2,
+    seller_postal_code,
+    seller_city,
+    seller_country,
+    purchase_date,
+    product_name,
+    product_price,
+    order_reference,
+    used,
+    digital,
+    defect_description,
+    remedy_preference,
+    status
 FROM letter
-ORDER BY created_at DESC
-LIMIT :p2\\:\\:int OFFSET :p1\\:\\:int
+WHERE id = :p1\\:\\:uuid
+LIMIT 1
 """
 
 
-UPDATE_CONTENT = """-- name: update_content \\:one
+@dataclasses.dataclass()
+class GetLetterForRenderRow:
+    id: uuid.UUID
+    buyer_name: str
+    buyer_email: Optional[str]
+    buyer_phone: Optional[str]
+    buyer_address_line_1: str
+    buyer_address_line_2: Optional[str]
+    buyer_postal_code: str
+    buyer_city: str
+    buyer_country: str
+    seller_name: str
+    seller_address_line_1: str
+    seller_address_line_2: Optional[str]
+    seller_postal_code: str
+    seller_city: str
+    seller_country: str
+    purchase_date: datetime.date
+    product_name: str
+    product_price: decimal.Decimal
+    order_reference: Optional[str]
+    used: bool
+    digital: bool
+    defect_description: str
+    remedy_preference: models.RemedyPreferenceEnum
+    status: models.LetterStatusEnum
+
+
+LIST_LETTERS_FIRST_PAGE = """-- name: list_letters_first_page \\:many
+SELECT
+    id,
+    buyer_name,
+    seller_name,
+    product_name,
+    product_price,
+    status,
+    created_at
+FROM letter
+ORDER BY created_at DESC, id DESC
+LIMIT :p1\\:\\:int
+"""
+
+
+@dataclasses.dataclass()
+class ListLettersFirstPageRow:
+    id: uuid.UUID
+    buyer_name: str
+    seller_name: str
+    product_name: str
+    product_price: decimal.Decimal
+    status: models.LetterStatusEnum
+    created_at: datetime.datetime
+
+
+LIST_LETTERS_PAGE_AFTER = """-- name: list_letters_page_after \\:many
+SELECT
+    id,
+    buyer_name,
+    seller_name,
+    product_name,
+    product_price,
+    status,
+    created_at
+FROM letter
+WHERE (created_at, id) < (:p1\\:\\:timestamptz, :p2\\:\\:uuid)
+ORDER BY created_at DESC, id DESC
+LIMIT :p3\\:\\:int
+"""
+
+
+@dataclasses.dataclass()
+class ListLettersPageAfterRow:
+    id: uuid.UUID
+    buyer_name: str
+    seller_name: str
+    product_name: str
+    product_price: decimal.Decimal
+    status: models.LetterStatusEnum
+    created_at: datetime.datetime
+
+
+UPDATE_CONTENT = """-- name: update_content \\:execrows
 UPDATE letter
 SET
     content = :p1\\:\\:text,
     status = :p2\\:\\:letter_status_enum,
     updated_at = now()
 WHERE id = :p3\\:\\:uuid
-RETURNING id, buyer_name, buyer_email, buyer_phone, buyer_address_line_1, buyer_address_line_2, buyer_postal_code, buyer_city, buyer_country, seller_name, seller_email, seller_address_line_1, seller_address_line_2, seller_postal_code, seller_city, seller_country, purchase_date, product_name, product_price, order_reference, used, digital, defect_description, remedy_preference, content, status, created_at, updated_at
 """
 
 
-UPDATE_LETTER_STATUS = """-- name: update_letter_status \\:one
+UPDATE_LETTER_STATUS = """-- name: update_letter_status \\:execrows
 UPDATE letter
 SET
     status = :p1\\:\\:letter_status_enum,
     updated_at = now()
 WHERE id = :p2\\:\\:uuid
-RETURNING id, buyer_name, buyer_email, buyer_phone, buyer_address_line_1, buyer_address_line_2, buyer_postal_code, buyer_city, buyer_country, seller_name, seller_email, seller_address_line_1, seller_address_line_2, seller_postal_code, seller_city, seller_country, purchase_date, product_name, product_price, order_reference, used, digital, defect_description, remedy_preference, content, status, created_at, updated_at
 """
 
 
@@ -139,7 +250,7 @@ class AsyncQuerier:
     def __init__(self, conn: sqlalchemy.ext.asyncio.AsyncConnection):
         self._conn = conn
 
-    async def create_letter(self, arg: CreateLetterParams) -> Optional[models.Letter]:
+    async def create_letter(self, arg: CreateLetterParams) -> Optional[uuid.UUID]:
         row = (await self._conn.execute(sqlalchemy.text(CREATE_LETTER), {
             "p1": arg.buyer_name,
             "p2": arg.buyer_email,
@@ -166,77 +277,13 @@ class AsyncQuerier:
         })).first()
         if row is None:
             return None
-        return models.Letter(
-            id=row[0],
-            buyer_name=row[1],
-            buyer_email=row[2],
-            buyer_phone=row[3],
-            buyer_address_line_1=row[4],
-            buyer_address_line_2=row[5],
-            buyer_postal_code=row[6],
-            buyer_city=row[7],
-            buyer_country=row[8],
-            seller_name=row[9],
-            seller_email=row[10],
-            seller_address_line_1=row[11],
-            seller_address_line_2=row[12],
-            seller_postal_code=row[13],
-            seller_city=row[14],
-            seller_country=row[15],
-            purchase_date=row[16],
-            product_name=row[17],
-            product_price=row[18],
-            order_reference=row[19],
-            used=row[20],
-            digital=row[21],
-            defect_description=row[22],
-            remedy_preference=row[23],
-            content=row[24],
-            status=row[25],
-            created_at=row[26],
-            updated_at=row[27],
-        )
+        return row[0]
 
     async def delete_letter(self, *, id: uuid.UUID) -> None:
         await self._conn.execute(sqlalchemy.text(DELETE_LETTER), {"p1": id})
 
-    async def get_letter_by_id(self, *, id: uuid.UUID) -> Optional[models.Letter]:
-        row = (await self._conn.execute(sqlalchemy.text(GET_LETTER_BY_ID), {"p1": id})).first()
-        if row is None:
-            return None
-        return models.Letter(
-            id=row[0],
-            buyer_name=row[1],
-            buyer_email=row[2],
-            buyer_phone=row[3],
-            buyer_address_line_1=row[4],
-            buyer_address_line_2=row[5],
-            buyer_postal_code=row[6],
-            buyer_city=row[7],
-            buyer_country=row[8],
-            seller_name=row[9],
-            seller_email=row[10],
-            seller_address_line_1=row[11],
-            seller_address_line_2=row[12],
-            seller_postal_code=row[13],
-            seller_city=row[14],
-            seller_country=row[15],
-            purchase_date=row[16],
-            product_name=row[17],
-            product_price=row[18],
-            order_reference=row[19],
-            used=row[20],
-            digital=row[21],
-            defect_description=row[22],
-            remedy_preference=row[23],
-            content=row[24],
-            status=row[25],
-            created_at=row[26],
-            updated_at=row[27],
-        )
-
-    async def list_letters(self, *, page_offset: int, page_size: int) -> AsyncIterator[models.Letter]:
-        result = await self._conn.stream(sqlalchemy.text(LIST_LETTERS), {"p1": page_offset, "p2": page_size})
+    async def export_letters(self, *, created_from: datetime.datetime, created_to: datetime.datetime) -> AsyncIterator[models.Letter]:
+        result = await self._conn.stream(sqlalchemy.text(EXPORT_LETTERS), {"p1": created_from, "p2": created_to})
         async for row in result:
             yield models.Letter(
                 id=row[0],
@@ -269,8 +316,8 @@ class AsyncQuerier:
                 updated_at=row[27],
             )
 
-    async def update_content(self, *, content: Optional[str], status: models.LetterStatusEnum, id: uuid.UUID) -> Optional[models.Letter]:
-        row = (await self._conn.execute(sqlalchemy.text(UPDATE_CONTENT), {"p1": content, "p2": status, "p3": id})).first()
+    async def get_letter_by_id(self, *, id: uuid.UUID) -> Optional[models.Letter]:
+        row = (await self._conn.execute(sqlalchemy.text(GET_LETTER_BY_ID), {"p1": id})).first()
         if row is None:
             return None
         return models.Letter(
@@ -304,11 +351,11 @@ class AsyncQuerier:
             updated_at=row[27],
         )
 
-    async def update_letter_status(self, *, status: models.LetterStatusEnum, id: uuid.UUID) -> Optional[models.Letter]:
-        row = (await self._conn.execute(sqlalchemy.text(UPDATE_LETTER_STATUS), {"p1": status, "p2": id})).first()
+    async def get_letter_for_render(self, *, id: uuid.UUID) -> Optional[GetLetterForRenderRow]:
+        row = (await self._conn.execute(sqlalchemy.text(GET_LETTER_FOR_RENDER), {"p1": id})).first()
         if row is None:
             return None
-        return models.Letter(
+        return GetLetterForRenderRow(
             id=row[0],
             buyer_name=row[1],
             buyer_email=row[2],
@@ -319,22 +366,52 @@ class AsyncQuerier:
             buyer_city=row[7],
             buyer_country=row[8],
             seller_name=row[9],
-            seller_email=row[10],
-            seller_address_line_1=row[11],
-            seller_address_line_2=row[12],
-            seller_postal_code=row[13],
-            seller_city=row[14],
-            seller_country=row[15],
-            purchase_date=row[16],
-            product_name=row[17],
-            product_price=row[18],
-            order_reference=row[19],
-            used=row[20],
-            digital=row[21],
-            defect_description=row[22],
-            remedy_preference=row[23],
-            content=row[24],
-            status=row[25],
-            created_at=row[26],
-            updated_at=row[27],
+            seller_address_line_1=row[10],
+            seller_address_line_2=row[11],
+            seller_postal_code=row[12],
+            seller_city=row[13],
+            seller_country=row[14],
+            purchase_date=row[15],
+            product_name=row[16],
+            product_price=row[17],
+            order_reference=row[18],
+            used=row[19],
+            digital=row[20],
+            defect_description=row[21],
+            remedy_preference=row[22],
+            status=row[23],
         )
+
+    async def list_letters_first_page(self, *, page_size: int) -> AsyncIterator[ListLettersFirstPageRow]:
+        result = await self._conn.stream(sqlalchemy.text(LIST_LETTERS_FIRST_PAGE), {"p1": page_size})
+        async for row in result:
+            yield ListLettersFirstPageRow(
+                id=row[0],
+                buyer_name=row[1],
+                seller_name=row[2],
+                product_name=row[3],
+                product_price=row[4],
+                status=row[5],
+                created_at=row[6],
+            )
+
+    async def list_letters_page_after(self, *, cursor_created_at: datetime.datetime, cursor_id: uuid.UUID, page_size: int) -> AsyncIterator[ListLettersPageAfterRow]:
+        result = await self._conn.stream(sqlalchemy.text(LIST_LETTERS_PAGE_AFTER), {"p1": cursor_created_at, "p2": cursor_id, "p3": page_size})
+        async for row in result:
+            yield ListLettersPageAfterRow(
+                id=row[0],
+                buyer_name=row[1],
+                seller_name=row[2],
+                product_name=row[3],
+                product_price=row[4],
+                status=row[5],
+                created_at=row[6],
+            )
+
+    async def update_content(self, *, content: Optional[str], status: models.LetterStatusEnum, id: uuid.UUID) -> int:
+        result = await self._conn.execute(sqlalchemy.text(UPDATE_CONTENT), {"p1": content, "p2": status, "p3": id})
+        return result.rowcount
+
+    async def update_letter_status(self, *, status: models.LetterStatusEnum, id: uuid.UUID) -> int:
+        result = await self._conn.execute(sqlalchemy.text(UPDATE_LETTER_STATUS), {"p1": status, "p2": id})
+        return result.rowcount
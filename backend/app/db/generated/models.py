@@ -70,6 +70,23 @@ class FormDraftEvent:
     meta: Any
 
 
+@dataclasses.dataclass()
+class FormDraftFunnelDaily:
+    day: datetime.date
+    form_slug: str
+    event_type: Any
+    events: int
+    drafts: int
+
+
+@dataclasses.dataclass()
+class FormDraftFunnelReached:
+    draft_id: uuid.UUID
+    event_type: Any
+    form_slug: str
+    reached_at: datetime.datetime
+
+
 @dataclasses.dataclass()
 class Letter:
     id: uuid.UUID
@@ -100,3 +117,9 @@ class Letter:
     status: LetterStatusEnum
     created_at: datetime.datetime
     updated_at: datetime.datetime
+
+
+@dataclasses.dataclass()
+class RollupWatermark:
+    name: str
+    processed_until: datetime.datetime
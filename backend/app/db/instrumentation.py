@@ -0,0 +1,145 @@
+"""Mesure des requêtes sqlc, sans toucher au code généré.
+
+`instrumented(cls, family)` dérive une classe de querier dont chaque méthode
+publique est enveloppée : durée (histogramme par requête), lignes renvoyées,
+erreurs, et journal des requêtes lentes avec paramètres masqués. Pour les
+requêtes `:many` (générateurs), seule l'attente des lignes est comptée, pas le
+temps passé par l'appelant entre deux lignes (export en flux).
+
+Lignes : `:one` = 0 ou 1, `:many` = lignes produites, `:execrows` = lignes
+modifiées, `:exec` = 0.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import functools
+import inspect
+import logging
+import time
+from collections.abc import AsyncIterator, Callable
+from typing import Any, TypeVar
+
+from app.config import settings
+from app.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+Q = TypeVar("Q", bound=type)
+
+DB_QUERY_DURATION = registry.histogram(
+    "db_query_duration_seconds",
+    "Durée des requêtes sqlc, par requête (famille.méthode)",
+    ("query",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+DB_QUERY_ROWS_TOTAL = registry.counter(
+    "db_query_rows_total",
+    "Lignes renvoyées ou modifiées par les requêtes sqlc",
+    ("query",),
+)
+DB_QUERY_ERRORS_TOTAL = registry.counter(
+    "db_query_errors_total",
+    "Requêtes sqlc en erreur, par requête et type d'exception",
+    ("query", "error"),
+)
+
+
+def _redact(value: Any) -> str:
+    """Type (et taille) seulement : les paramètres contiennent des données personnelles."""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        fields = ", ".join(
+            f"{field.name}={_redact(getattr(value, field.name))}"
+            for field in dataclasses.fields(value)
+        )
+        return f"{type(value).__name__}({fields})"
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__} len={len(value)}>"
+    if value is None:
+        return "None"
+    return f"<{type(value).__name__}>"
+
+
+def _record(
+    query: str, elapsed: float, rows: int, args: tuple[Any, ...], kwargs: dict[str, Any]
+) -> None:
+    DB_QUERY_DURATION.observe(elapsed, query=query)
+    if rows:
+        DB_QUERY_ROWS_TOTAL.inc(rows, query=query)
+    if elapsed * 1000 >= settings.DATABASE_SLOW_QUERY_MS:
+        params = [_redact(arg) for arg in args]
+        params += [f"{name}={_redact(value)}" for name, value in kwargs.items()]
+        logger.warning(
+            "Slow query %s: %.1f ms, %d rows, params: %s",
+            query,
+            elapsed * 1000,
+            rows,
+            ", ".join(params),
+        )
+
+
+def _row_count(result: Any) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, int) and not isinstance(result, bool):
+        return result  # :execrows
+    return 1
+
+
+def _wrap_coroutine(query: str, method: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(method)
+    async def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            result = await method(self, *args, **kwargs)
+        except Exception as e:
+            DB_QUERY_ERRORS_TOTAL.inc(query=query, error=type(e).__name__)
+            raise
+        _record(query, time.perf_counter() - started, _row_count(result), args, kwargs)
+        return result
+
+    return wrapper
+
+
+def _wrap_async_generator(query: str, method: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(method)
+    async def wrapper(self: Any, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        rows = method(self, *args, **kwargs)
+        elapsed, count, failed = 0.0, 0, False
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    row = await rows.__anext__()
+                except StopAsyncIteration:
+                    elapsed += time.perf_counter() - started
+                    break
+                except Exception as e:
+                    failed = True
+                    DB_QUERY_ERRORS_TOTAL.inc(query=query, error=type(e).__name__)
+                    raise
+                elapsed += time.perf_counter() - started
+                count += 1
+                yield row
+        finally:
+            await rows.aclose()
+            # Aussi quand l'appelant s'arrête avant la fin (lignes lues jusque-là)
+            if not failed:
+                _record(query, elapsed, count, args, kwargs)
+
+    return wrapper
+
+
+@functools.cache
+def instrumented(cls: Q, family: str) -> Q:
+    """Sous-classe de `cls` dont les méthodes publiques sont mesurées."""
+    overrides: dict[str, Any] = {}
+    for name, method in inspect.getmembers(cls, inspect.isfunction):
+        if name.startswith("_"):
+            continue
+        query = f"{family}.{name}"
+        if inspect.isasyncgenfunction(method):
+            overrides[name] = _wrap_async_generator(query, method)
+        elif inspect.iscoroutinefunction(method):
+            overrides[name] = _wrap_coroutine(query, method)
+    return type(f"Instrumented{cls.__name__}", (cls,), overrides)  # type: ignore[return-value]
@@ -0,0 +1,16 @@
+-- Invalidation des caches de lettres des workers (LISTEN letter_changed)
+-- Execute: psql -d je_me_defends -f app/db/migrations/002_notify_letter_changed.sql
+
+CREATE OR REPLACE FUNCTION notify_letter_changed()
+    RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('letter_changed', OLD.id::TEXT);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS notify_letter_changed ON letter;
+CREATE TRIGGER notify_letter_changed
+    AFTER UPDATE OR DELETE ON letter
+    FOR EACH ROW
+EXECUTE FUNCTION notify_letter_changed();
@@ -0,0 +1,5 @@
+-- Index de la pagination par curseur (created_at, id) des lettres
+-- Execute: psql -d je_me_defends -f app/db/migrations/003_letter_keyset_index.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_letter_created_at_id ON letter (created_at, id);
+DROP INDEX CONCURRENTLY IF EXISTS idx_letter_created_at;
@@ -0,0 +1,114 @@
+-- Partitionnement mensuel de form_draft_event et index de purge des brouillons
+-- Execute: psql -d je_me_defends -f app/db/migrations/004_partition_form_draft_event.sql
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_form_draft_status_updated ON form_draft (status, updated_at);
+
+ALTER TABLE form_draft_event RENAME TO form_draft_event_legacy;
+ALTER INDEX idx_form_draft_event_draft RENAME TO idx_form_draft_event_legacy_draft;
+ALTER INDEX idx_form_draft_event_type RENAME TO idx_form_draft_event_legacy_type;
+
+CREATE TABLE form_draft_event (
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    draft_id UUID NOT NULL REFERENCES form_draft (id) ON DELETE CASCADE,
+    event_type FORM_DRAFT_EVENT_TYPE NOT NULL,
+    occurred_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    meta JSONB NOT NULL DEFAULT '{}'::JSONB,
+    PRIMARY KEY (id, occurred_at)
+) PARTITION BY RANGE (occurred_at);
+
+CREATE TABLE form_draft_event_default PARTITION OF form_draft_event DEFAULT;
+
+CREATE INDEX idx_form_draft_event_draft ON form_draft_event (draft_id, occurred_at);
+CREATE INDEX idx_form_draft_event_type ON form_draft_event (event_type);
+
+-- Partitions mensuelles de form_draft_event (form_draft_event_AAAAMM)
+CREATE OR REPLACE FUNCTION create_form_draft_event_partition(month_start DATE)
+    RETURNS BOOLEAN AS $$
+DECLARE
+    first_day DATE := date_trunc('month', month_start)::DATE;
+    partition_name TEXT := format('form_draft_event_%s', to_char(first_day, 'YYYYMM'));
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN FALSE;
+    END IF;
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF form_draft_event FOR VALUES FROM (%L) TO (%L)',
+        partition_name,
+        first_day,
+        (first_day + INTERVAL '1 month')::DATE
+    );
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Mois courant + `months_ahead` mois ; renvoie le nombre de partitions créées
+CREATE OR REPLACE FUNCTION ensure_form_draft_event_partitions(months_ahead INT)
+    RETURNS INT AS $$
+DECLARE
+    created INT := 0;
+BEGIN
+    FOR i IN 0..months_ahead LOOP
+        IF create_form_draft_event_partition(
+            (date_trunc('month', now()) + make_interval(months => i))::DATE
+        ) THEN
+            created := created + 1;
+        END IF;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Supprime les partitions antérieures aux `retention_months` mois précédant le
+-- mois courant ; renvoie le nombre de partitions supprimées
+CREATE OR REPLACE FUNCTION drop_form_draft_event_partitions(retention_months INT)
+    RETURNS INT AS $$
+DECLARE
+    cutoff TEXT := to_char(
+        date_trunc('month', now()) - make_interval(months => retention_months), 'YYYYMM'
+    );
+    partition_name TEXT;
+    dropped INT := 0;
+BEGIN
+    FOR partition_name IN
+        SELECT c.relname
+        FROM pg_inherits AS i
+        INNER JOIN pg_class AS c ON i.inhrelid = c.oid
+        WHERE
+            i.inhparent = 'form_draft_event'::REGCLASS
+            AND c.relname ~ '^form_draft_event_[0-9]{6}$'
+            AND right(c.relname, 6) < cutoff
+    LOOP
+        EXECUTE format('DROP TABLE %I', partition_name);
+        dropped := dropped + 1;
+    END LOOP;
+    RETURN dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Une partition par mois déjà couvert par l'historique, puis les mois à venir
+DO $$
+    DECLARE
+        month_start DATE;
+    BEGIN
+        FOR month_start IN
+            SELECT generate_series(
+                date_trunc('month', COALESCE(min(occurred_at), now())),
+                date_trunc('month', now()),
+                INTERVAL '1 month'
+            )::DATE
+            FROM form_draft_event_legacy
+        LOOP
+            PERFORM create_form_draft_event_partition(month_start);
+        END LOOP;
+    END$$;
+SELECT ensure_form_draft_event_partitions(2);
+
+INSERT INTO form_draft_event (id, draft_id, event_type, occurred_at, meta)
+SELECT id, draft_id, event_type, occurred_at, meta
+FROM form_draft_event_legacy;
+
+DROP TABLE form_draft_event_legacy;
+
+COMMIT;
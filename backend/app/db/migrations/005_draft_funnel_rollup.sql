@@ -0,0 +1,25 @@
+-- Agrégat incrémental du funnel des brouillons (jour, formulaire, événement)
+-- Execute: psql -d je_me_defends -f app/db/migrations/005_draft_funnel_rollup.sql
+-- CONCURRENTLY n'est pas possible sur une table partitionnée : l'index est
+-- créé partition par partition sous un verrou bloquant les écritures.
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_form_draft_event_occurred ON form_draft_event (occurred_at);
+
+CREATE TABLE IF NOT EXISTS form_draft_funnel_daily (
+    day DATE NOT NULL,
+    form_slug TEXT NOT NULL,
+    event_type FORM_DRAFT_EVENT_TYPE NOT NULL,
+    events INT NOT NULL DEFAULT 0,
+    -- brouillons atteignant l'étape pour la première fois ce jour-là
+    drafts INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, form_slug, event_type)
+);
+
+CREATE TABLE IF NOT EXISTS rollup_watermark (
+    name TEXT PRIMARY KEY,
+    processed_until TIMESTAMPTZ NOT NULL
+);
+
+COMMIT;
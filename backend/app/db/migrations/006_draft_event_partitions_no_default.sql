@@ -0,0 +1,35 @@
+-- Suppression de la partition DEFAULT de form_draft_event
+-- Execute: psql -d je_me_defends -f app/db/migrations/006_draft_event_partitions_no_default.sql
+-- Une ligne tombée dans la partition DEFAULT empêche ensuite de créer la
+-- partition de son mois, et DETACH PARTITION ... CONCURRENTLY (utilisé par la
+-- rétention) est refusé tant qu'une partition DEFAULT existe. Les partitions
+-- sont désormais créées d'avance par le job de rétention ; ses lignes
+-- rejoignent la partition de leur mois.
+
+BEGIN;
+
+ALTER TABLE form_draft_event DETACH PARTITION form_draft_event_default;
+
+DO $$
+    DECLARE
+        month_start DATE;
+    BEGIN
+        FOR month_start IN
+            SELECT DISTINCT date_trunc('month', occurred_at)::DATE
+            FROM form_draft_event_default
+        LOOP
+            PERFORM create_form_draft_event_partition(month_start);
+        END LOOP;
+    END$$;
+SELECT ensure_form_draft_event_partitions(2);
+
+INSERT INTO form_draft_event (id, draft_id, event_type, occurred_at, meta)
+SELECT id, draft_id, event_type, occurred_at, meta
+FROM form_draft_event_default;
+
+DROP TABLE form_draft_event_default;
+
+-- Remplacée par DETACH CONCURRENTLY + DROP depuis le job (hors transaction)
+DROP FUNCTION IF EXISTS drop_form_draft_event_partitions(INT);
+
+COMMIT;
@@ -0,0 +1,31 @@
+-- Premier passage des brouillons par chaque étape du funnel
+-- Execute: psql -d je_me_defends -f app/db/migrations/007_draft_funnel_reached.sql
+-- L'agrégat cherchait l'événement précédent dans form_draft_event : une fois la
+-- partition de cet événement supprimée, l'étape était comptée une seconde fois.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS form_draft_funnel_reached (
+    draft_id UUID NOT NULL REFERENCES form_draft (id) ON DELETE CASCADE,
+    event_type FORM_DRAFT_EVENT_TYPE NOT NULL,
+    form_slug TEXT NOT NULL,
+    reached_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (draft_id, event_type)
+);
+
+-- Étapes déjà agrégées (avant le filigrane) encore présentes dans les événements
+INSERT INTO form_draft_funnel_reached (draft_id, event_type, form_slug, reached_at)
+SELECT
+    e.draft_id,
+    e.event_type,
+    d.form_slug,
+    min(e.occurred_at)
+FROM form_draft_event AS e
+INNER JOIN form_draft AS d ON e.draft_id = d.id
+WHERE e.occurred_at < (
+    SELECT processed_until FROM rollup_watermark WHERE name = 'form_draft_funnel'
+)
+GROUP BY e.draft_id, e.event_type, d.form_slug
+ON CONFLICT (draft_id, event_type) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,150 @@
+"""Exécution native asyncpg, en requêtes préparées, des requêtes sqlc les plus chaudes.
+
+Les `AsyncQuerier` générés passent par `sqlalchemy.text()` : compilation,
+réécriture des paramètres et enveloppe de résultat à chaque appel. Les
+sous-classes ci-dessous gardent exactement la même interface mais exécutent
+`get_draft`, `merge_draft_data`, `record_draft_event`, `get_letter_by_id` et
+`get_letter_for_render` directement sur la connexion asyncpg sous-jacente, via
+des requêtes préparées nommées, créées une fois par connexion physique. Les
+autres méthodes restent celles de sqlc.
+
+Le SQL est celui généré par sqlc (converti en paramètres positionnels `$n`) et
+les codecs (jsonb, enums) sont ceux installés par le dialecte SQLAlchemy sur la
+même connexion : les valeurs renvoyées sont identiques.
+"""
+
+from __future__ import annotations
+
+import re
+import uuid
+from typing import Any
+
+import asyncpg
+
+from app.config import settings
+from app.db.connection import DBConnection
+from app.db.generated import form_draft as form_draft_sqlc
+from app.db.generated import letter as letter_sqlc
+from app.db.generated import models
+from app.db.instrumentation import instrumented
+
+_PARAM_RE = re.compile(r":p(\d+)")
+_STATEMENTS_INFO_KEY = "jmd_prepared_statements"
+
+
+def to_asyncpg_sql(sqlc_query: str) -> str:
+    """`:p1\\:\\:uuid` (SQL sqlc pour sqlalchemy.text) -> `$1::uuid`."""
+    return _PARAM_RE.sub(r"$\1", sqlc_query).replace("\\:", ":")
+
+
+async def _raw_connection(conn: DBConnection) -> Any:
+    # Pas de cache : une LazyConnection peut changer de connexion physique
+    raw = await conn.get_raw_connection()
+    adapted = raw.dbapi_connection
+    # Le dialecte asyncpg ouvre la transaction paresseusement, à la première
+    # requête qu'il exécute : on l'ouvre ici si la nôtre passe en premier
+    # (jamais en autocommit)
+    if (
+        conn.in_transaction()
+        and not getattr(adapted, "autocommit", False)
+        and not getattr(adapted, "_started", True)
+    ):
+        await adapted._start_transaction()
+    return raw
+
+
+async def asyncpg_connection(conn: DBConnection) -> asyncpg.Connection:
+    """Connexion asyncpg native, dans la transaction en cours de `conn`."""
+    return (await _raw_connection(conn)).driver_connection
+
+
+class _PreparedStatements:
+    """Accès à la connexion asyncpg d'une AsyncConnection et à ses requêtes préparées."""
+
+    def __init__(self, conn: DBConnection) -> None:
+        self._conn = conn
+
+    async def _driver_connection(self) -> tuple[asyncpg.Connection, dict[str, Any]]:
+        raw = await _raw_connection(self._conn)
+        # Requêtes préparées rattachées à la connexion physique (survivent au checkout)
+        return raw.driver_connection, raw.info.setdefault(_STATEMENTS_INFO_KEY, {})
+
+    async def statement(self, name: str, sqlc_query: str) -> asyncpg.prepared_stmt.PreparedStatement:
+        driver, statements = await self._driver_connection()
+        prepared: asyncpg.prepared_stmt.PreparedStatement | None = statements.get(name)
+        if prepared is None:
+            prepared = await driver.prepare(to_asyncpg_sql(sqlc_query), name=f"jmd_{name}")
+            statements[name] = prepared
+        return prepared
+
+
+class PreparedFormDraftQuerier(form_draft_sqlc.AsyncQuerier):
+    def __init__(self, conn: DBConnection):
+        super().__init__(conn)  # type: ignore[arg-type]
+        self._prepared = _PreparedStatements(conn)
+
+    async def get_draft(self, *, id: uuid.UUID) -> models.FormDraft | None:
+        stmt = await self._prepared.statement("get_draft", form_draft_sqlc.GET_DRAFT)
+        row = await stmt.fetchrow(id)
+        if row is None:
+            return None
+        return models.FormDraft(*row)
+
+    async def merge_draft_data(
+        self, *, id: uuid.UUID, form_slug: str, patch: Any, last_event: str | None
+    ) -> form_draft_sqlc.MergeDraftDataRow | None:
+        stmt = await self._prepared.statement("merge_draft_data", form_draft_sqlc.MERGE_DRAFT_DATA)
+        row = await stmt.fetchrow(id, form_slug, patch, last_event)
+        if row is None:
+            return None
+        return form_draft_sqlc.MergeDraftDataRow(*row)
+
+    async def record_draft_event(
+        self, *, event_type: Any, draft_id: uuid.UUID, meta: Any
+    ) -> int | None:
+        stmt = await self._prepared.statement(
+            "record_draft_event", form_draft_sqlc.RECORD_DRAFT_EVENT
+        )
+        return await stmt.fetchval(event_type, draft_id, meta)  # type: ignore[no-any-return]
+
+
+class PreparedLetterQuerier(letter_sqlc.AsyncQuerier):
+    def __init__(self, conn: DBConnection):
+        super().__init__(conn)  # type: ignore[arg-type]
+        self._prepared = _PreparedStatements(conn)
+
+    async def get_letter_by_id(self, *, id: uuid.UUID) -> models.Letter | None:
+        stmt = await self._prepared.statement("get_letter_by_id", letter_sqlc.GET_LETTER_BY_ID)
+        row = await stmt.fetchrow(id)
+        if row is None:
+            return None
+        return models.Letter(*row)
+
+    async def get_letter_for_render(
+        self, *, id: uuid.UUID
+    ) -> letter_sqlc.GetLetterForRenderRow | None:
+        stmt = await self._prepared.statement(
+            "get_letter_for_render", letter_sqlc.GET_LETTER_FOR_RENDER
+        )
+        row = await stmt.fetchrow(id)
+        if row is None:
+            return None
+        return letter_sqlc.GetLetterForRenderRow(*row)
+
+
+def form_draft_querier(conn: DBConnection) -> form_draft_sqlc.AsyncQuerier:
+    cls: type[form_draft_sqlc.AsyncQuerier] = form_draft_sqlc.AsyncQuerier
+    if settings.DATABASE_PREPARED_QUERIES:
+        cls = PreparedFormDraftQuerier
+    if settings.DATABASE_QUERY_METRICS:
+        cls = instrumented(cls, "form_draft")
+    return cls(conn)  # type: ignore[arg-type]
+
+
+def letter_querier(conn: DBConnection) -> letter_sqlc.AsyncQuerier:
+    cls: type[letter_sqlc.AsyncQuerier] = letter_sqlc.AsyncQuerier
+    if settings.DATABASE_PREPARED_QUERIES:
+        cls = PreparedLetterQuerier
+    if settings.DATABASE_QUERY_METRICS:
+        cls = instrumented(cls, "letter")
+    return cls(conn)  # type: ignore[arg-type]
@@ -1,3 +1,14 @@
+-- Autosave en écriture différée : patchs coalescés de plusieurs brouillons
+-- appliqués en une requête (un patch par brouillon)
+-- name: ApplyDraftPatches :execrows
+UPDATE form_draft AS d
+SET
+    data = d.data || p.patch::jsonb,
+    last_event = 'autosave',
+    updated_at = now()
+FROM unnest(@ids::uuid[], @patches::text[]) AS p (id, patch)
+WHERE d.id = p.id AND d.status != 'expired';
+
 -- name: CreateDraft :one
 INSERT INTO form_draft (
     form_slug,
@@ -29,13 +40,40 @@ FROM form_draft
 WHERE id = @id::uuid
 LIMIT 1;
 
--- name: UpdateDraftData :exec
-UPDATE form_draft
-SET
-    data = @data::jsonb,
-    last_event = sqlc.narg('last_event')::text,
-    updated_at = now()
-WHERE id = @id::uuid;
+-- Autosave atomique : fusion JSONB côté serveur (clés du patch prioritaires),
+-- brouillon créé s'il n'existe pas (plus) ; aucune ligne si le brouillon a expiré.
+-- previous_data : données avant fusion (NULL si créé), pour détecter les changements
+-- name: MergeDraftData :one
+WITH previous AS (
+    SELECT data FROM form_draft WHERE id = @id::uuid
+)
+INSERT INTO form_draft (
+    id,
+    form_slug,
+    data,
+    last_event
+)
+VALUES (
+    @id::uuid,
+    @form_slug::text,
+    @patch::jsonb,
+    sqlc.narg('last_event')::text
+)
+ON CONFLICT (id) DO UPDATE
+    SET
+        data = form_draft.data || excluded.data,
+        last_event = excluded.last_event,
+        updated_at = now()
+    WHERE form_draft.status != 'expired'
+RETURNING
+    id,
+    form_slug,
+    data,
+    status,
+    created_at,
+    updated_at,
+    last_event,
+    (SELECT p.data FROM previous AS p) AS previous_data;
 
 -- name: MarkDraftSubmitted :exec
 UPDATE form_draft
@@ -44,14 +82,221 @@ SET
     updated_at = now()
 WHERE id = @id::uuid;
 
--- name: AddDraftEvent :exec
-INSERT INTO form_draft_event (
-    draft_id,
-    event_type,
-    meta
+-- Événement du funnel en une requête : insertion + last_event / updated_at,
+-- sans toucher à `data` ; 0 si le brouillon n'existe pas ou a expiré
+-- name: RecordDraftEvent :one
+WITH touched AS (
+    UPDATE form_draft
+    SET
+        last_event = (@event_type::form_draft_event_type)::text,
+        updated_at = now()
+    WHERE id = @draft_id::uuid AND status != 'expired'
+    RETURNING id
+),
+
+inserted AS (
+    INSERT INTO form_draft_event (
+        draft_id,
+        event_type,
+        meta
+    )
+    SELECT
+        id,
+        @event_type::form_draft_event_type,
+        @meta::jsonb
+    FROM touched
+    RETURNING draft_id
 )
-VALUES (
-    @draft_id::uuid,
-    @event_type::form_draft_event_type,
-    @meta::jsonb
+
+SELECT count(*)::int AS recorded
+FROM inserted;
+
+-- Rétention : brouillons inactifs passés en `expired`, par lots
+-- name: ExpireStaleDrafts :execrows
+UPDATE form_draft
+SET
+    status = 'expired',
+    updated_at = now()
+WHERE id IN (
+    SELECT id
+    FROM form_draft
+    WHERE
+        status = 'editing'
+        AND updated_at < now() - make_interval(days => @stale_after_days::int)
+    ORDER BY updated_at
+    LIMIT @batch_size::int
+    FOR UPDATE SKIP LOCKED
 );
+
+-- Rétention : suppression par lots (événements supprimés en cascade). Un
+-- brouillon n'est supprimé qu'une fois tous ses événements agrégés (filigrane
+-- du funnel au-delà de sa dernière activité)
+-- name: PurgeExpiredDrafts :execrows
+DELETE FROM form_draft
+WHERE id IN (
+    SELECT id
+    FROM form_draft
+    WHERE
+        status IN ('expired', 'abandoned')
+        AND updated_at < now() - make_interval(days => @purge_after_days::int)
+        AND updated_at < COALESCE(
+            (SELECT processed_until FROM rollup_watermark WHERE name = 'form_draft_funnel'),
+            'infinity'::timestamptz
+        )
+    ORDER BY updated_at
+    LIMIT @batch_size::int
+    FOR UPDATE SKIP LOCKED
+);
+
+-- name: EnsureDraftEventPartitions :one
+SELECT ensure_form_draft_event_partitions(@months_ahead::int)::int AS created;
+
+-- Partitions antérieures aux `retention_months` mois précédant le mois courant,
+-- y compris celles dont un DETACH CONCURRENTLY a été interrompu (detach_pending)
+-- ou déjà détachées mais pas encore supprimées (attached = false)
+-- name: ListExpiredDraftEventPartitions :many
+SELECT
+    c.relname::text AS partition_name,
+    i.inhrelid IS NOT NULL AS attached,
+    COALESCE(i.inhdetachpending, FALSE) AS detach_pending
+FROM pg_class AS c
+LEFT JOIN pg_inherits AS i
+    ON c.oid = i.inhrelid AND i.inhparent = 'form_draft_event'::regclass
+WHERE
+    c.relkind = 'r'
+    AND c.relnamespace = current_schema()::regnamespace
+    AND c.relname ~ '^form_draft_event_[0-9]{6}$'
+    AND right(c.relname, 6) < to_char(
+        date_trunc('month', now()) - make_interval(months => @retention_months::int),
+        'YYYYMM'
+    )
+ORDER BY c.relname;
+
+-- Fin de la dernière partition mensuelle attachée : au-delà, les insertions
+-- d'événements échouent (pas de partition DEFAULT)
+-- name: GetDraftEventPartitionsCoveredUntil :one
+SELECT max(to_date(right(c.relname, 6), 'YYYYMM') + INTERVAL '1 month')::timestamptz
+    AS covered_until
+FROM pg_inherits AS i
+INNER JOIN pg_class AS c ON i.inhrelid = c.oid
+WHERE
+    i.inhparent = 'form_draft_event'::regclass
+    AND NOT i.inhdetachpending
+    AND c.relname ~ '^form_draft_event_[0-9]{6}$';
+
+-- Agrégat incrémental du funnel : événements de [filigrane, now() - lag[, par
+-- fenêtres d'au plus `window_hours`. `drafts` ne compte que le premier
+-- événement de chaque type d'un brouillon (jour où l'étape est atteinte) :
+-- form_draft_funnel_reached garde ce premier passage, indépendamment des
+-- partitions d'événements déjà supprimées.
+-- name: RollupDraftFunnel :one
+WITH bounds AS (
+    SELECT
+        w.lo,
+        GREATEST(
+            w.lo,
+            LEAST(
+                now() - make_interval(secs => @lag_seconds::int),
+                w.lo + make_interval(hours => @window_hours::int)
+            )
+        ) AS hi
+    FROM (
+        SELECT
+            COALESCE(
+                (SELECT processed_until FROM rollup_watermark WHERE name = 'form_draft_funnel'),
+                (SELECT min(occurred_at) FROM form_draft_event),
+                now() - make_interval(secs => @lag_seconds::int)
+            ) AS lo
+    ) AS w
+),
+
+new_events AS (
+    SELECT
+        e.id,
+        e.draft_id,
+        d.form_slug,
+        e.event_type,
+        e.occurred_at
+    FROM form_draft_event AS e
+    INNER JOIN form_draft AS d ON e.draft_id = d.id
+    CROSS JOIN bounds AS b
+    WHERE e.occurred_at >= b.lo AND e.occurred_at < b.hi
+),
+
+reached AS (
+    INSERT INTO form_draft_funnel_reached (draft_id, event_type, form_slug, reached_at)
+    SELECT DISTINCT ON (draft_id, event_type)
+        draft_id,
+        event_type,
+        form_slug,
+        occurred_at
+    FROM new_events
+    ORDER BY draft_id, event_type, occurred_at, id
+    ON CONFLICT (draft_id, event_type) DO NOTHING
+    RETURNING form_slug, event_type, reached_at
+),
+
+counts AS (
+    SELECT
+        (occurred_at AT TIME ZONE @time_zone::text)::date AS day,
+        form_slug,
+        event_type,
+        1 AS events,
+        0 AS drafts
+    FROM new_events
+    UNION ALL
+    SELECT
+        (reached_at AT TIME ZONE @time_zone::text)::date AS day,
+        form_slug,
+        event_type,
+        0 AS events,
+        1 AS drafts
+    FROM reached
+),
+
+upserted AS (
+    INSERT INTO form_draft_funnel_daily (day, form_slug, event_type, events, drafts)
+    SELECT
+        day,
+        form_slug,
+        event_type,
+        sum(events)::int,
+        sum(drafts)::int
+    FROM counts
+    GROUP BY day, form_slug, event_type
+    ON CONFLICT (day, form_slug, event_type) DO UPDATE
+        SET
+            events = form_draft_funnel_daily.events + excluded.events,
+            drafts = form_draft_funnel_daily.drafts + excluded.drafts
+    RETURNING 1
+),
+
+watermark AS (
+    INSERT INTO rollup_watermark (name, processed_until)
+    SELECT 'form_draft_funnel', hi FROM bounds
+    ON CONFLICT (name) DO UPDATE SET processed_until = excluded.processed_until
+)
+
+SELECT
+    b.hi AS processed_until,
+    b.hi >= now() - make_interval(secs => @lag_seconds::int) AS caught_up,
+    (SELECT count(*) FROM upserted)::int AS groups
+FROM bounds AS b;
+
+-- name: GetDraftFunnelWatermark :one
+SELECT processed_until
+FROM rollup_watermark
+WHERE name = 'form_draft_funnel';
+
+-- name: ListDraftFunnelDaily :many
+SELECT
+    day,
+    form_slug,
+    event_type,
+    events,
+    drafts
+FROM form_draft_funnel_daily
+WHERE
+    day BETWEEN @day_from::date AND @day_to::date
+    AND (sqlc.narg(form_slug)::text IS NULL OR form_slug = sqlc.narg(form_slug)::text)
+ORDER BY day, form_slug, event_type;
@@ -46,7 +46,7 @@ INSERT INTO letter (
              @used::boolean,
              @digital::boolean
          )
-RETURNING *;
+RETURNING id;
 
 
 -- name: GetLetterById :one
@@ -55,28 +55,88 @@ FROM letter
 WHERE id = @id::uuid
 LIMIT 1;
 
--- name: UpdateContent :one
+-- Projection des gabarits (aperçu, PDF) : sans `content` ni horodatages
+-- name: GetLetterForRender :one
+SELECT
+    id,
+    buyer_name,
+    buyer_email,
+    buyer_phone,
+    buyer_address_line_1,
+    buyer_address_line_2,
+    buyer_postal_code,
+    buyer_city,
+    buyer_country,
+    seller_name,
+    seller_address_line_1,
+    seller_address_line_2,
+    seller_postal_code,
+    seller_city,
+    seller_country,
+    purchase_date,
+    product_name,
+    product_price,
+    order_reference,
+    used,
+    digital,
+    defect_description,
+    remedy_preference,
+    status
+FROM letter
+WHERE id = @id::uuid
+LIMIT 1;
+
+-- name: UpdateContent :execrows
 UPDATE letter
 SET
     content = sqlc.narg('content')::text,
     status = @status::letter_status_enum,
     updated_at = now()
-WHERE id = @id::uuid
-RETURNING *;
+WHERE id = @id::uuid;
 
--- name: UpdateLetterStatus :one
+-- name: UpdateLetterStatus :execrows
 UPDATE letter
 SET
     status = @status::letter_status_enum,
     updated_at = now()
-WHERE id = @id::uuid
-RETURNING *;
+WHERE id = @id::uuid;
+
+-- Pagination par curseur (created_at, id) : coût constant quelle que soit la page
+-- Projection résumé (listing) : ni textes libres ni adresses
+-- Deux requêtes plutôt qu'un `curseur IS NULL OR ...` : avec un plan générique
+-- (requête préparée), ce OR empêche le parcours borné de l'index
+-- name: ListLettersFirstPage :many
+SELECT
+    id,
+    buyer_name,
+    seller_name,
+    product_name,
+    product_price,
+    status,
+    created_at
+FROM letter
+ORDER BY created_at DESC, id DESC
+LIMIT @page_size::int;
+
+-- name: ListLettersPageAfter :many
+SELECT
+    id,
+    buyer_name,
+    seller_name,
+    product_name,
+    product_price,
+    status,
+    created_at
+FROM letter
+WHERE (created_at, id) < (@cursor_created_at::timestamptz, @cursor_id::uuid)
+ORDER BY created_at DESC, id DESC
+LIMIT @page_size::int;
 
--- name: ListLetters :many
+-- name: ExportLetters :many
 SELECT *
 FROM letter
-ORDER BY created_at DESC
-LIMIT @page_size::int OFFSET @page_offset::int;
+WHERE created_at >= @created_from::timestamptz AND created_at < @created_to::timestamptz
+ORDER BY created_at ASC, id ASC;
 
 -- name: DeleteLetter :exec
 DELETE FROM letter
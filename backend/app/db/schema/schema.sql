@@ -84,7 +84,7 @@ CREATE TABLE letter (
                         updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL
 );
 
-CREATE INDEX idx_letter_created_at ON letter (created_at);
+CREATE INDEX idx_letter_created_at_id ON letter (created_at, id);
 CREATE INDEX idx_letter_status ON letter (status);
 
 -- Trigger function for automatic updated_at timestamps
@@ -101,6 +101,20 @@ CREATE TRIGGER set_timestamp_letter
     FOR EACH ROW
 EXECUTE FUNCTION trigger_set_timestamp();
 
+-- Invalidation des caches de lettres des workers (LISTEN letter_changed)
+CREATE OR REPLACE FUNCTION notify_letter_changed()
+    RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('letter_changed', OLD.id::TEXT);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER notify_letter_changed
+    AFTER UPDATE OR DELETE ON letter
+    FOR EACH ROW
+EXECUTE FUNCTION notify_letter_changed();
+
 -- 1. Créer le type enum pour les événements de draft (funnel)
 DO $$
     BEGIN
@@ -140,17 +154,95 @@ CREATE TABLE IF NOT EXISTS form_draft (
 );
 
 CREATE INDEX IF NOT EXISTS idx_form_draft_slug_status ON form_draft (form_slug, status);
+-- Expiration / purge par lots des brouillons inactifs
+CREATE INDEX IF NOT EXISTS idx_form_draft_status_updated ON form_draft (status, updated_at);
 
--- 4. Table des événements (funnel)
+-- 4. Table des événements (funnel), partitionnée par mois sur occurred_at
 CREATE TABLE IF NOT EXISTS form_draft_event (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
     draft_id UUID NOT NULL REFERENCES form_draft (id) ON DELETE CASCADE,
     event_type FORM_DRAFT_EVENT_TYPE NOT NULL,
     occurred_at TIMESTAMPTZ NOT NULL DEFAULT now(),
-    meta JSONB NOT NULL DEFAULT '{}'::JSONB
-);
+    meta JSONB NOT NULL DEFAULT '{}'::JSONB,
+    PRIMARY KEY (id, occurred_at)
+) PARTITION BY RANGE (occurred_at);
+
+-- Pas de partition DEFAULT : elle bloquerait DETACH PARTITION ... CONCURRENTLY
+-- et la création de la partition d'un mois dont elle contient des lignes. Le job
+-- de rétention crée les partitions d'avance (DRAFT_EVENT_PARTITIONS_AHEAD).
 
 CREATE INDEX IF NOT EXISTS idx_form_draft_event_draft ON form_draft_event (
     draft_id, occurred_at
 );
 CREATE INDEX IF NOT EXISTS idx_form_draft_event_type ON form_draft_event (event_type);
+-- Agrégat incrémental du funnel (parcours des événements depuis le filigrane)
+CREATE INDEX IF NOT EXISTS idx_form_draft_event_occurred ON form_draft_event (occurred_at);
+
+-- Partitions mensuelles de form_draft_event (form_draft_event_AAAAMM)
+CREATE OR REPLACE FUNCTION create_form_draft_event_partition(month_start DATE)
+    RETURNS BOOLEAN AS $$
+DECLARE
+    first_day DATE := date_trunc('month', month_start)::DATE;
+    partition_name TEXT := format('form_draft_event_%s', to_char(first_day, 'YYYYMM'));
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN FALSE;
+    END IF;
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF form_draft_event FOR VALUES FROM (%L) TO (%L)',
+        partition_name,
+        first_day,
+        (first_day + INTERVAL '1 month')::DATE
+    );
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Mois courant + `months_ahead` mois ; renvoie le nombre de partitions créées
+CREATE OR REPLACE FUNCTION ensure_form_draft_event_partitions(months_ahead INT)
+    RETURNS INT AS $$
+DECLARE
+    created INT := 0;
+BEGIN
+    FOR i IN 0..months_ahead LOOP
+        IF create_form_draft_event_partition(
+            (date_trunc('month', now()) + make_interval(months => i))::DATE
+        ) THEN
+            created := created + 1;
+        END IF;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT ensure_form_draft_event_partitions(2);
+
+-- 5. Funnel agrégé par jour (Europe/Paris), formulaire et type d'événement.
+-- Alimenté par le job d'agrégat à partir du filigrane ; survit à la
+-- suppression des partitions d'événements.
+CREATE TABLE IF NOT EXISTS form_draft_funnel_daily (
+    day DATE NOT NULL,
+    form_slug TEXT NOT NULL,
+    event_type FORM_DRAFT_EVENT_TYPE NOT NULL,
+    events INT NOT NULL DEFAULT 0,
+    -- brouillons atteignant l'étape pour la première fois ce jour-là
+    drafts INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, form_slug, event_type)
+);
+
+-- Premier passage de chaque brouillon par chaque étape, tenu par le job
+-- d'agrégat (colonne `drafts` du funnel) ; supprimé avec le brouillon
+CREATE TABLE IF NOT EXISTS form_draft_funnel_reached (
+    draft_id UUID NOT NULL REFERENCES form_draft (id) ON DELETE CASCADE,
+    event_type FORM_DRAFT_EVENT_TYPE NOT NULL,
+    form_slug TEXT NOT NULL,
+    reached_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (draft_id, event_type)
+);
+
+-- Filigranes des agrégats incrémentaux : tout ce qui précède
+-- `processed_until` a été agrégé
+CREATE TABLE IF NOT EXISTS rollup_watermark (
+    name TEXT PRIMARY KEY,
+    processed_until TIMESTAMPTZ NOT NULL
+);
@@ -1,34 +1,136 @@
+import contextlib
 import logging
-from collections.abc import AsyncGenerator
+import secrets
+import time
+from collections.abc import AsyncGenerator, Callable
+from http.cookies import SimpleCookie
 from typing import Annotated
 
-from fastapi import Depends
+from fastapi import Depends, Header, HTTPException, Request
 from jinja2 import Environment, FileSystemLoader
-from sqlalchemy.ext.asyncio import AsyncConnection
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.config import settings
+from app.core.ai_service import ScalewayAIService
+from app.core.autosave_buffer import DraftAutosaveBuffer, draft_autosave_buffer
 from app.core.form_draft_repository import PostgresFormDraftRepository
 from app.core.form_draft_service import FormDraftService
 from app.core.letter_generator import LetterGenerator
+from app.core.letter_import import LetterImporter
 from app.core.letter_repository import SqlcLetterRepository
 from app.core.letter_service import LetterService
 from app.core.pdf_service import PDFService, create_pdf_service
-from app.db.connection import get_db_connection
-from core.ai_service import ScalewayAIService
+from app.core.product_prefetch import (
+    ProductNormalizationPrefetcher,
+    product_prefetcher,
+)
+from app.db.connection import (
+    LazyConnection,
+    get_db_connection,
+    get_readonly_db_connection,
+)
 
 logger = logging.getLogger(__name__)
 
+# Lecture de ses propres écritures : après une écriture, le client lit sur le
+# primaire jusqu'à cette échéance (cookie, car les requêtes suivantes peuvent
+# arriver sur un autre worker)
+PRIMARY_STICKY_COOKIE = "jmd_primary_until"
 
-async def get_database() -> AsyncGenerator[AsyncConnection, None]:
-    logger.debug("Initializing database connection")
-    async for db in get_db_connection():
+
+def _stick_to_primary(request: Request) -> Callable[[], None]:
+    def _mark() -> None:
+        request.state.db_wrote = True
+
+    return _mark
+
+
+def _primary_sticky_cookie() -> str:
+    seconds = int(settings.DATABASE_REPLICA_STICKY_SECONDS) + 1
+    cookie: SimpleCookie = SimpleCookie()
+    cookie[PRIMARY_STICKY_COOKIE] = str(int(time.time()) + seconds)
+    morsel = cookie[PRIMARY_STICKY_COOKIE]
+    morsel["max-age"] = seconds
+    morsel["httponly"] = True
+    morsel["samesite"] = "lax"
+    morsel["path"] = "/"
+    return morsel.OutputString()
+
+
+class PrimaryStickyMiddleware:
+    """Pose le cookie de lecture sur le primaire sur la réponse réellement envoyée.
+
+    Un cookie posé sur la `Response` injectée est perdu quand l'endpoint renvoie
+    sa propre réponse (PDF, CSV) : on lit `request.state.db_wrote` au début de
+    l'envoi."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            state = scope.get("state", {})
+            if message["type"] == "http.response.start" and state.get("db_wrote"):
+                headers = MutableHeaders(scope=message)
+                headers.append("set-cookie", _primary_sticky_cookie())
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+def _reads_own_writes(request: Request) -> bool:
+    if getattr(request.state, "db_wrote", False):
+        return True
+    with contextlib.suppress(ValueError):
+        return int(request.cookies.get(PRIMARY_STICKY_COOKIE, "0")) > time.time()
+    return False
+
+
+async def get_database(request: Request) -> AsyncGenerator[LazyConnection, None]:
+    """Connexion transactionnelle au primaire, acquise au premier accès à la base."""
+    on_write = _stick_to_primary(request) if settings.DATABASE_REPLICA_URLS else None
+    async for db in get_db_connection(on_write=on_write):
+        yield db
+
+
+async def get_readonly_database(
+    request: Request,
+    writer: Annotated[LazyConnection, Depends(get_database)],
+) -> AsyncGenerator[LazyConnection, None]:
+    """Connexion en autocommit pour les lectures pures (réplica si disponible).
+
+    Liée à la connexion d'écriture de la requête (acquise seulement si elle
+    sert) : après une écriture, les lectures suivantes la voient."""
+    async for db in get_readonly_db_connection(
+        prefer_primary=_reads_own_writes(request), writer=writer
+    ):
         yield db
 
 
 async def get_letter_repository(
-    db: Annotated[AsyncConnection, Depends(get_database)],
+    db: Annotated[LazyConnection, Depends(get_database)],
+    read_db: Annotated[LazyConnection, Depends(get_readonly_database)],
 ) -> SqlcLetterRepository:
     logger.debug("Creating letter repository")
-    return SqlcLetterRepository(db)
+    return SqlcLetterRepository(db, read_connection=read_db)
+
+
+async def get_readonly_letter_repository(
+    db: Annotated[LazyConnection, Depends(get_readonly_database)],
+) -> SqlcLetterRepository:
+    logger.debug("Creating read-only letter repository")
+    return SqlcLetterRepository(db, read_connection=db)
+
+
+async def get_letter_importer(
+    repository: Annotated[SqlcLetterRepository, Depends(get_letter_repository)],
+) -> LetterImporter:
+    return LetterImporter(repository)
 
 
 def get_pdf_service() -> PDFService:
@@ -57,20 +159,81 @@ async def get_letter_service(
     )
 
 
+async def get_readonly_letter_service(
+    repository: Annotated[SqlcLetterRepository, Depends(get_readonly_letter_repository)],
+    pdf_service: Annotated[PDFService, Depends(get_pdf_service)],
+    template_env: Annotated[Environment, Depends(get_template_env)],
+) -> LetterService:
+    logger.debug("Creating read-only letter service")
+    return LetterService(
+        repository=repository,
+        pdf_service=pdf_service,
+        template_env=template_env,
+        generator=LetterGenerator(),
+    )
+
+
+async def get_snapshot_database() -> AsyncGenerator[LazyConnection, None]:
+    """Lecture seule dans un instantané cohérent (curseurs serveur, listings)."""
+    async for db in get_readonly_db_connection(snapshot=True):
+        yield db
+
+
+async def get_snapshot_letter_repository(
+    db: Annotated[LazyConnection, Depends(get_snapshot_database)],
+) -> SqlcLetterRepository:
+    return SqlcLetterRepository(db, read_connection=db)
+
+
+def require_admin(authorization: Annotated[str | None, Header()] = None) -> None:
+    if not settings.ADMIN_API_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    expected = f"Bearer {settings.ADMIN_API_TOKEN}"
+    if authorization is None or not secrets.compare_digest(authorization, expected):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid admin token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
 def get_form_draft_repository(
-    db: Annotated[AsyncConnection, Depends(get_database)],
+    db: Annotated[LazyConnection, Depends(get_database)],
+    read_db: Annotated[LazyConnection, Depends(get_readonly_database)],
 ) -> PostgresFormDraftRepository:
     logger.debug("Creating form draft repository")
-    return PostgresFormDraftRepository(db)
+    return PostgresFormDraftRepository(db, read_connection=read_db)
+
+
+async def get_snapshot_form_draft_repository(
+    db: Annotated[LazyConnection, Depends(get_snapshot_database)],
+) -> PostgresFormDraftRepository:
+    return PostgresFormDraftRepository(db, read_connection=db)
+
+
+def get_product_prefetcher() -> ProductNormalizationPrefetcher:
+    return product_prefetcher
+
+
+def get_autosave_buffer() -> DraftAutosaveBuffer | None:
+    return draft_autosave_buffer if draft_autosave_buffer.enabled else None
 
 
 def get_form_draft_service(
     repository: Annotated[
         PostgresFormDraftRepository, Depends(get_form_draft_repository)
     ],
+    prefetcher: Annotated[
+        ProductNormalizationPrefetcher, Depends(get_product_prefetcher)
+    ],
+    autosave_buffer: Annotated[
+        DraftAutosaveBuffer | None, Depends(get_autosave_buffer)
+    ],
 ) -> FormDraftService:
     logger.debug("Creating form draft service")
-    return FormDraftService(repository)
+    return FormDraftService(
+        repository, product_prefetcher=prefetcher, autosave_buffer=autosave_buffer
+    )
 
 
 def get_ai_service() -> ScalewayAIService:
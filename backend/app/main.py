@@ -1,15 +1,25 @@
 import logging
 import sys
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from starlette.templating import _TemplateResponse
 
 from app.api.router import api_router
 from app.config import settings
+from app.core.autosave_buffer import draft_autosave_buffer
+from app.core.draft_funnel import draft_funnel_rollup_job
+from app.core.draft_retention import draft_retention_job
+from app.core.letter_cache import letter_cache
+from app.core.product_prefetch import product_prefetcher
+from app.db.connection import db_pool
+from app.dependencies import PrimaryStickyMiddleware, require_admin
+from app.utils.metrics import registry as metrics_registry
 
 logging.basicConfig(
     level=logging.DEBUG,
@@ -27,12 +37,43 @@ logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
 
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    if settings.DATABASE_URL:
+        await db_pool.create_engine()
+        try:
+            await db_pool.warm_up(settings.DATABASE_POOL_WARMUP_CONNECTIONS)
+        except Exception as e:
+            # Base indisponible au démarrage : le pool se connectera à la demande
+            logger.error("Database pool warm-up failed: %s", e)
+        db_pool.start_health_checks(settings.DATABASE_HEALTH_CHECK_INTERVAL_SECONDS)
+        letter_cache.start(settings.DATABASE_URL)
+        draft_retention_job.start()
+        draft_funnel_rollup_job.start()
+        draft_autosave_buffer.start()
+    else:
+        logger.warning("DATABASE_URL not configured - database pool not initialized")
+
+    yield
+
+    # Avant la fermeture du pool : écrit les autosaves encore en attente
+    await draft_autosave_buffer.close()
+    await draft_funnel_rollup_job.close()
+    await draft_retention_job.close()
+    await product_prefetcher.close()
+    await letter_cache.close()
+    await db_pool.close_engine()
+    logger.info("Database pool disposed")
+
+
 app = FastAPI(
     title="Je me défends API",
     description="Aide aux particuliers pour les litiges de consommation face aux professionnels",
     version="1.0.0",
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
+    lifespan=lifespan,
 )
 
 logger.info("FastAPI application initialized - Debug mode: %s", settings.DEBUG)
@@ -45,6 +86,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 logger.info("CORS middleware configured - Origins: %s", settings.ALLOWED_ORIGINS)
+# Cookie de lecture sur le primaire après une écriture (réplicas de lecture)
+app.add_middleware(PrimaryStickyMiddleware)
 
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 logger.info("Static files mounted at /static")
@@ -112,3 +155,11 @@ async def politique_confidentialite_page(request: Request) -> _TemplateResponse:
 async def health_check() -> dict[str, str]:
     logger.info("Health check requested")
     return {"status": "healthy", "service": "je-me-defends"}
+
+
+# Coûts IA, état des pools : réservé à l'admin (scrape avec le jeton ADMIN_API_TOKEN)
+@app.get(
+    "/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_admin)]
+)
+async def metrics() -> str:
+    return metrics_registry.render()
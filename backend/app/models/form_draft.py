@@ -1,4 +1,5 @@
 import dataclasses
+import datetime
 import enum
 import uuid
 from typing import Any
@@ -42,3 +43,28 @@ class DraftEvent:
 class DraftUpdateResult:
     draft: FormDraft
     saved: bool
+
+
+@dataclasses.dataclass(frozen=True)
+class DraftMergeResult:
+    draft: FormDraft
+    previous_data: dict[str, Any]  # données avant le patch ({} si brouillon créé)
+
+
+@dataclasses.dataclass(frozen=True)
+class DraftFunnelCount:
+    day: datetime.date
+    form_slug: str
+    event_type: DraftEventType
+    events: int
+    drafts: int  # brouillons atteignant l'étape pour la première fois ce jour-là
+
+
+@dataclasses.dataclass(frozen=True)
+class DraftFunnelStats:
+    day_from: datetime.date
+    day_to: datetime.date
+    form_slug: str | None
+    processed_until: datetime.datetime | None  # événements agrégés jusqu'à
+    totals: dict[DraftEventType, int]  # brouillons par étape sur la période
+    days: list[DraftFunnelCount]
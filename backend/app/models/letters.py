@@ -1,7 +1,7 @@
 """
 Modèles Pydantic pour les lettres - Minimal changes
 """
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
 from enum import Enum
 from typing import Optional
@@ -104,6 +104,23 @@ class Letter(BaseModel):
     digital: bool
 
 
+class LetterSummary(BaseModel):
+    """Résumé d'une lettre (listings)"""
+    id: str
+    buyer_name: str
+    seller_name: str
+    product_name: str
+    product_price: Decimal
+    status: LetterStatus
+    created_at: datetime
+
+
+class LetterPage(BaseModel):
+    """Page de lettres (plus récentes d'abord) et curseur de la suivante"""
+    items: list[LetterSummary]
+    next_cursor: Optional[str] = None
+
+
 class PDFOptions(BaseModel):
     """Options de génération PDF"""
     format: str = "A4"
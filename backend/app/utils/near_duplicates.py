@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import struct
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+V = TypeVar("V")
+
+_HASHES_PER_DIGEST = 16  # blake2b 64 octets = 16 valeurs de 32 bits
+
+
+def normalize_for_shingles(text: str) -> str:
+    """Minuscules, sans accents ni ponctuation, espaces compactés."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+
+def shingles(text: str, k: int) -> set[str]:
+    """k-grammes de caractères du texte normalisé."""
+    normalized = normalize_for_shingles(text)
+    if len(normalized) <= k:
+        return {normalized}
+    return {normalized[i : i + k] for i in range(len(normalized) - k + 1)}
+
+
+@dataclass(frozen=True)
+class NearDuplicate(Generic[V]):
+    value: V
+    similarity: float  # Jaccard estimée via les signatures MinHash
+
+
+@dataclass
+class _Entry(Generic[V]):
+    namespace: Hashable
+    signature: tuple[int, ...]
+    value: V
+
+
+class MinHashLSHIndex(Generic[V]):
+    """Index en mémoire (par worker) des textes quasi identiques.
+
+    Signature MinHash sur les k-grammes de caractères, découpée en bandes (LSH)
+    pour ne comparer que les candidats partageant au moins une bande. Nombre
+    d'entrées borné, éviction LRU. `namespace` isole les textes non comparables
+    (ex. contexte différent)."""
+
+    def __init__(
+        self,
+        maxsize: int,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 4,
+    ) -> None:
+        if num_perm % bands or num_perm % _HASHES_PER_DIGEST:
+            raise ValueError("num_perm doit être un multiple de bands et de 16")
+        self.maxsize = maxsize
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        # Familles de hachage indépendantes : blake2b salé (calcul en C, pas de
+        # boucle Python par permutation)
+        self._salts = [
+            i.to_bytes(hashlib.blake2b.SALT_SIZE, "little")
+            for i in range(num_perm // _HASHES_PER_DIGEST)
+        ]
+        self._unpack = struct.Struct(f"<{num_perm}I").unpack
+        self._entries: OrderedDict[int, _Entry[V]] = OrderedDict()
+        self._buckets: dict[tuple[Hashable, int, tuple[int, ...]], set[int]] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def signature(self, text: str) -> tuple[int, ...]:
+        rows = [
+            self._unpack(
+                b"".join(hashlib.blake2b(gram.encode(), salt=salt).digest() for salt in self._salts)
+            )
+            for gram in shingles(text, self.shingle_size)
+        ]
+        return tuple(map(min, zip(*rows)))
+
+    def _band_keys(
+        self, namespace: Hashable, signature: tuple[int, ...]
+    ) -> list[tuple[Hashable, int, tuple[int, ...]]]:
+        return [
+            (namespace, band, signature[band * self.rows : (band + 1) * self.rows])
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def _similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+        return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+    def query(
+        self, text: str, min_similarity: float, namespace: Hashable = None
+    ) -> NearDuplicate[V] | None:
+        """Entrée la plus proche de `text` si sa similarité atteint `min_similarity`."""
+        signature = self.signature(text)
+        candidates: set[int] = set()
+        for key in self._band_keys(namespace, signature):
+            candidates |= self._buckets.get(key, set())
+
+        best_id, best_similarity = None, 0.0
+        for entry_id in candidates:
+            similarity = self._similarity(signature, self._entries[entry_id].signature)
+            if similarity > best_similarity:
+                best_id, best_similarity = entry_id, similarity
+        if best_id is None or best_similarity < min_similarity:
+            return None
+        self._entries.move_to_end(best_id)
+        return NearDuplicate(self._entries[best_id].value, best_similarity)
+
+    def add(self, text: str, value: V, namespace: Hashable = None) -> None:
+        if self.maxsize <= 0:
+            return
+        signature = self.signature(text)
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = _Entry(namespace, signature, value)
+        for key in self._band_keys(namespace, signature):
+            self._buckets.setdefault(key, set()).add(entry_id)
+        while len(self._entries) > self.maxsize:
+            self._evict()
+
+    def _evict(self) -> None:
+        entry_id, entry = self._entries.popitem(last=False)
+        for key in self._band_keys(entry.namespace, entry.signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._buckets.clear()
@@ -0,0 +1,312 @@
+"""Évaluation hors-ligne qualité / latence des prompts et modèles IA.
+
+Rejoue un jeu de référence (data/ai_eval_golden.json) à travers le vrai
+`ScalewayAIService` (prompts, parsing, routage) pour une ou plusieurs
+variantes, puis compare côte à côte : exactitude de la normalisation,
+règles de reformulation, tokens et latence.
+
+Sources de réponses :
+- mock local (scripts/ai_mock_server.py) ou API réelle : --base-url ;
+- rejeu d'un enregistrement : --replay fichier.jsonl (créé avec --record).
+
+Variantes (fichier JSON, --variants) :
+    [{"name": "baseline"},
+     {"name": "llama-8b", "models": {"normalize": "llama-3.1-8b-instruct"}},
+     {"name": "short-prompt", "service": "mon_module:ShortPromptService"}]
+`service` désigne une sous-classe de ScalewayAIService qui surcharge
+`_get_system_prompt` / `_get_system_prompt_product`.
+
+    uv run python scripts/ai_eval.py --base-url http://localhost:8090/v1 \\
+        --variants variants.json --record data/ai_eval_replay.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import importlib
+import json
+import re
+import statistics
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import aiohttp  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.core.ai_routing import ai_router  # noqa: E402
+from app.core.ai_service import (  # noqa: E402
+    ProductNormalizationRequest,
+    ReformulationRequest,
+    ScalewayAIService,
+)
+
+GOLDEN_PATH = Path(__file__).resolve().parents[1] / "data" / "ai_eval_golden.json"
+
+PostOnce = Callable[
+    [str, dict[str, Any], aiohttp.ClientTimeout],
+    Awaitable[tuple[int, dict[str, Any] | None, str]],
+]
+
+
+def _cache_key(payload: dict[str, Any]) -> str:
+    raw = json.dumps(
+        {"model": payload.get("model"), "messages": payload.get("messages")},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+@dataclass
+class CallLog:
+    latencies: list[float] = field(default_factory=list)
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class ResponseTape:
+    """Enregistre ou rejoue les réponses `/chat/completions` (JSONL)."""
+
+    def __init__(self, path: Path, replay: bool) -> None:
+        self.path = path
+        self.replay = replay
+        self.entries: dict[str, dict[str, Any]] = {}
+        if replay:
+            with path.open(encoding="utf-8") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    self.entries[entry["key"]] = entry
+
+    def wrap(self, post_once: PostOnce, log: CallLog) -> PostOnce:
+        async def _wrapped(
+            operation: str, payload: dict[str, Any], timeout: aiohttp.ClientTimeout
+        ) -> tuple[int, dict[str, Any] | None, str]:
+            key = _cache_key(payload)
+            if self.replay:
+                entry = self.entries.get(key)
+                if entry is None:
+                    return 404, None, "absent de l'enregistrement"
+                latency = float(entry["latency"])
+                status, result, error = entry["status"], entry["result"], entry["error"]
+            else:
+                started = time.perf_counter()
+                status, result, error = await post_once(operation, payload, timeout)
+                latency = time.perf_counter() - started
+                with self.path.open("a", encoding="utf-8") as f:
+                    f.write(json.dumps({
+                        "key": key, "latency": latency, "status": status,
+                        "result": result, "error": error,
+                    }, ensure_ascii=False) + "\n")
+            log.latencies.append(latency)
+            usage = (result or {}).get("usage") or {}
+            log.prompt_tokens += int(usage.get("prompt_tokens") or 0)
+            log.completion_tokens += int(usage.get("completion_tokens") or 0)
+            return status, result, error
+
+        return _wrapped
+
+
+class LiveLogger:
+    def wrap(self, post_once: PostOnce, log: CallLog) -> PostOnce:
+        async def _wrapped(
+            operation: str, payload: dict[str, Any], timeout: aiohttp.ClientTimeout
+        ) -> tuple[int, dict[str, Any] | None, str]:
+            started = time.perf_counter()
+            status, result, error = await post_once(operation, payload, timeout)
+            log.latencies.append(time.perf_counter() - started)
+            usage = (result or {}).get("usage") or {}
+            log.prompt_tokens += int(usage.get("prompt_tokens") or 0)
+            log.completion_tokens += int(usage.get("completion_tokens") or 0)
+            return status, result, error
+
+        return _wrapped
+
+
+def check_reformulation(case: dict[str, Any], output: str | None) -> list[str]:
+    """Règles de qualité d'une reformulation ; renvoie la liste des échecs."""
+    if not output:
+        return ["vide"]
+    if case.get("expect_incomprehensible"):
+        return [] if "PROBLEME_INCOMPRIS" in output else ["incompris attendu"]
+    failures = []
+    if "PROBLEME_INCOMPRIS" in output:
+        failures.append("incompris à tort")
+    if not output[0].isupper():
+        failures.append("majuscule initiale")
+    if not output.endswith((".", "!", "?")):
+        failures.append("ponctuation finale")
+    if re.search(r"(?i)défaut de conformité|présente un défaut", output):
+        failures.append("redite défaut de conformité")
+    if len(output) > 3 * len(case["text"]):
+        failures.append("trop longue")
+    failures += [f"manque « {t} »" for t in case["must_include"] if not re.search(t, output)]
+    failures += [f"contient « {t} »" for t in case["must_not_include"] if re.search(t, output, re.I)]
+    return failures
+
+
+@dataclass
+class VariantReport:
+    name: str
+    norm_exact: int = 0
+    norm_prefix: int = 0
+    norm_total: int = 0
+    reform_pass: int = 0
+    reform_total: int = 0
+    errors: int = 0
+    norm_log: CallLog = field(default_factory=CallLog)
+    reform_log: CallLog = field(default_factory=CallLog)
+    failures: list[str] = field(default_factory=list)
+
+
+def build_service(variant: dict[str, Any]) -> ScalewayAIService:
+    service_cls: type[ScalewayAIService] = ScalewayAIService
+    if spec := variant.get("service"):
+        module_name, _, class_name = spec.partition(":")
+        service_cls = getattr(importlib.import_module(module_name), class_name)
+    return service_cls()
+
+
+def apply_models(variant: dict[str, Any], base_routes: dict[str, Any]) -> None:
+    ai_router.routes = dict(base_routes)
+    for operation, model in (variant.get("models") or {}).items():
+        ai_router.routes[operation] = base_routes[operation].model_copy(
+            update={"primary_model": model, "fallback_model": None}
+        )
+
+
+async def run_variant(
+    variant: dict[str, Any],
+    golden: dict[str, Any],
+    args: argparse.Namespace,
+    tape: ResponseTape | LiveLogger,
+    base_routes: dict[str, Any],
+) -> VariantReport:
+    apply_models(variant, base_routes)
+    report = VariantReport(name=variant["name"])
+
+    service = build_service(variant)
+    service.api_url = args.base_url or service.api_url
+    service.api_key = args.api_key or service.api_key or "mock"
+    post_once = service._post_once
+
+    service._post_once = tape.wrap(post_once, report.norm_log)  # type: ignore[method-assign]
+    for case in golden["normalization"]:
+        report.norm_total += 1
+        request = ProductNormalizationRequest(
+            declared_type=case["declared_type"], raw_name=case["raw_name"]
+        )
+        result = await service._normalize_product_name_uncached(request)
+        if not result.success:
+            report.errors += 1
+            report.failures.append(f"[norm] {case['raw_name']}: {result.error}")
+            continue
+        report.norm_exact += result.group_noun == case["group_noun"]
+        report.norm_prefix += result.acquisition_prefix == case["acquisition_prefix"]
+        if result.group_noun != case["group_noun"]:
+            report.failures.append(
+                f"[norm] {case['raw_name']}: « {result.group_noun} » ≠ « {case['group_noun']} »"
+            )
+
+    service._post_once = tape.wrap(post_once, report.reform_log)  # type: ignore[method-assign]
+    for case in golden["reformulation"]:
+        report.reform_total += 1
+        try:
+            reformulation = await service.reformulate_text(ReformulationRequest(text=case["text"]))
+            output = reformulation.reformulated_text if reformulation.success else None
+        except Exception as e:
+            output = None
+            report.failures.append(f"[reform] {case['text'][:40]}: {e}")
+        if output is None:
+            report.errors += 1
+            continue
+        failures = check_reformulation(case, output)
+        report.reform_pass += not failures
+        if failures:
+            report.failures.append(f"[reform] {case['text'][:40]}: {', '.join(failures)}")
+    return report
+
+
+def _ms(values: list[float], q: float) -> str:
+    if not values:
+        return "-"
+    if len(values) == 1:
+        return f"{values[0] * 1000:.0f}"
+    return f"{statistics.quantiles(values, n=100, method='inclusive')[round(q * 100) - 1] * 1000:.0f}"
+
+
+def _pct(part: int, total: int) -> str:
+    return f"{100 * part / total:.0f}%" if total else "-"
+
+
+def print_reports(reports: list[VariantReport], verbose: bool) -> None:
+    rows = [
+        ("norm exact", lambda r: _pct(r.norm_exact, r.norm_total)),
+        ("norm prefix", lambda r: _pct(r.norm_prefix, r.norm_total)),
+        ("reform rules", lambda r: _pct(r.reform_pass, r.reform_total)),
+        ("errors", lambda r: str(r.errors)),
+        ("norm tokens in/out", lambda r: f"{r.norm_log.prompt_tokens}/{r.norm_log.completion_tokens}"),
+        ("reform tokens in/out", lambda r: f"{r.reform_log.prompt_tokens}/{r.reform_log.completion_tokens}"),
+        ("norm p50/p95 ms", lambda r: f"{_ms(r.norm_log.latencies, .5)}/{_ms(r.norm_log.latencies, .95)}"),
+        ("reform p50/p95 ms", lambda r: f"{_ms(r.reform_log.latencies, .5)}/{_ms(r.reform_log.latencies, .95)}"),
+    ]
+    width = max(20, *(len(r.name) + 2 for r in reports))
+    print("\n" + f"{'':<22}" + "".join(f"{r.name:>{width}}" for r in reports))
+    for label, value in rows:
+        print(f"{label:<22}" + "".join(f"{value(r):>{width}}" for r in reports))
+    if verbose:
+        for report in reports:
+            print(f"\n== {report.name} ==")
+            for failure in report.failures:
+                print(f"  {failure}")
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    golden = json.loads(Path(args.golden).read_text(encoding="utf-8"))
+    variants = (
+        json.loads(Path(args.variants).read_text(encoding="utf-8"))
+        if args.variants
+        else [{"name": "baseline"}]
+    )
+    # Évaluation déterministe : ni cache, ni règles locales, ni déduplication des
+    # reformulations, ni hedging
+    settings.PRODUCT_NORMALIZATION_LOCAL_RULES = args.local_rules
+    settings.AI_REFORMULATION_DEDUP_ENABLED = False
+    settings.AI_HEDGING_ENABLED = False
+
+    tape: ResponseTape | LiveLogger
+    if args.replay:
+        tape = ResponseTape(Path(args.replay), replay=True)
+    elif args.record:
+        tape = ResponseTape(Path(args.record), replay=False)
+    else:
+        tape = LiveLogger()
+
+    base_routes = dict(ai_router.routes)
+    reports = [await run_variant(v, golden, args, tape, base_routes) for v in variants]
+    print_reports(reports, args.verbose)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--golden", default=str(GOLDEN_PATH))
+    parser.add_argument("--variants", help="fichier JSON listant les variantes")
+    parser.add_argument("--base-url", help="ex. http://localhost:8090/v1 (mock local)")
+    parser.add_argument("--api-key")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--record", help="enregistrer les réponses (JSONL)")
+    source.add_argument("--replay", help="rejouer des réponses enregistrées (JSONL)")
+    parser.add_argument("--local-rules", action="store_true", help="inclure le fast path local")
+    parser.add_argument("-v", "--verbose", action="store_true", help="détail des échecs")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Charge les endpoints IA du backend avec N utilisateurs concurrents.
+
+Rapporte débit (req/s), erreurs et percentiles de latence par endpoint.
+
+    uv run python scripts/ai_load_test.py --users 20 --duration 60 --scenario mixed
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any
+
+import aiohttp
+
+DEFECT_DESCRIPTIONS = (
+    "mon telephone seteint souvent sai relou",
+    "bluetooth marche plus apres 2 mois",
+    "l'écran est tout noir on voit rien",
+    "la machine a laver fuit a chaque lavage depuis une semaine",
+    "le casque gresille a gauche quand je monte le son",
+    "ordi tres lent et ventilateur bruyant depuis la mise a jour",
+)
+
+PRODUCT_NAMES = (
+    ("bien", "samsung a22+"),
+    ("bien", "aspirateur dyson v15"),
+    ("service", "abonnement salle de sport"),
+    ("bien", "imprimante hp deskjet 2720"),
+    ("service", "Generative API"),
+    ("bien", "trottinette xiaomi pro 2"),
+)
+
+
+@dataclass
+class Results:
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    statuses: dict[str, Counter[str]] = field(default_factory=lambda: defaultdict(Counter))
+
+
+def reformulate_request(args: argparse.Namespace) -> tuple[str, str, dict[str, Any]]:
+    text = random.choice(DEFECT_DESCRIPTIONS)
+    if args.unique_texts:
+        # Suffixe unique : évite les reformulations quasi identiques déjà servies
+        text = f"{text} (ref {uuid.uuid4().hex[:6]})"
+    return (
+        "reformulate-text",
+        "/letters/reformulate-text",
+        {"text": text, "type": "reformulated"},
+    )
+
+
+def normalize_request(args: argparse.Namespace) -> tuple[str, str, dict[str, Any]]:
+    declared_type, raw_name = random.choice(PRODUCT_NAMES)
+    if args.unique_names:
+        # Suffixe unique : évite le cache et les règles locales, force l'appel IA
+        raw_name = f"{raw_name} {uuid.uuid4().hex[:6]}"
+    return (
+        "normalize-product-name",
+        "/letters/normalize-product-name",
+        {"declared_type": declared_type, "raw_name": raw_name},
+    )
+
+
+SCENARIOS = {
+    "reformulate": (reformulate_request,),
+    "normalize": (normalize_request,),
+    "mixed": (reformulate_request, normalize_request),
+}
+
+
+async def user_loop(
+    session: aiohttp.ClientSession,
+    args: argparse.Namespace,
+    deadline: float,
+    results: Results,
+) -> None:
+    builders = SCENARIOS[args.scenario]
+    while time.perf_counter() < deadline:
+        name, path, body = random.choice(builders)(args)
+        started = time.perf_counter()
+        try:
+            async with session.post(f"{args.base_url}{path}", json=body) as response:
+                await response.read()
+                status = str(response.status)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            status = type(e).__name__
+        results.latencies[name].append(time.perf_counter() - started)
+        results.statuses[name][status] += 1
+        if args.think_time_ms:
+            await asyncio.sleep(random.uniform(0, 2 * args.think_time_ms) / 1000)
+
+
+def _percentiles(values: list[float]) -> dict[str, float]:
+    if len(values) < 2:
+        only = values[0] * 1000 if values else 0.0
+        return {"p50": only, "p90": only, "p95": only, "p99": only, "max": only}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {
+        "p50": cuts[49] * 1000,
+        "p90": cuts[89] * 1000,
+        "p95": cuts[94] * 1000,
+        "p99": cuts[98] * 1000,
+        "max": max(values) * 1000,
+    }
+
+
+def print_report(results: Results, elapsed: float, users: int) -> None:
+    total = sum(len(v) for v in results.latencies.values())
+    print(f"\nUsers: {users}  Duration: {elapsed:.1f}s  Requests: {total}  "
+          f"Throughput: {total / elapsed:.2f} req/s\n")
+    header = f"{'endpoint':<24}{'count':>7}{'req/s':>8}{'err%':>7}" + "".join(
+        f"{k:>9}" for k in ("p50", "p90", "p95", "p99", "max")
+    )
+    print(header)
+    print("-" * len(header))
+    for name, latencies in sorted(results.latencies.items()):
+        statuses = results.statuses[name]
+        errors = sum(c for s, c in statuses.items() if s != "200")
+        pct = _percentiles(latencies)
+        print(
+            f"{name:<24}{len(latencies):>7}{len(latencies) / elapsed:>8.2f}"
+            f"{100 * errors / len(latencies):>6.1f}%"
+            + "".join(f"{pct[k]:>7.0f}ms" for k in ("p50", "p90", "p95", "p99", "max"))
+        )
+        print(f"{'':<24}statuses: {dict(statuses)}")
+
+
+async def run(args: argparse.Namespace) -> None:
+    results = Results()
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    connector = aiohttp.TCPConnector(limit=args.users)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(
+            *(user_loop(session, args, deadline, results) for _ in range(args.users))
+        )
+        elapsed = time.perf_counter() - started
+    print_report(results, elapsed, args.users)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=30.0, help="secondes")
+    parser.add_argument("--scenario", choices=tuple(SCENARIOS), default="mixed")
+    parser.add_argument("--think-time-ms", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument(
+        "--no-unique-names",
+        dest="unique_names",
+        action="store_false",
+        help="réutiliser les noms de produit (mesure le cache / les règles locales)",
+    )
+    parser.add_argument(
+        "--no-unique-texts",
+        dest="unique_texts",
+        action="store_false",
+        help="réutiliser les descriptions (mesure la déduplication des reformulations)",
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
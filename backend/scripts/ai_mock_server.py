@@ -0,0 +1,192 @@
+"""Serveur local compatible Scaleway `/chat/completions` (streaming et non-streaming).
+
+Permet de mesurer le chemin client IA sans appeler l'API payante.
+
+    uv run python scripts/ai_mock_server.py --port 8090 --latency lognormal \\
+        --latency-ms 800 --error-rate 0.02 --mode canned
+
+Puis lancer le backend avec :
+    SCALEWAY_AI_API_URL=http://localhost:8090/v1 SCALEWAY_AI_API_KEY=mock
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any
+
+from aiohttp import web
+
+logger = logging.getLogger("ai_mock_server")
+
+REFORMULATION_REPLY = "L’appareil présente un dysfonctionnement de manière récurrente."
+
+
+@dataclass(frozen=True)
+class MockConfig:
+    latency: str
+    latency_ms: float
+    latency_sigma: float
+    token_delay_ms: float
+    error_rate: float
+    error_statuses: tuple[int, ...]
+    mode: str
+
+
+def sample_latency(config: MockConfig) -> float:
+    """Latence simulée en secondes selon la distribution choisie."""
+    base = config.latency_ms / 1000
+    if config.latency == "fixed":
+        return base
+    if config.latency == "uniform":
+        return random.uniform(0, 2 * base)
+    if config.latency == "exponential":
+        return random.expovariate(1 / base) if base > 0 else 0.0
+    # lognormal : latency_ms = médiane, sigma contrôle la longueur de la queue
+    return random.lognormvariate(math.log(base), config.latency_sigma) if base > 0 else 0.0
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _last_user_message(messages: list[dict[str, Any]]) -> str:
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            return str(message.get("content", ""))
+    return ""
+
+
+def build_reply(messages: list[dict[str, Any]], mode: str) -> str:
+    user_text = _last_user_message(messages)
+    if mode == "echo":
+        return user_text
+
+    system = str(messages[0].get("content", "")) if messages else ""
+    if "group_noun" in system:
+        raw_name = user_text
+        for line in user_text.splitlines():
+            if line.lower().startswith("nom brut"):
+                raw_name = line.split(":", 1)[-1].strip()
+                break
+        return json.dumps(
+            {"group_noun": f"un produit {raw_name}", "acquisition_prefix": "d’"},
+            ensure_ascii=False,
+        )
+    return REFORMULATION_REPLY
+
+
+def _completion_body(model: str, content: str, prompt_tokens: int) -> dict[str, Any]:
+    completion_tokens = estimate_tokens(content)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def _chunk(model: str, chunk_id: str, delta: dict[str, Any], finish: str | None) -> bytes:
+    body = {
+        "id": chunk_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+    }
+    return f"data: {json.dumps(body, ensure_ascii=False)}\n\n".encode()
+
+
+async def chat_completions(request: web.Request) -> web.StreamResponse:
+    config: MockConfig = request.app["config"]
+    payload = await request.json()
+    model = str(payload.get("model", "mock-model"))
+    messages: list[dict[str, Any]] = payload.get("messages", [])
+    prompt_tokens = sum(estimate_tokens(str(m.get("content", ""))) for m in messages)
+
+    await asyncio.sleep(sample_latency(config))
+
+    if random.random() < config.error_rate:
+        status = random.choice(config.error_statuses)
+        return web.json_response(
+            {"message": "mock upstream error", "type": "mock_error"}, status=status
+        )
+
+    content = build_reply(messages, config.mode)
+    if not payload.get("stream"):
+        return web.json_response(_completion_body(model, content, prompt_tokens))
+
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+    await response.prepare(request)
+    chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+    await response.write(_chunk(model, chunk_id, {"role": "assistant"}, None))
+    for index, word in enumerate(content.split(" ")):
+        await asyncio.sleep(config.token_delay_ms / 1000)
+        piece = word if index == 0 else f" {word}"
+        await response.write(_chunk(model, chunk_id, {"content": piece}, None))
+    await response.write(_chunk(model, chunk_id, {}, "stop"))
+    await response.write(b"data: [DONE]\n\n")
+    await response.write_eof()
+    return response
+
+
+def create_app(config: MockConfig) -> web.Application:
+    app = web.Application()
+    app["config"] = config
+    app.router.add_post("/chat/completions", chat_completions)
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument(
+        "--latency",
+        choices=("fixed", "uniform", "exponential", "lognormal"),
+        default="lognormal",
+    )
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="médiane / moyenne")
+    parser.add_argument("--latency-sigma", type=float, default=0.6, help="queue lognormale")
+    parser.add_argument("--token-delay-ms", type=float, default=20.0, help="délai entre chunks SSE")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-statuses", default="500,503,429")
+    parser.add_argument("--mode", choices=("canned", "echo"), default="canned")
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency=args.latency,
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        token_delay_ms=args.token_delay_ms,
+        error_rate=args.error_rate,
+        error_statuses=tuple(int(s) for s in args.error_statuses.split(",") if s),
+        mode=args.mode,
+    )
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(message)s")
+    logger.info("Mock Scaleway AI on http://%s:%d - %s", args.host, args.port, config)
+    web.run_app(create_app(config), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Micro-benchmark des requêtes sqlc chaudes : sqlalchemy.text() vs asyncpg préparé.
+
+Rejoue le cycle d'un autosave (get_draft, merge_draft_data, record_draft_event)
+et une lecture de lettre sur un brouillon / une lettre de test, avec chacun des
+deux backends de querier, dans des transactions annulées (aucune donnée
+conservée). Nécessite DATABASE_URL.
+
+    uv run python scripts/bench_querier.py --iterations 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncConnection  # noqa: E402
+
+from app.db.connection import db_pool  # noqa: E402
+from app.db.generated import form_draft as form_draft_sqlc  # noqa: E402
+from app.db.generated import letter as letter_sqlc  # noqa: E402
+from app.db.prepared import PreparedFormDraftQuerier, PreparedLetterQuerier  # noqa: E402
+
+Operation = Callable[[], Awaitable[object]]
+
+
+async def _time(op: Operation, iterations: int) -> list[float]:
+    for _ in range(min(50, iterations)):  # préchauffage (préparation, caches)
+        await op()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await op()
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    return samples
+
+
+async def _bench_backend(
+    conn: AsyncConnection, prepared: bool, iterations: int
+) -> dict[str, list[float]]:
+    drafts = PreparedFormDraftQuerier(conn) if prepared else form_draft_sqlc.AsyncQuerier(conn)
+    letters = PreparedLetterQuerier(conn) if prepared else letter_sqlc.AsyncQuerier(conn)
+
+    draft = await drafts.create_draft(form_slug="bench", data=json.dumps({"step": 1}))
+    assert draft is not None
+    letter_id = (
+        await conn.execute(text("SELECT id FROM letter LIMIT 1"))
+    ).scalar_one_or_none() or uuid.uuid4()
+    payload = json.dumps({"product_name": "iphone 13", "step": 2})
+
+    return {
+        "get_draft": await _time(lambda: drafts.get_draft(id=draft.id), iterations),
+        "merge_draft_data": await _time(
+            lambda: drafts.merge_draft_data(
+                id=draft.id, form_slug="bench", patch=payload, last_event="autosave"
+            ),
+            iterations,
+        ),
+        "record_draft_event": await _time(
+            lambda: drafts.record_draft_event(
+                event_type="preview_view", draft_id=draft.id, meta="{}"
+            ),
+            iterations,
+        ),
+        "get_letter_by_id": await _time(lambda: letters.get_letter_by_id(id=letter_id), iterations),
+    }
+
+
+async def main_async(iterations: int) -> None:
+    await db_pool.create_engine()
+    engine = db_pool.engine
+    assert engine is not None
+    results: dict[str, dict[str, list[float]]] = {}
+    try:
+        for name, prepared in (("text()", False), ("asyncpg", True)):
+            async with engine.connect() as conn:
+                transaction = await conn.begin()
+                try:
+                    results[name] = await _bench_backend(conn, prepared, iterations)
+                finally:
+                    await transaction.rollback()
+    finally:
+        await db_pool.close_engine()
+
+    print(f"{'requête':<20}{'backend':<10}{'p50 µs':>10}{'p95 µs':>10}{'moy. µs':>10}")
+    for query in results["text()"]:
+        for backend, by_query in results.items():
+            samples = by_query[query]
+            p95 = statistics.quantiles(samples, n=20)[-1]
+            print(
+                f"{query:<20}{backend:<10}{statistics.median(samples):>10.0f}"
+                f"{p95:>10.0f}{statistics.fmean(samples):>10.0f}"
+            )
+        speedup = statistics.median(results["text()"][query]) / statistics.median(
+            results["asyncpg"][query]
+        )
+        print(f"{'':<20}{'gain':<10}{speedup:>9.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    asyncio.run(main_async(parser.parse_args().iterations))
+
+
+if __name__ == "__main__":
+    main()
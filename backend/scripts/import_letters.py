@@ -0,0 +1,92 @@
+"""Import en masse de lettres pré-remplies depuis un fichier JSON ou NDJSON.
+
+Chaque lot est validé puis chargé par COPY dans sa propre transaction (cf.
+app/core/letter_import.py). Nécessite DATABASE_URL.
+
+    uv run python scripts/import_letters.py partenaire.ndjson --batch-size 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config import settings  # noqa: E402
+from app.core.letter_import import LetterImporter, LetterImportResult  # noqa: E402
+from app.core.letter_repository import SqlcLetterRepository  # noqa: E402
+from app.db.connection import LazyConnection, db_pool  # noqa: E402
+
+
+def load_rows(path: Path) -> list[dict[str, Any]]:
+    content = path.read_text(encoding="utf-8")
+    if content.lstrip().startswith("["):
+        rows: list[dict[str, Any]] = json.loads(content)
+        return rows
+    return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+
+async def import_batch(rows: list[dict[str, Any]], all_or_nothing: bool) -> LetterImportResult:
+    conn = LazyConnection(db_pool)
+    try:
+        result = await LetterImporter(SqlcLetterRepository(conn)).import_rows(rows, all_or_nothing)
+    except BaseException:
+        await conn.release(commit=False)
+        raise
+    await conn.release()
+    return result
+
+
+async def main_async(path: Path, batch_size: int, all_or_nothing: bool, max_errors: int) -> int:
+    rows = load_rows(path)
+    await db_pool.create_engine()
+    started = time.perf_counter()
+    inserted = rejected = 0
+    try:
+        for offset in range(0, len(rows), batch_size):
+            result = await import_batch(rows[offset : offset + batch_size], all_or_nothing)
+            inserted += result.rows_inserted
+            rejected += len({error.index for error in result.errors})
+            print(
+                f"lot {offset // batch_size + 1}: {result.rows_inserted}/{result.rows_received} "
+                f"insérées, {result.rows_per_second:.0f} lignes/s"
+            )
+            for error in result.errors[:max_errors]:
+                print(f"  ligne {offset + error.index}: {error.field or '-'}: {error.message}")
+            if len(result.errors) > max_errors:
+                print(f"  ... {len(result.errors) - max_errors} autres erreurs")
+    finally:
+        await db_pool.close_engine()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"total : {inserted} insérées, {rejected} rejetées sur {len(rows)} "
+        f"en {elapsed:.2f}s ({inserted / elapsed if elapsed else 0:.0f} lignes/s)"
+    )
+    return 1 if rejected else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file", type=Path, help="tableau JSON ou NDJSON de LetterRequest")
+    parser.add_argument("--batch-size", type=int, default=settings.LETTER_IMPORT_MAX_ROWS)
+    parser.add_argument(
+        "--all-or-nothing",
+        action="store_true",
+        help="n'insérer aucune ligne d'un lot contenant une erreur",
+    )
+    parser.add_argument("--max-errors", type=int, default=20, help="erreurs affichées par lot")
+    args = parser.parse_args()
+    sys.exit(
+        asyncio.run(main_async(args.file, args.batch_size, args.all_or_nothing, args.max_errors))
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+"""Configuration pytest commune : le code du backend est importé comme paquet `app`."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1] / "backend"
+
+sys.path.insert(0, str(BACKEND_DIR))
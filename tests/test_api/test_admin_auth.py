@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import importlib
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+TOKEN = "test-admin-token"
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> TestClient:
+    # app.main monte app/static et app/templates en chemins relatifs
+    monkeypatch.chdir(BACKEND_DIR)
+    monkeypatch.setattr(settings, "ADMIN_API_TOKEN", TOKEN)
+    main = importlib.import_module("app.main")
+    # Sans lifespan : aucune connexion à la base
+    return TestClient(main.app)
+
+
+@pytest.mark.parametrize("path", ["/api/v1/ai/usage", "/metrics"])
+def test_requires_admin_token(client: TestClient, path: str) -> None:
+    assert client.get(path).status_code == 401
+    wrong = client.get(path, headers={"Authorization": "Bearer nope"})
+    assert wrong.status_code == 401
+    ok = client.get(path, headers={"Authorization": f"Bearer {TOKEN}"})
+    assert ok.status_code == 200
+
+
+@pytest.mark.parametrize("path", ["/api/v1/ai/usage", "/metrics"])
+def test_disabled_without_admin_token(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch, path: str
+) -> None:
+    monkeypatch.setattr(settings, "ADMIN_API_TOKEN", "")
+    assert client.get(path).status_code == 404
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import letters
+from app.config import settings
+from app.core import ai_service
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> TestClient:
+    monkeypatch.setattr(settings, "PRODUCT_NORMALIZATION_LOCAL_RULES", True)
+    ai_service._product_name_cache.clear()
+    app = FastAPI()
+    app.include_router(letters.router, prefix="/letters")
+    return TestClient(app)
+
+
+def test_batch_rejects_overlong_raw_name_with_422(client: TestClient) -> None:
+    response = client.post(
+        "/letters/normalize-product-names",
+        json={
+            "items": [
+                {"declared_type": "bien", "raw_name": "iphone 13"},
+                {"declared_type": "bien", "raw_name": "x" * 201},
+            ]
+        },
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "items", 1, "raw_name"]
+
+
+def test_single_rejects_overlong_raw_name_with_422(client: TestClient) -> None:
+    response = client.post(
+        "/letters/normalize-product-name",
+        json={"declared_type": "bien", "raw_name": "x" * 201},
+    )
+    assert response.status_code == 422
+
+
+def test_batch_keeps_input_order(client: TestClient) -> None:
+    response = client.post(
+        "/letters/normalize-product-names",
+        json={
+            "items": [
+                {"declared_type": "bien", "raw_name": "aspirateur"},
+                {"declared_type": "bien", "raw_name": "iphone 13"},
+                {"declared_type": "bien", "raw_name": "aspirateur"},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    assert [r["group_noun"] for r in response.json()["results"]] == [
+        "un aspirateur",
+        "un smartphone iPhone 13",
+        "un aspirateur",
+    ]
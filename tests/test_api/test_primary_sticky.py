@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from starlette.responses import PlainTextResponse
+
+from app.config import settings
+from app.dependencies import (
+    PRIMARY_STICKY_COOKIE,
+    PrimaryStickyMiddleware,
+    _reads_own_writes,
+    _stick_to_primary,
+)
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> TestClient:
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_STICKY_SECONDS", 10.0)
+    app = FastAPI()
+    app.add_middleware(PrimaryStickyMiddleware)
+
+    @app.post("/write")
+    async def write(request: Request) -> PlainTextResponse:
+        # Ce que fait LazyConnection (on_write) à l'ouverture de la transaction,
+        # puis une réponse propre à l'endpoint (PDF, CSV)
+        _stick_to_primary(request)()
+        return PlainTextResponse("ok")
+
+    @app.get("/read")
+    async def read(request: Request) -> dict[str, bool]:
+        return {"primary": _reads_own_writes(request)}
+
+    return TestClient(app)
+
+
+def test_reads_go_to_replicas_without_recent_write(client: TestClient) -> None:
+    response = client.get("/read")
+    assert PRIMARY_STICKY_COOKIE not in response.cookies
+    assert response.json() == {"primary": False}
+
+
+def test_write_sets_cookie_on_the_endpoint_own_response(client: TestClient) -> None:
+    response = client.post("/write")
+    assert response.text == "ok"
+    assert PRIMARY_STICKY_COOKIE in response.cookies
+
+
+def test_next_request_reads_its_writes_on_primary(client: TestClient) -> None:
+    client.post("/write")
+    assert client.get("/read").json() == {"primary": True}
+
+
+def test_expired_cookie_reads_from_replicas(client: TestClient) -> None:
+    client.cookies.set(PRIMARY_STICKY_COOKIE, "1")
+    assert client.get("/read").json() == {"primary": False}
+    client.cookies.set(PRIMARY_STICKY_COOKIE, "garbage")
+    assert client.get("/read").json() == {"primary": False}
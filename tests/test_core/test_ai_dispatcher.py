@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.core.ai_dispatcher import AIDispatcher, AIOverloadedError, AIPriority
+
+INTERACTIVE = AIPriority.INTERACTIVE
+BACKGROUND = AIPriority.BACKGROUND
+
+
+def _dispatcher(
+    max_concurrency: int = 2,
+    interactive_reserved: int = 1,
+    background_max_queue: int = 10,
+    background_max_wait: float = 5.0,
+) -> AIDispatcher:
+    return AIDispatcher(
+        max_concurrency=max_concurrency,
+        interactive_reserved=interactive_reserved,
+        background_max_queue=background_max_queue,
+        background_max_wait=background_max_wait,
+    )
+
+
+def _set() -> asyncio.Event:
+    event = asyncio.Event()
+    event.set()
+    return event
+
+
+async def _hold(
+    dispatcher: AIDispatcher,
+    priority: AIPriority,
+    release: asyncio.Event,
+    order: list[str] | None = None,
+    name: str = "",
+) -> None:
+    async with dispatcher.slot(priority):
+        if order is not None:
+            order.append(name)
+        await release.wait()
+
+
+def test_waiting_interactive_calls_go_before_background() -> None:
+    async def scenario() -> list[str]:
+        dispatcher = _dispatcher(max_concurrency=1, interactive_reserved=0)
+        order: list[str] = []
+        busy, done = asyncio.Event(), _set()
+        holder = asyncio.create_task(_hold(dispatcher, INTERACTIVE, busy))
+        await asyncio.sleep(0)
+        background = asyncio.create_task(
+            _hold(dispatcher, BACKGROUND, done, order, "background")
+        )
+        await asyncio.sleep(0)
+        interactive = [
+            asyncio.create_task(_hold(dispatcher, INTERACTIVE, done, order, f"i{n}"))
+            for n in range(2)
+        ]
+        await asyncio.sleep(0)
+        busy.set()
+        await asyncio.gather(holder, *interactive)
+        # Le travail de fond en file a été délesté au profit de l'interactif
+        with pytest.raises(AIOverloadedError) as shed:
+            await background
+        assert shed.value.reason == "interactive_waiting"
+        return order
+
+    assert asyncio.run(scenario()) == ["i0", "i1"]
+
+
+def test_reserved_slots_stay_free_for_interactive_calls() -> None:
+    async def scenario() -> None:
+        dispatcher = _dispatcher(max_concurrency=2, interactive_reserved=1)
+        release = asyncio.Event()
+        background = asyncio.create_task(_hold(dispatcher, BACKGROUND, release))
+        await asyncio.sleep(0)
+        assert not dispatcher.try_acquire(BACKGROUND)
+        # Le créneau réservé reste disponible sans attente
+        await asyncio.wait_for(_hold(dispatcher, INTERACTIVE, _set()), timeout=0.1)
+        release.set()
+        await background
+
+    asyncio.run(scenario())
+
+
+def test_background_is_shed_instead_of_starving() -> None:
+    async def scenario() -> None:
+        dispatcher = _dispatcher(
+            max_concurrency=1,
+            interactive_reserved=0,
+            background_max_queue=1,
+            background_max_wait=0.05,
+        )
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(dispatcher, INTERACTIVE, release))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(_hold(dispatcher, BACKGROUND, _set()))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AIOverloadedError) as full:
+            await _hold(dispatcher, BACKGROUND, _set())
+        assert full.value.reason == "queue_full"
+        with pytest.raises(AIOverloadedError) as timeout:
+            await waiting
+        assert timeout.value.reason == "timeout"
+
+        release.set()
+        await holder
+        # Service libre : le travail de fond repasse immédiatement
+        await asyncio.wait_for(_hold(dispatcher, BACKGROUND, _set()), timeout=0.1)
+        assert dispatcher._active == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_leak_a_slot() -> None:
+    async def scenario() -> None:
+        dispatcher = _dispatcher(max_concurrency=1, interactive_reserved=0)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(dispatcher, INTERACTIVE, release))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(_hold(dispatcher, INTERACTIVE, release))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        release.set()
+        await holder
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert dispatcher._active == 0
+        assert not dispatcher._queues[INTERACTIVE]
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_holder_releases_its_slot() -> None:
+    async def scenario() -> None:
+        dispatcher = _dispatcher(max_concurrency=1, interactive_reserved=0)
+        holder = asyncio.create_task(_hold(dispatcher, INTERACTIVE, asyncio.Event()))
+        await asyncio.sleep(0)
+        assert dispatcher._active == 1
+        holder.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await holder
+        assert dispatcher._active == 0
+
+    asyncio.run(scenario())
+
+
+def test_hedge_slot_is_released_even_if_cancelled_before_start() -> None:
+    async def scenario() -> None:
+        dispatcher = _dispatcher(max_concurrency=2, interactive_reserved=0)
+        async with dispatcher.slot(INTERACTIVE):
+            assert dispatcher.try_acquire(INTERACTIVE)
+            # Câblage de la couverture d'ai_service : rendu à la fin de la tâche
+            hedge = asyncio.ensure_future(asyncio.sleep(10))
+            hedge.add_done_callback(lambda _: dispatcher.release())
+            assert not dispatcher.try_acquire(INTERACTIVE)
+            hedge.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await hedge
+            assert dispatcher._active == 1
+        assert dispatcher._active == 0
+
+    asyncio.run(scenario())
+
+
+def test_hedge_never_jumps_the_queue() -> None:
+    async def scenario() -> None:
+        dispatcher = _dispatcher(max_concurrency=2, interactive_reserved=0)
+        release = asyncio.Event()
+        holders = [
+            asyncio.create_task(_hold(dispatcher, INTERACTIVE, release))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(_hold(dispatcher, INTERACTIVE, _set()))
+        await asyncio.sleep(0)
+        assert not dispatcher.try_acquire(INTERACTIVE)
+        release.set()
+        await asyncio.gather(*holders, waiting)
+        assert dispatcher.try_acquire(INTERACTIVE)
+        dispatcher.release()
+        assert dispatcher._active == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.core.ai_hedging import RequestHedger
+
+
+@pytest.fixture(autouse=True)
+def _hedging_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "AI_HEDGING_ENABLED", True)
+
+
+def _hedger(max_hedge_ratio: float = 1.0) -> RequestHedger:
+    return RequestHedger(
+        window_size=100, min_samples=5, quantile=0.9, max_hedge_ratio=max_hedge_ratio
+    )
+
+
+def _warm(hedger: RequestHedger, seconds: float = 0.02, count: int = 10) -> None:
+    for _ in range(count):
+        hedger.observe_latency("normalize", seconds)
+
+
+async def _reply(status: int, after: float) -> int:
+    await asyncio.sleep(after)
+    return status
+
+
+def _ok(status: int) -> bool:
+    return status == 200
+
+
+def test_no_threshold_before_min_samples() -> None:
+    hedger = _hedger()
+    _warm(hedger, count=4)
+    assert hedger.hedge_delay("normalize") is None
+    hedger.observe_latency("normalize", 0.02)
+    assert hedger.hedge_delay("normalize") == pytest.approx(0.02)
+
+
+def test_threshold_is_the_configured_quantile() -> None:
+    hedger = _hedger()
+    for ms in range(1, 11):
+        hedger.observe_latency("normalize", ms / 100)
+    assert hedger.hedge_delay("normalize") == pytest.approx(0.091)
+
+
+def test_slow_primary_is_hedged_and_counted_as_censored_sample() -> None:
+    hedger = _hedger()
+    _warm(hedger)
+
+    async def scenario() -> tuple[int, bool]:
+        result = await hedger.run(
+            "normalize",
+            lambda: _reply(200, after=1.0),
+            _ok,
+            hedge_attempt=lambda: _reply(200, after=0.0),
+        )
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(scenario()) == (200, True)
+    samples = list(hedger._latencies["normalize"])
+    # Principale annulée après le seuil : comptée, au moins pour le seuil
+    assert len(samples) == 12
+    assert max(samples) >= 0.02
+
+
+def test_p90_does_not_drift_when_slow_primaries_are_hedged() -> None:
+    hedger = _hedger()
+    _warm(hedger, seconds=0.05, count=20)
+
+    async def scenario() -> None:
+        for _ in range(20):
+            await hedger.run(
+                "normalize",
+                lambda: _reply(200, after=1.0),
+                _ok,
+                hedge_attempt=lambda: _reply(200, after=0.0),
+            )
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    delay = hedger.hedge_delay("normalize")
+    assert delay is not None and delay >= 0.05
+
+
+def test_refused_hedge_waits_for_the_primary() -> None:
+    hedger = _hedger()
+    _warm(hedger)
+
+    async def scenario() -> tuple[int, bool]:
+        return await hedger.run(
+            "normalize",
+            lambda: _reply(200, after=0.05),
+            _ok,
+            hedge_attempt=lambda: None,
+        )
+
+    assert asyncio.run(scenario()) == (200, False)
+
+
+def test_hedge_ratio_is_capped() -> None:
+    hedger = _hedger(max_hedge_ratio=0.0)
+    _warm(hedger)
+    hedges = 0
+
+    async def _hedge() -> int:
+        nonlocal hedges
+        hedges += 1
+        return 200
+
+    async def scenario() -> tuple[int, bool]:
+        return await hedger.run(
+            "normalize", lambda: _reply(200, after=0.05), _ok, hedge_attempt=_hedge
+        )
+
+    assert asyncio.run(scenario()) == (200, False)
+    assert hedges == 0
+
+
+def test_failed_attempts_do_not_feed_the_threshold() -> None:
+    hedger = _hedger()
+
+    async def scenario() -> tuple[int, bool]:
+        result = await hedger.run("normalize", lambda: _reply(503, after=0.0), _ok)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(scenario()) == (503, False)
+    assert "normalize" not in hedger._latencies
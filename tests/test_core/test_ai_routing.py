@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import pytest
+
+from app.config import AIRoute, settings
+from app.core import ai_routing
+from app.core.ai_routing import ModelRouter
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr(ai_routing.time, "monotonic", clock)
+    monkeypatch.setattr(settings, "AI_ROUTE_MIN_SAMPLES", 5)
+    monkeypatch.setattr(settings, "AI_ROUTE_SLO_QUANTILE", 0.9)
+    monkeypatch.setattr(settings, "AI_ROUTE_DOWNGRADE_SECONDS", 60)
+    return clock
+
+
+def _route(**overrides: object) -> AIRoute:
+    fields: dict[str, object] = {
+        "primary_model": "big-model",
+        "fallback_model": "small-model",
+        "max_tokens": 120,
+        "temperature": 0.1,
+        "top_p": 0.7,
+        "timeout_seconds": 15,
+        "latency_slo_ms": 500,
+    }
+    fields.update(overrides)
+    return AIRoute(**fields)  # type: ignore[arg-type]
+
+
+def _router(**overrides: object) -> ModelRouter:
+    routes = {"normalize": _route(**overrides)}
+    return ModelRouter(routes, default_model="default-model")
+
+
+def _observe(router: ModelRouter, model: str, seconds: float, count: int = 5) -> None:
+    for _ in range(count):
+        router.observe("normalize", model, seconds)
+
+
+def test_selects_route_parameters(clock: _Clock) -> None:
+    routed = _router().select("normalize")
+    assert routed.model == "big-model"
+    assert (routed.max_tokens, routed.temperature, routed.top_p) == (120, 0.1, 0.7)
+    assert routed.timeout_seconds == 15
+    assert not routed.downgraded
+
+
+def test_primary_defaults_to_configured_model(clock: _Clock) -> None:
+    assert _router(primary_model=None).select("normalize").model == "default-model"
+
+
+def test_stays_on_primary_within_slo(clock: _Clock) -> None:
+    router = _router()
+    _observe(router, "big-model", 0.2, count=20)
+    assert router.select("normalize").model == "big-model"
+
+
+def test_waits_for_min_samples_before_downgrading(clock: _Clock) -> None:
+    router = _router()
+    _observe(router, "big-model", 2.0, count=4)
+    assert router.select("normalize").model == "big-model"
+    router.observe("normalize", "big-model", 2.0)
+    assert router.select("normalize").model == "small-model"
+
+
+def test_downgrades_when_slo_exceeded_then_reevaluates(clock: _Clock) -> None:
+    router = _router()
+    _observe(router, "big-model", 2.0)
+    routed = router.select("normalize")
+    assert (routed.model, routed.downgraded) == ("small-model", True)
+
+    # Latences du repli : jamais prises en compte pour le SLO du principal
+    _observe(router, "small-model", 5.0)
+    clock.now += 59
+    assert router.select("normalize").model == "small-model"
+
+    clock.now += 2
+    assert router.select("normalize").model == "big-model"
+    # Mesures fraîches : une seule latence lente ne suffit pas à rebasculer
+    router.observe("normalize", "big-model", 2.0)
+    assert router.select("normalize").model == "big-model"
+
+
+def test_no_downgrade_without_fallback_or_slo(clock: _Clock) -> None:
+    for overrides in ({"fallback_model": None}, {"latency_slo_ms": None}):
+        router = _router(**overrides)
+        _observe(router, "big-model", 2.0)
+        assert router.select("normalize").model == "big-model"
+
+
+def test_unknown_operation_is_ignored_by_observe(clock: _Clock) -> None:
+    router = _router()
+    router.observe("reformulate", "big-model", 2.0)
+    assert router.select("normalize").model == "big-model"
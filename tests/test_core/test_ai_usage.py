@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import pytest
+
+from app.core.ai_usage import (
+    AI_REQUESTS_TOTAL,
+    AI_TOKENS_TOTAL,
+    AICallRecord,
+    AIUsageTracker,
+    percentile,
+)
+
+
+def _call(**overrides: object) -> AICallRecord:
+    fields: dict[str, object] = {
+        "operation": "normalize",
+        "model": "test-model",
+        "status": 200,
+        "latency_seconds": 0.1,
+        "prompt_tokens": 100,
+        "completion_tokens": 10,
+    }
+    fields.update(overrides)
+    return AICallRecord(**fields)  # type: ignore[arg-type]
+
+
+def test_percentile_interpolates() -> None:
+    assert percentile([], 0.5) == 0.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.5) == pytest.approx(2.5)
+    assert percentile([1.0, 2.0, 3.0, 4.0], 1.0) == 4.0
+
+
+def test_summary_groups_by_operation_and_model() -> None:
+    tracker = AIUsageTracker(window_size=10)
+    tracker.record(_call(latency_seconds=0.1))
+    tracker.record(_call(latency_seconds=0.3, status=503, prompt_tokens=0, completion_tokens=0))
+    tracker.record(_call(operation="reformulate", prompt_tokens=50, completion_tokens=40))
+
+    summary = tracker.summary()
+    assert summary.calls == 3
+    by_operation = {op.operation: op for op in summary.operations}
+    normalize = by_operation["normalize"]
+    assert normalize.calls == 2
+    assert normalize.errors == 1
+    assert normalize.prompt_tokens_total == 100
+    assert normalize.prompt_tokens_avg == 50.0
+    assert normalize.latency_max_ms == pytest.approx(300.0)
+    assert by_operation["reformulate"].completion_tokens_total == 40
+
+
+def test_hedge_attempts_count_tokens_but_not_calls() -> None:
+    tracker = AIUsageTracker(window_size=10)
+    tracker.record(_call(hedged=True, latency_seconds=0.2))
+    tracker.record(
+        _call(hedged=True, hedge_attempt=True, cancelled=True, latency_seconds=5.0)
+    )
+
+    summary = tracker.summary()
+    assert summary.calls == 1
+    (usage,) = summary.operations
+    assert usage.calls == 1
+    assert usage.hedged == 1
+    assert usage.hedge_attempts == 1
+    assert usage.prompt_tokens_total == 200
+    # La perdante annulée ne pèse pas sur la latence de l'appel logique
+    assert usage.latency_max_ms == pytest.approx(200.0)
+
+
+def test_window_is_bounded() -> None:
+    tracker = AIUsageTracker(window_size=2)
+    for _ in range(5):
+        tracker.record(_call())
+    assert tracker.summary().calls == 2
+
+
+def test_metrics_are_labelled_by_status() -> None:
+    labels = {"operation": "usage-test", "model": "m"}
+    before_cancelled = AI_REQUESTS_TOTAL.value(status="cancelled", **labels)
+    before_error = AI_REQUESTS_TOTAL.value(status="error", **labels)
+    before_tokens = AI_TOKENS_TOTAL.value(kind="prompt", **labels)
+
+    tracker = AIUsageTracker(window_size=10)
+    tracker.record(_call(cancelled=True, hedge_attempt=True, **labels))
+    tracker.record(_call(status=None, **labels))
+
+    assert AI_REQUESTS_TOTAL.value(status="cancelled", **labels) == before_cancelled + 1
+    assert AI_REQUESTS_TOTAL.value(status="error", **labels) == before_error + 1
+    assert AI_TOKENS_TOTAL.value(kind="prompt", **labels) == before_tokens + 200
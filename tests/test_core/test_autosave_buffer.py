@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import uuid
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+import pytest
+
+from app.config import Settings, settings
+from app.core import autosave_buffer
+from app.core.autosave_buffer import DraftAutosaveBuffer
+
+Patches = dict[uuid.UUID, dict[str, Any]]
+
+
+class _FakeEngine:
+    @contextlib.asynccontextmanager
+    async def begin(self) -> AsyncIterator[None]:
+        yield None
+
+
+class _FakePool:
+    async def get_engine(self) -> _FakeEngine:
+        return _FakeEngine()
+
+
+class _FakeDatabase:
+    """Patchs écrits par `apply_patches` ; `on_write` simule la base (échec,
+    autosave concurrent pendant l'écriture)."""
+
+    def __init__(self) -> None:
+        self.writes: list[Patches] = []
+        self.on_write: Callable[[Patches], None] | None = None
+
+    def repository(self, _: Any) -> _FakeDatabase:
+        return self
+
+    async def apply_patches(self, batch: Patches) -> int:
+        if self.on_write is not None:
+            on_write, self.on_write = self.on_write, None
+            on_write(batch)
+        self.writes.append(batch)
+        return len(batch)
+
+
+@pytest.fixture
+def database(monkeypatch: pytest.MonkeyPatch) -> _FakeDatabase:
+    fake = _FakeDatabase()
+    monkeypatch.setattr(autosave_buffer, "PostgresFormDraftRepository", fake.repository)
+    return fake
+
+
+def _buffer(max_drafts: int = 10) -> DraftAutosaveBuffer:
+    buffer = DraftAutosaveBuffer(
+        _FakePool(),  # type: ignore[arg-type]
+        flush_interval_ms=60_000,
+        max_drafts=max_drafts,
+    )
+    # Activé sans boucle de fond : les écritures sont déclenchées par le test
+    buffer._task = object()  # type: ignore[assignment]
+    return buffer
+
+
+def _fail(_: Patches) -> None:
+    raise ConnectionError("database unavailable")
+
+
+def test_write_behind_is_disabled_by_default() -> None:
+    assert Settings.model_fields["DRAFT_AUTOSAVE_WRITE_BEHIND"].default is False
+    buffer = DraftAutosaveBuffer(_FakePool(), 500, 10)  # type: ignore[arg-type]
+    assert not buffer.enabled
+    assert buffer.add(uuid.uuid4(), {"a": 1}) is None
+
+
+def test_only_known_drafts_are_buffered(database: _FakeDatabase) -> None:
+    buffer = _buffer()
+    draft_id = uuid.uuid4()
+    assert buffer.add(draft_id, {"a": 1}) is None
+
+    buffer.mark_known(draft_id, {"a": 1, "b": 1})
+    assert buffer.add(draft_id, {"a": 2}) == ({"a": 1, "b": 1}, {"a": 2, "b": 1})
+    assert buffer.add(draft_id, {"c": 3}) == (
+        {"a": 2, "b": 1},
+        {"a": 2, "b": 1, "c": 3},
+    )
+    asyncio.run(buffer.flush())
+    # Patchs coalescés : une seule écriture pour le brouillon
+    assert database.writes == [{draft_id: {"a": 2, "c": 3}}]
+
+
+def test_failed_flush_requeues_under_newer_patches(database: _FakeDatabase) -> None:
+    buffer = _buffer()
+    draft_id = uuid.uuid4()
+    buffer.mark_known(draft_id, {})
+    buffer.add(draft_id, {"a": "old", "b": "old"})
+
+    def _newer_patch_then_fail(batch: Patches) -> None:
+        # Autosave reçu pendant l'écriture, qui échoue ensuite
+        buffer.add(draft_id, {"a": "new"})
+        _fail(batch)
+
+    database.on_write = _newer_patch_then_fail
+    with pytest.raises(ConnectionError):
+        asyncio.run(buffer.flush())
+
+    asyncio.run(buffer.flush())
+    assert database.writes == [{draft_id: {"a": "new", "b": "old"}}]
+
+
+def test_failed_flush_makes_next_autosave_synchronous(
+    database: _FakeDatabase,
+) -> None:
+    buffer = _buffer()
+    failed, other = uuid.uuid4(), uuid.uuid4()
+    buffer.mark_known(failed, {"a": 0})
+    buffer.mark_known(other, {"a": 0})
+    buffer.add(failed, {"a": 1})
+
+    database.on_write = _fail
+    with pytest.raises(ConnectionError):
+        asyncio.run(buffer.flush_draft(failed))
+
+    # L'état connu du worker n'est plus celui de la base : pas de réponse tamponnée
+    assert buffer.add(failed, {"a": 2}) is None
+    assert buffer.add(other, {"a": 2}) is not None
+    # Le patch remis en attente part avant l'autosave synchrone
+    asyncio.run(buffer.flush_draft(failed))
+    assert database.writes == [{failed: {"a": 1}}]
+
+
+def test_autosave_is_synchronous_beyond_twice_the_threshold(
+    database: _FakeDatabase,
+) -> None:
+    buffer = _buffer(max_drafts=2)
+    drafts = [uuid.uuid4() for _ in range(5)]
+    for draft_id in drafts:
+        buffer.mark_known(draft_id, {})
+
+    for draft_id in drafts[:4]:
+        assert buffer.add(draft_id, {"a": 1}) is not None
+    # Écritures en échec : 2 x max_drafts en attente, l'erreur doit remonter
+    assert buffer.add(drafts[4], {"a": 1}) is None
+    # Un brouillon déjà en attente aussi
+    assert buffer.add(drafts[0], {"a": 2}) is None
+
+    asyncio.run(buffer.flush())
+    assert buffer.add(drafts[4], {"a": 1}) is not None
+
+
+def test_close_flushes_pending_patches(
+    database: _FakeDatabase, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "DRAFT_AUTOSAVE_WRITE_BEHIND", True)
+    draft_id = uuid.uuid4()
+
+    async def scenario() -> None:
+        buffer = DraftAutosaveBuffer(_FakePool(), 60_000, 10)  # type: ignore[arg-type]
+        buffer.start()
+        buffer.mark_known(draft_id, {})
+        buffer.add(draft_id, {"a": 1})
+        await buffer.close()
+        assert not buffer.enabled
+
+    asyncio.run(scenario())
+    assert database.writes == [{draft_id: {"a": 1}}]
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import pytest
+
+from app.config import settings
+from app.core import draft_funnel
+from app.core.draft_funnel import (
+    DRAFT_FUNNEL_ROLLUP_DELAY,
+    DRAFT_FUNNEL_ROLLUP_GROUPS_TOTAL,
+    DraftFunnelRollupJob,
+)
+from app.db.generated.form_draft import RollupDraftFunnelRow
+
+
+class _FakeConnection:
+    def __init__(self) -> None:
+        self.commits = 0
+
+    async def __aenter__(self) -> _FakeConnection:
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        pass
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+
+class _FakePool:
+    def __init__(self) -> None:
+        self.conn = _FakeConnection()
+
+    async def get_engine(self) -> _FakePool:
+        return self
+
+    def connect(self) -> _FakeConnection:
+        return self.conn
+
+
+class _FakeQuerier:
+    """Filigrane avançant d'une fenêtre par appel, jamais au-delà de now() - lag."""
+
+    def __init__(self, watermark: datetime) -> None:
+        self.watermark = watermark
+        self.calls: list[dict[str, Any]] = []
+
+    async def rollup_draft_funnel(self, **params: Any) -> RollupDraftFunnelRow:
+        self.calls.append(params)
+        horizon = datetime.now(UTC) - timedelta(seconds=params["lag_seconds"])
+        window_end = self.watermark + timedelta(hours=params["window_hours"])
+        self.watermark = max(self.watermark, min(horizon, window_end))
+        return RollupDraftFunnelRow(
+            processed_until=self.watermark,
+            caught_up=self.watermark >= horizon,
+            groups=2,
+        )
+
+
+@pytest.fixture(autouse=True)
+def _settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "DRAFT_FUNNEL_LAG_SECONDS", 120)
+    monkeypatch.setattr(settings, "DRAFT_FUNNEL_WINDOW_HOURS", 24)
+    monkeypatch.setattr(settings, "DRAFT_FUNNEL_MAX_WINDOWS", 5)
+    monkeypatch.setattr(settings, "DRAFT_FUNNEL_TIMEZONE", "Europe/Paris")
+
+
+def _run(
+    monkeypatch: pytest.MonkeyPatch, querier: _FakeQuerier, locked: bool = True
+) -> _FakeConnection:
+    @contextlib.asynccontextmanager
+    async def _try_advisory_lock(_: Any, __: int) -> AsyncIterator[bool]:
+        yield locked
+
+    monkeypatch.setattr(draft_funnel, "try_advisory_lock", _try_advisory_lock)
+    monkeypatch.setattr(draft_funnel, "form_draft_querier", lambda _: querier)
+    pool = _FakePool()
+    asyncio.run(DraftFunnelRollupJob(pool).run_once())  # type: ignore[arg-type]
+    return pool.conn
+
+
+def test_recent_events_are_left_to_the_next_pass(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    querier = _FakeQuerier(datetime.now(UTC) - timedelta(hours=1))
+    conn = _run(monkeypatch, querier)
+
+    assert querier.calls == [
+        {"lag_seconds": 120, "window_hours": 24, "time_zone": "Europe/Paris"}
+    ]
+    assert conn.commits == 1
+    # Filigrane arrêté à now() - lag : le retard exporté vaut le décalage
+    assert DRAFT_FUNNEL_ROLLUP_DELAY.value() == pytest.approx(120, abs=5)
+
+
+def test_catch_up_advances_window_by_window(monkeypatch: pytest.MonkeyPatch) -> None:
+    start = datetime.now(UTC) - timedelta(days=3, hours=1)
+    groups = DRAFT_FUNNEL_ROLLUP_GROUPS_TOTAL.value()
+    querier = _FakeQuerier(start)
+    conn = _run(monkeypatch, querier)
+
+    # Trois fenêtres de 24 h, puis la dernière, bornée par le décalage
+    assert len(querier.calls) == 4
+    assert conn.commits == 4  # une transaction courte par fenêtre
+    assert DRAFT_FUNNEL_ROLLUP_GROUPS_TOTAL.value() == groups + 8
+    assert DRAFT_FUNNEL_ROLLUP_DELAY.value() == pytest.approx(120, abs=5)
+
+
+def test_backlog_is_bounded_per_pass(monkeypatch: pytest.MonkeyPatch) -> None:
+    start = datetime.now(UTC) - timedelta(days=30)
+    querier = _FakeQuerier(start)
+    _run(monkeypatch, querier)
+
+    assert len(querier.calls) == settings.DRAFT_FUNNEL_MAX_WINDOWS
+    assert querier.watermark == start + timedelta(days=5)
+    expected_delay = (datetime.now(UTC) - querier.watermark).total_seconds()
+    assert DRAFT_FUNNEL_ROLLUP_DELAY.value() == pytest.approx(expected_delay, abs=5)
+
+
+def test_nothing_runs_without_the_lock(monkeypatch: pytest.MonkeyPatch) -> None:
+    querier = _FakeQuerier(datetime.now(UTC) - timedelta(days=1))
+    conn = _run(monkeypatch, querier, locked=False)
+    assert querier.calls == [] and conn.commits == 0
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import pytest
+
+from app.config import settings
+from app.core import draft_retention
+from app.core.draft_retention import (
+    DRAFT_EVENT_PARTITIONS_COVERED_UNTIL,
+    DRAFT_EVENT_PARTITIONS_TOTAL,
+    DRAFT_RETENTION_ROWS_TOTAL,
+    DraftRetentionJob,
+)
+from app.db.generated.form_draft import ListExpiredDraftEventPartitionsRow
+
+
+class _FakeConnection:
+    def __init__(self) -> None:
+        self.isolation_level: str | None = None
+        self.statements: list[str] = []
+        self.commits = 0
+
+    async def __aenter__(self) -> _FakeConnection:
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        pass
+
+    async def execution_options(self, **options: Any) -> _FakeConnection:
+        self.isolation_level = options.get("isolation_level")
+        return self
+
+    async def execute(self, statement: Any) -> None:
+        self.statements.append(str(statement))
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+
+class _FakeEngine:
+    def __init__(self) -> None:
+        self.connections: list[_FakeConnection] = []
+
+    def connect(self) -> _FakeConnection:
+        conn = _FakeConnection()
+        self.connections.append(conn)
+        return conn
+
+
+class _FakePool:
+    def __init__(self) -> None:
+        self.engine = _FakeEngine()
+
+    async def get_engine(self) -> _FakeEngine:
+        return self.engine
+
+
+class _FakeQuerier:
+    def __init__(self) -> None:
+        self.covered_until: datetime | None = datetime.now(UTC) + timedelta(days=60)
+        self.expired_partitions: list[ListExpiredDraftEventPartitionsRow] = []
+        self.expire_counts: list[int] = []
+        self.purge_counts: list[int] = []
+        self.calls: list[str] = []
+
+    async def ensure_draft_event_partitions(self, *, months_ahead: int) -> int:
+        self.calls.append("ensure")
+        return 1
+
+    async def get_draft_event_partitions_covered_until(self) -> datetime | None:
+        return self.covered_until
+
+    async def list_expired_draft_event_partitions(
+        self, *, retention_months: int
+    ) -> AsyncIterator[ListExpiredDraftEventPartitionsRow]:
+        self.calls.append("list_expired")
+        for row in self.expired_partitions:
+            yield row
+
+    async def expire_stale_drafts(
+        self, *, stale_after_days: int, batch_size: int
+    ) -> int:
+        self.calls.append("expire")
+        return self.expire_counts.pop(0) if self.expire_counts else 0
+
+    async def purge_expired_drafts(
+        self, *, purge_after_days: int, batch_size: int
+    ) -> int:
+        self.calls.append("purge")
+        return self.purge_counts.pop(0) if self.purge_counts else 0
+
+
+@pytest.fixture
+def querier(monkeypatch: pytest.MonkeyPatch) -> _FakeQuerier:
+    fake = _FakeQuerier()
+    monkeypatch.setattr(draft_retention, "form_draft_querier", lambda _: fake)
+    monkeypatch.setattr(settings, "DRAFT_RETENTION_BATCH_SIZE", 10)
+    monkeypatch.setattr(settings, "DRAFT_RETENTION_MAX_BATCHES", 3)
+    monkeypatch.setattr(settings, "DRAFT_RETENTION_BATCH_PAUSE_SECONDS", 0)
+    return fake
+
+
+def _lock(monkeypatch: pytest.MonkeyPatch, locked: bool) -> None:
+    @contextlib.asynccontextmanager
+    async def _try_advisory_lock(_: Any, __: int) -> AsyncIterator[bool]:
+        yield locked
+
+    monkeypatch.setattr(draft_retention, "try_advisory_lock", _try_advisory_lock)
+
+
+def _run(locked: bool, monkeypatch: pytest.MonkeyPatch) -> _FakeEngine:
+    _lock(monkeypatch, locked)
+    pool = _FakePool()
+    asyncio.run(DraftRetentionJob(pool).run_once())  # type: ignore[arg-type]
+    return pool.engine
+
+
+def _partition(
+    month: str, attached: bool = True, detach_pending: bool = False
+) -> ListExpiredDraftEventPartitionsRow:
+    return ListExpiredDraftEventPartitionsRow(
+        partition_name=f"form_draft_event_{month}",
+        attached=attached,
+        detach_pending=detach_pending,
+    )
+
+
+def test_nothing_runs_without_the_lock(
+    querier: _FakeQuerier, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    engine = _run(False, monkeypatch)
+    assert querier.calls == []
+    assert len(engine.connections) == 1
+
+
+def test_expired_partitions_are_detached_concurrently_then_dropped(
+    querier: _FakeQuerier, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    querier.expired_partitions = [
+        _partition("202401"),
+        _partition("202402", detach_pending=True),
+        _partition("202403", attached=False),
+    ]
+    dropped = DRAFT_EVENT_PARTITIONS_TOTAL.value(action="dropped")
+
+    locked, ddl = _run(True, monkeypatch).connections
+
+    # DETACH CONCURRENTLY hors transaction, sur une connexion dédiée
+    assert ddl.isolation_level == "AUTOCOMMIT"
+    assert not any("PARTITION" in sql for sql in locked.statements)
+    assert ddl.statements == [
+        'ALTER TABLE form_draft_event DETACH PARTITION "form_draft_event_202401" '
+        "CONCURRENTLY",
+        'DROP TABLE "form_draft_event_202401"',
+        # Détachement interrompu lors d'un passage précédent
+        'ALTER TABLE form_draft_event DETACH PARTITION "form_draft_event_202402" '
+        "FINALIZE",
+        'DROP TABLE "form_draft_event_202402"',
+        # Déjà détachée, DROP précédent en échec
+        'DROP TABLE "form_draft_event_202403"',
+    ]
+    assert DRAFT_EVENT_PARTITIONS_TOTAL.value(action="dropped") == dropped + 3
+
+
+def test_no_ddl_connection_without_expired_partitions(
+    querier: _FakeQuerier, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    engine = _run(True, monkeypatch)
+    assert len(engine.connections) == 1
+    assert querier.calls[:2] == ["ensure", "list_expired"]
+
+
+def test_partition_coverage_is_exported(
+    querier: _FakeQuerier,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    with caplog.at_level(logging.WARNING, logger=draft_retention.__name__):
+        _run(True, monkeypatch)
+    assert querier.covered_until is not None
+    assert DRAFT_EVENT_PARTITIONS_COVERED_UNTIL.value() == pytest.approx(
+        querier.covered_until.timestamp()
+    )
+    assert not caplog.records
+
+
+@pytest.mark.parametrize("covered_for", [timedelta(days=2), None])
+def test_warns_when_upcoming_partitions_are_missing(
+    querier: _FakeQuerier,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+    covered_for: timedelta | None,
+) -> None:
+    querier.covered_until = datetime.now(UTC) + covered_for if covered_for else None
+    with caplog.at_level(logging.WARNING, logger=draft_retention.__name__):
+        _run(True, monkeypatch)
+    assert any("only cover until" in record.message for record in caplog.records)
+
+
+def test_drafts_are_expired_then_purged_in_bounded_batches(
+    querier: _FakeQuerier, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Lot complet -> lot suivant ; lot partiel -> fin ; au plus MAX_BATCHES lots
+    querier.expire_counts = [10, 10, 4]
+    querier.purge_counts = [10, 10, 10, 10]
+    expired = DRAFT_RETENTION_ROWS_TOTAL.value(action="expired")
+    purged = DRAFT_RETENTION_ROWS_TOTAL.value(action="purged")
+
+    [locked] = _run(True, monkeypatch).connections
+
+    assert querier.calls.count("expire") == 3
+    assert querier.calls.count("purge") == 3
+    assert querier.calls.index("purge") > querier.calls.index("expire")
+    # Une transaction par lot, plus celle des partitions et de leur liste
+    assert locked.commits == 2 + 3 + 3
+    assert DRAFT_RETENTION_ROWS_TOTAL.value(action="expired") == expired + 24
+    assert DRAFT_RETENTION_ROWS_TOTAL.value(action="purged") == purged + 30
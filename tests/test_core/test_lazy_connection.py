@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from app.db.connection import LazyConnection
+
+
+class _FakeConnection:
+    def __init__(self, engine: str) -> None:
+        self.engine = engine
+        self.transaction = False
+        self.committed = False
+        self.closed = False
+        self.executed: list[str] = []
+
+    async def execution_options(self, **_: Any) -> _FakeConnection:
+        return self
+
+    async def begin(self) -> None:
+        self.transaction = True
+
+    def in_transaction(self) -> bool:
+        return self.transaction
+
+    async def execute(self, query: str) -> _FakeConnection:
+        self.executed.append(query)
+        return self
+
+    async def commit(self) -> None:
+        self.transaction, self.committed = False, True
+
+    async def rollback(self) -> None:
+        self.transaction = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class _FakeEngine:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.connections: list[_FakeConnection] = []
+
+    async def connect(self) -> _FakeConnection:
+        conn = _FakeConnection(self.name)
+        self.connections.append(conn)
+        return conn
+
+
+class _FakePool:
+    def __init__(self) -> None:
+        self.primary = _FakeEngine("primary")
+        self.replica = _FakeEngine("replica")
+
+    async def get_engine(self) -> _FakeEngine:
+        return self.primary
+
+    def replica_engine(self) -> _FakeEngine:
+        return self.replica
+
+    def mark_replica_down(self, _: Any) -> None:
+        pass
+
+
+def _connections(
+    pool: _FakePool, prefer_primary: bool = False
+) -> tuple[LazyConnection, LazyConnection]:
+    writer = LazyConnection(pool)  # type: ignore[arg-type]
+    reader = LazyConnection(
+        pool,  # type: ignore[arg-type]
+        readonly=True,
+        prefer_primary=prefer_primary,
+        writer=writer,
+    )
+    return writer, reader
+
+
+def test_pure_reads_go_to_the_replica() -> None:
+    async def scenario() -> _FakeConnection:
+        _, reader = _connections(_FakePool())
+        return await reader.execute("SELECT")  # type: ignore[return-value]
+
+    assert asyncio.run(scenario()).engine == "replica"
+
+
+def test_read_after_write_sees_the_uncommitted_write() -> None:
+    async def scenario() -> tuple[Any, Any]:
+        writer, reader = _connections(_FakePool())
+        written = await writer.execute("UPDATE")
+        read = await reader.execute("SELECT")
+        return written, read
+
+    written, read = asyncio.run(scenario())
+    # Même connexion, même transaction : l'écriture non validée est visible
+    assert read is written
+    assert written.executed == ["UPDATE", "SELECT"]
+    assert not written.committed
+
+
+def test_replica_read_switches_to_the_write_transaction_after_a_write() -> None:
+    async def scenario() -> tuple[Any, Any, Any]:
+        writer, reader = _connections(_FakePool())
+        before = await reader.execute("SELECT")
+        written = await writer.execute("UPDATE")
+        after = await reader.execute("SELECT")
+        return before, written, after
+
+    before, written, after = asyncio.run(scenario())
+    assert before.engine == "replica" and before.closed
+    assert after is written
+
+
+def test_reads_stay_on_primary_once_the_write_is_committed() -> None:
+    async def scenario() -> tuple[Any, Any]:
+        writer, reader = _connections(_FakePool())
+        written = await writer.execute("UPDATE")
+        await writer.release()  # validée avant un traitement long
+        read = await reader.execute("SELECT")
+        return written, read
+
+    written, read = asyncio.run(scenario())
+    assert written.committed
+    assert read is not written and read.engine == "primary"
+
+
+def test_replica_read_moves_to_primary_after_a_committed_write() -> None:
+    async def scenario() -> tuple[Any, Any]:
+        writer, reader = _connections(_FakePool())
+        before = await reader.execute("SELECT")
+        await writer.execute("UPDATE")
+        await writer.release()
+        return before, await reader.execute("SELECT")
+
+    before, after = asyncio.run(scenario())
+    assert before.engine == "replica" and before.closed
+    assert after.engine == "primary"
+
+
+def test_sticky_request_reads_on_primary_without_writing() -> None:
+    async def scenario() -> tuple[Any, LazyConnection]:
+        writer, reader = _connections(_FakePool(), prefer_primary=True)
+        return await reader.execute("SELECT"), writer
+
+    read, writer = asyncio.run(scenario())
+    assert read.engine == "primary"
+    assert not writer.wrote and not read.transaction
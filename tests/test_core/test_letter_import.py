@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from typing import Any
+
+import pytest
+
+from app.core.letter_import import LetterImporter, LetterImportResult
+from app.core.letter_repository import LETTER_COPY_COLUMNS
+
+
+class _FakeRepository:
+    def __init__(self) -> None:
+        self.copies: list[list[tuple[Any, ...]]] = []
+
+    async def copy_letters(self, records: list[tuple[Any, ...]]) -> int:
+        self.copies.append(records)
+        return len(records)
+
+
+def _address(**overrides: Any) -> dict[str, Any]:
+    address = {"line1": "1 rue de la Paix", "postal_code": "75002", "city": "Paris"}
+    address.update(overrides)
+    return address
+
+
+def _row(**overrides: Any) -> dict[str, Any]:
+    row: dict[str, Any] = {
+        "buyer_name": "Jeanne Martin",
+        "buyer_address": _address(country="FR"),
+        "buyer_phone": "06 12 34 56 78",
+        "seller_name": "Boutique SARL",
+        "seller_address": _address(country="France"),
+        "purchase_date": "2025-03-01",
+        "product_name": "Lave-linge",
+        "product_price": "499.99",
+        "defect_description": "Ne démarre plus",
+        "remedy_preference": "repairs",
+    }
+    row.update(overrides)
+    return row
+
+
+def _import(
+    rows: list[dict[str, Any]], all_or_nothing: bool = False
+) -> tuple[LetterImportResult, _FakeRepository]:
+    repository = _FakeRepository()
+    importer = LetterImporter(repository)  # type: ignore[arg-type]
+    result = asyncio.run(importer.import_rows(rows, all_or_nothing=all_or_nothing))
+    return result, repository
+
+
+def test_valid_rows_are_copied_in_column_order() -> None:
+    result, repository = _import([_row(), _row(order_reference="")])
+
+    assert result.rows_received == result.rows_inserted == 2
+    assert not result.errors
+    [records] = repository.copies
+    assert [str(record[0]) for record in records] == result.created_ids
+    columns = [dict(zip(LETTER_COPY_COLUMNS, record)) for record in records]
+    assert all(len(record) == len(LETTER_COPY_COLUMNS) for record in records)
+    # Pays résolus (code ou nom), référence vide -> NULL, énumération en valeur
+    assert columns[0]["buyer_country"] == columns[0]["seller_country"] == "France"
+    assert columns[1]["order_reference"] is None
+    assert columns[0]["remedy_preference"] == "repairs"
+    assert isinstance(columns[0]["id"], uuid.UUID)
+
+
+@pytest.mark.parametrize(
+    ("overrides", "field"),
+    [
+        ({"product_price": "not-a-price"}, "product_price"),
+        ({"remedy_preference": "refund"}, "remedy_preference"),
+        ({"buyer_phone": "123"}, "buyer_phone"),
+        # Contraintes de la table, vérifiées avant le COPY
+        ({"product_name": "x" * 501}, "product_name"),
+        ({"seller_address": _address(city="x" * 101)}, "seller_address.city"),
+        ({"product_price": "0"}, "product_price"),
+        ({"product_price": "100000000"}, "product_price"),
+        ({"buyer_address": _address(country="Atlantide")}, "buyer_address.country"),
+    ],
+)
+def test_invalid_row_is_reported_and_others_inserted(
+    overrides: dict[str, Any], field: str
+) -> None:
+    result, repository = _import([_row(), _row(**overrides), _row()])
+
+    assert result.rows_inserted == 2 and len(repository.copies[0]) == 2
+    assert len(result.created_ids) == 2
+    assert {error.index for error in result.errors} == {1}
+    assert field in {error.field for error in result.errors}
+
+
+def test_missing_field_is_reported_with_its_path() -> None:
+    row = _row()
+    del row["buyer_address"]["city"]
+    result, _ = _import([row])
+    assert [(error.index, error.field) for error in result.errors] == [
+        (0, "buyer_address.city")
+    ]
+    assert result.rows_inserted == 0
+
+
+def test_errors_are_sorted_by_row_index() -> None:
+    rows = [
+        _row(seller_address=_address(country="Atlantide")),
+        _row(product_price="abc"),
+        _row(),
+    ]
+    result, _ = _import(rows)
+    # Erreur de pays (index 0) détectée après l'erreur de validation (index 1)
+    assert [error.index for error in result.errors] == [0, 1]
+    assert result.rows_inserted == 1
+
+
+def test_all_or_nothing_inserts_nothing_on_any_error() -> None:
+    result, repository = _import([_row(), _row(product_price="0")], all_or_nothing=True)
+
+    assert repository.copies == [[]]
+    assert result.rows_inserted == 0 and result.created_ids == []
+    assert [error.index for error in result.errors] == [1]
+
+
+def test_all_or_nothing_inserts_everything_when_valid() -> None:
+    result, _ = _import([_row(), _row()], all_or_nothing=True)
+    assert result.rows_inserted == 2 and len(result.created_ids) == 2
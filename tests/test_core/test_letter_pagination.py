@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from typing import Any
+
+import pytest
+
+from app.core import letter_repository
+from app.core.letter_repository import (
+    SqlcLetterRepository,
+    decode_letter_cursor,
+    encode_letter_cursor,
+)
+from app.db.generated import letter as letter_sqlc
+from app.models.letters import LetterPage
+from app.utils.exceptions import ProcessingError
+
+_START = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+def _row(
+    created_at: datetime, letter_id: uuid.UUID
+) -> letter_sqlc.ListLettersPageAfterRow:
+    return letter_sqlc.ListLettersPageAfterRow(
+        id=letter_id,
+        buyer_name="Acheteur",
+        seller_name="Vendeur",
+        product_name="Produit",
+        product_price=Decimal("10.00"),
+        status="draft",
+        created_at=created_at,
+    )
+
+
+class _FakeQuerier:
+    """Table `letter` en mémoire, mêmes tris et bornes que les requêtes SQL."""
+
+    def __init__(self, rows: list[letter_sqlc.ListLettersPageAfterRow]) -> None:
+        self.rows = sorted(rows, key=lambda row: (row.created_at, row.id), reverse=True)
+        self.limits: list[int] = []
+
+    async def list_letters_first_page(
+        self, *, page_size: int
+    ) -> AsyncIterator[letter_sqlc.ListLettersPageAfterRow]:
+        self.limits.append(page_size)
+        for row in self.rows[:page_size]:
+            yield row
+
+    async def list_letters_page_after(
+        self, *, cursor_created_at: datetime, cursor_id: uuid.UUID, page_size: int
+    ) -> AsyncIterator[letter_sqlc.ListLettersPageAfterRow]:
+        self.limits.append(page_size)
+        after = [
+            row
+            for row in self.rows
+            if (row.created_at, row.id) < (cursor_created_at, cursor_id)
+        ]
+        for row in after[:page_size]:
+            yield row
+
+
+@pytest.fixture
+def querier(monkeypatch: pytest.MonkeyPatch) -> _FakeQuerier:
+    # Deux lettres par horodatage : l'id départage les ex aequo
+    rows = [_row(_START + timedelta(minutes=n // 2), uuid.uuid4()) for n in range(7)]
+    fake = _FakeQuerier(rows)
+    monkeypatch.setattr(letter_repository, "letter_querier", lambda _: fake)
+    return fake
+
+
+def _page(cursor: str | None, page_size: int) -> LetterPage:
+    repository = SqlcLetterRepository(object())  # type: ignore[arg-type]
+    return asyncio.run(repository.list_letters_page(cursor, page_size))
+
+
+def test_cursor_round_trip() -> None:
+    letter_id = uuid.uuid4()
+    created_at = _START + timedelta(microseconds=123)
+    cursor = encode_letter_cursor(created_at, letter_id)
+    assert "=" not in cursor
+    assert decode_letter_cursor(cursor) == (created_at, letter_id)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    ["!!!", "bm90LWEtY3Vyc29y", encode_letter_cursor(_START, uuid.uuid4())[:-4]],
+)
+def test_invalid_cursor_is_rejected(cursor: str) -> None:
+    with pytest.raises(ProcessingError) as error:
+        decode_letter_cursor(cursor)
+    assert error.value.error_code == "INVALID_CURSOR"
+
+
+def test_pages_cover_every_letter_once_newest_first(querier: _FakeQuerier) -> None:
+    seen: list[Any] = []
+    cursor: str | None = None
+    while True:
+        page = _page(cursor, page_size=3)
+        seen.extend(item.id for item in page.items)
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+    assert seen == [str(row.id) for row in querier.rows]
+    # Une ligne de plus que la page pour savoir s'il en existe une suivante
+    assert querier.limits == [4, 4, 4]
+
+
+def test_next_cursor_points_at_the_last_item(querier: _FakeQuerier) -> None:
+    page = _page(None, page_size=2)
+    last = querier.rows[1]
+    assert page.next_cursor == encode_letter_cursor(last.created_at, last.id)
+
+
+def test_no_next_cursor_on_an_exactly_full_last_page(querier: _FakeQuerier) -> None:
+    page = _page(None, page_size=7)
+    assert len(page.items) == 7
+    assert page.next_cursor is None
+
+
+def test_invalid_cursor_never_reaches_the_database(querier: _FakeQuerier) -> None:
+    with pytest.raises(ProcessingError) as error:
+        _page("!!!", page_size=3)
+    assert error.value.error_code == "INVALID_CURSOR"
+    assert querier.limits == []
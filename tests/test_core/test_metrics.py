@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import pytest
+
+from app.utils.metrics import MetricsRegistry
+
+
+def test_counter_renders_prometheus_text() -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs", ("result",))
+    counter.inc(result="ok")
+    counter.inc(2, result="ok")
+    counter.inc(result='fa"il')
+
+    assert counter.value(result="ok") == 3
+    assert registry.render() == (
+        "# HELP jobs_total Jobs\n"
+        "# TYPE jobs_total counter\n"
+        'jobs_total{result="fa\\"il"} 1\n'
+        'jobs_total{result="ok"} 3\n'
+    )
+
+
+def test_labels_must_match_declaration() -> None:
+    counter = MetricsRegistry().counter("c_total", "C", ("a",))
+    with pytest.raises(ValueError):
+        counter.inc(b="x")
+
+
+def test_same_name_returns_same_metric_and_rejects_other_type() -> None:
+    registry = MetricsRegistry()
+    assert registry.gauge("g", "G") is registry.gauge("g", "G")
+    with pytest.raises(ValueError):
+        registry.counter("g", "G")
+
+
+def test_gauge_set_inc_dec() -> None:
+    gauge = MetricsRegistry().gauge("g", "G")
+    gauge.set(5)
+    gauge.inc()
+    gauge.dec(2)
+    assert gauge.value() == 4
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    registry = MetricsRegistry()
+    histogram = registry.histogram("h_seconds", "H", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    assert histogram.count() == 4
+    lines = registry.render().splitlines()
+    assert 'h_seconds_bucket{le="0.1"} 2' in lines
+    assert 'h_seconds_bucket{le="1"} 3' in lines
+    assert 'h_seconds_bucket{le="+Inf"} 4' in lines
+    assert "h_seconds_sum 3.65" in lines
+    assert "h_seconds_count 4" in lines
+
+
+def test_collectors_run_before_render() -> None:
+    registry = MetricsRegistry()
+    gauge = registry.gauge("pool", "P")
+    registry.add_collector(lambda: gauge.set(7))
+    assert "pool 7" in registry.render()
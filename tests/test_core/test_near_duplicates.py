@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import pytest
+
+from app.utils.near_duplicates import MinHashLSHIndex, normalize_for_shingles
+
+TEXT = "Mon ordinateur portable s'éteint tout seul après dix minutes d'utilisation"
+
+
+def test_normalize_for_shingles() -> None:
+    assert normalize_for_shingles("  L'écran   s'ÉTEINT !") == "l ecran s eteint"
+
+
+def test_identical_text_after_normalization_is_found() -> None:
+    index: MinHashLSHIndex[str] = MinHashLSHIndex(maxsize=10)
+    index.add(TEXT, "stored")
+    duplicate = index.query(TEXT.upper() + " !", min_similarity=0.95)
+    assert duplicate is not None
+    assert duplicate.value == "stored" and duplicate.similarity == 1.0
+
+
+def test_threshold_separates_near_from_different_texts() -> None:
+    index: MinHashLSHIndex[str] = MinHashLSHIndex(maxsize=10)
+    index.add(TEXT, "stored")
+    near = TEXT.replace("portable", "portables")
+    near_match = index.query(near, min_similarity=0.5)
+    assert near_match is not None and near_match.similarity < 1.0
+    assert index.query(near, min_similarity=1.0) is None
+    assert index.query("La machine à laver fuit par le hublot", 0.1) is None
+
+
+def test_namespace_isolates_texts() -> None:
+    index: MinHashLSHIndex[str] = MinHashLSHIndex(maxsize=10)
+    index.add(TEXT, "stored", namespace="a")
+    assert index.query(TEXT, 0.95, namespace="b") is None
+    assert index.query(TEXT, 0.95, namespace="a") is not None
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    index: MinHashLSHIndex[str] = MinHashLSHIndex(maxsize=2)
+    index.add("premier texte assez long", "1")
+    index.add("deuxième texte assez long", "2")
+    assert index.query("premier texte assez long", 0.95) is not None  # rafraîchi
+    index.add("troisième texte assez long", "3")
+    assert len(index) == 2
+    assert index.query("deuxième texte assez long", 0.95) is None
+    assert index.query("premier texte assez long", 0.95) is not None
+
+
+def test_rejects_incompatible_band_layout() -> None:
+    with pytest.raises(ValueError):
+        MinHashLSHIndex(maxsize=10, num_perm=128, bands=48)
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import pytest
+
+from app.core.product_name_rules import (
+    DeclaredType,
+    LocalNormalization,
+    join_article_and_nom,
+    resolve_locally,
+)
+
+
+@pytest.mark.parametrize(
+    ("declared_type", "raw_name", "group_noun", "prefix"),
+    [
+        ("bien", "iphone 13 pro max", "un smartphone iPhone 13 Pro Max", "d’"),
+        ("bien", "samsung a22+", "un smartphone Samsung A22+", "d’"),
+        ("bien", "airpods pro", "des écouteurs AirPods Pro", "des "),
+        ("service", "freebox pop", "un abonnement Freebox Pop", "d’"),
+        ("bien", "Windows familial", "Windows Familial", "de "),
+        ("bien", "aspirateur", "un aspirateur", "d’"),
+        ("bien", "lave-linge", "un lave-linge", "d’"),
+        ("bien", "une imprimante HP", "une imprimante HP", "d’"),
+        ("bien", "  iphone   13  ", "un smartphone iPhone 13", "d’"),
+    ],
+)
+def test_resolves_trivial_names(
+    declared_type: DeclaredType, raw_name: str, group_noun: str, prefix: str
+) -> None:
+    assert resolve_locally(declared_type, raw_name) == LocalNormalization(
+        group_noun=group_noun, acquisition_prefix=prefix
+    )
+
+
+def test_elision_keeps_name_and_uses_de() -> None:
+    result = resolve_locally("bien", "l'iphone")
+    assert result == LocalNormalization(group_noun="l'iphone", acquisition_prefix="de ")
+
+
+@pytest.mark.parametrize(
+    ("declared_type", "raw_name"),
+    [
+        ("bien", "freebox pop"),  # famille réservée aux services
+        ("service", "aspirateur"),  # nom commun de bien
+        ("bien", "le téléphone"),  # déterminant ambigu
+        ("bien", "iphone rouge"),  # suffixe inconnu
+        ("bien", "   "),
+        ("bien", "machine inconnue xz"),
+    ],
+)
+def test_uncertain_names_are_left_to_the_model(
+    declared_type: DeclaredType, raw_name: str
+) -> None:
+    assert resolve_locally(declared_type, raw_name) is None
+
+
+@pytest.mark.parametrize(
+    ("article", "nom", "expected"),
+    [
+        ("un", "smartphone", "un smartphone"),
+        ("l'", "iPhone", "l’iPhone"),
+        ("l", "ordinateur", "l’ordinateur"),
+        ("", "Windows", "Windows"),
+    ],
+)
+def test_join_article_and_nom(article: str, nom: str, expected: str) -> None:
+    assert join_article_and_nom(article, nom) == expected
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from typing import Any
+
+import pytest
+
+from app.config import settings
+from app.core import ai_service
+from app.core.ai_service import (
+    ProductNormalizationRequest,
+    ProductNormalizationResponse,
+    ScalewayAIService,
+)
+from app.core.product_prefetch import ProductNormalizationPrefetcher
+
+
+class _FakeNormalizer:
+    def __init__(self, success: bool = True) -> None:
+        self.success = success
+        self.calls: list[str] = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    # Attribut de classe non lié : appelé sans l'instance du service
+    async def __call__(
+        self, request: ProductNormalizationRequest
+    ) -> ProductNormalizationResponse:
+        self.calls.append(request.raw_name)
+        await self.release.wait()
+        return ProductNormalizationResponse(
+            declared_type=request.declared_type,
+            raw_name=request.raw_name,
+            success=self.success,
+        )
+
+
+@pytest.fixture(autouse=True)
+def _settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    ai_service._product_name_cache.clear()
+    monkeypatch.setattr(settings, "PRODUCT_PREFETCH_ENABLED", True)
+    monkeypatch.setattr(settings, "PRODUCT_PREFETCH_MIN_INTERVAL_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "PRODUCT_PREFETCH_RETRY_AFTER_SECONDS", 60.0)
+
+
+@pytest.fixture
+def normalizer(monkeypatch: pytest.MonkeyPatch) -> _FakeNormalizer:
+    fake = _FakeNormalizer()
+    monkeypatch.setattr(ScalewayAIService, "normalize_product_name", fake)
+    return fake
+
+
+def _product(name: str, **extra: Any) -> dict[str, Any]:
+    return {"product_name": name, **extra}
+
+
+async def _drain(prefetcher: ProductNormalizationPrefetcher) -> None:
+    while prefetcher._tasks:
+        await asyncio.gather(*prefetcher._tasks.values())
+
+
+def test_unchanged_product_does_not_call_the_model(
+    normalizer: _FakeNormalizer,
+) -> None:
+    async def scenario() -> None:
+        prefetcher = ProductNormalizationPrefetcher()
+        draft_id = uuid.uuid4()
+        previous = _product("machine à café", step=1)
+        prefetcher.on_draft_change(draft_id, previous, {**previous, "step": 2})
+        # Même produit : espaces autour du nom, type « bien » devenu explicite
+        prefetcher.on_draft_change(
+            draft_id, previous, _product("  machine à café ", declared_type="bien")
+        )
+        await _drain(prefetcher)
+
+    asyncio.run(scenario())
+    assert normalizer.calls == []
+
+
+def test_typing_burst_is_debounced_to_the_last_value(
+    normalizer: _FakeNormalizer,
+) -> None:
+    async def scenario() -> None:
+        prefetcher = ProductNormalizationPrefetcher()
+        draft_id = uuid.uuid4()
+        previous: dict[str, Any] = {}
+        for name in ("ma", "machine", "machine à ca", "machine à café"):
+            current = _product(name)
+            prefetcher.on_draft_change(draft_id, previous, current)
+            previous = current
+        await _drain(prefetcher)
+
+    asyncio.run(scenario())
+    assert normalizer.calls == ["machine à café"]
+
+
+def test_same_name_in_flight_is_not_requested_twice(
+    normalizer: _FakeNormalizer,
+) -> None:
+    async def scenario() -> None:
+        prefetcher = ProductNormalizationPrefetcher()
+        normalizer.release.clear()
+        prefetcher.on_draft_change(uuid.uuid4(), {}, _product("machine à café"))
+        await asyncio.sleep(0.05)  # premier appel en cours
+        prefetcher.on_draft_change(uuid.uuid4(), {}, _product("Machine à café"))
+        await asyncio.sleep(0.05)
+        normalizer.release.set()
+        await _drain(prefetcher)
+
+    asyncio.run(scenario())
+    assert normalizer.calls == ["machine à café"]
+
+
+def test_failed_name_is_not_retried_before_the_delay(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    normalizer = _FakeNormalizer(success=False)
+    monkeypatch.setattr(ScalewayAIService, "normalize_product_name", normalizer)
+
+    async def scenario() -> None:
+        prefetcher = ProductNormalizationPrefetcher()
+        draft_id = uuid.uuid4()
+        prefetcher.on_draft_change(draft_id, {}, _product("machine à café"))
+        await _drain(prefetcher)
+        prefetcher.on_draft_change(
+            draft_id, _product("machine"), _product("machine à café")
+        )
+        await _drain(prefetcher)
+
+    asyncio.run(scenario())
+    assert normalizer.calls == ["machine à café"]
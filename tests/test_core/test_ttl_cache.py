@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import pytest
+
+from app.utils import ttl_cache
+from app.utils.ttl_cache import TTLCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr(ttl_cache.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def test_entries_expire_after_ttl(clock: _Clock) -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl_seconds=60)
+    cache.set("a", 1)
+    clock.now += 59
+    assert cache.get("a") == 1
+    clock.now += 2
+    assert cache.get("a") is None
+    assert "a" not in cache
+    assert len(cache) == 0
+
+
+def test_lru_eviction_keeps_recently_read(clock: _Clock) -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # « b » devient le moins récent
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_set_refreshes_expiry(clock: _Clock) -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl_seconds=60)
+    cache.set("a", 1)
+    clock.now += 50
+    cache.set("a", 2)
+    clock.now += 50
+    assert cache.get("a") == 2
+
+
+def test_zero_size_disables_cache(clock: _Clock) -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=0, ttl_seconds=60)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+def test_pop_and_clear(clock: _Clock) -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.pop("a") == 1
+    assert cache.pop("a") is None
+    cache.clear()
+    assert len(cache) == 0
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+import pytest
+
+from app.config import settings
+from app.core import ai_service
+from app.core.ai_service import (
+    ProductNormalizationRequest,
+    ScalewayAIService,
+    is_product_name_cached,
+)
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache() -> None:
+    ai_service._product_name_cache.clear()
+
+
+@pytest.fixture
+def service(monkeypatch: pytest.MonkeyPatch) -> ScalewayAIService:
+    monkeypatch.setattr(settings, "PRODUCT_NORMALIZATION_LOCAL_RULES", True)
+    monkeypatch.setattr(settings, "AI_STRUCTURED_OUTPUT", True)
+    service = ScalewayAIService()
+    service.api_key = "test-key"
+    return service
+
+
+def _model_reply(group_noun: str, prefix: str) -> dict[str, Any]:
+    content = json.dumps({"group_noun": group_noun, "acquisition_prefix": prefix})
+    return {"choices": [{"message": {"content": content}}]}
+
+
+def test_local_result_is_cached(
+    service: ScalewayAIService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    request = ProductNormalizationRequest(declared_type="bien", raw_name="iphone 13")
+    first = asyncio.run(service.normalize_product_name(request))
+    assert first.success and first.group_noun == "un smartphone iPhone 13"
+    assert is_product_name_cached("bien", "  IPHONE 13 ")
+
+    def _fail(*_: Any) -> None:
+        raise AssertionError("résolu depuis le cache, sans règles locales")
+
+    monkeypatch.setattr(ai_service, "resolve_locally", _fail)
+    assert asyncio.run(service.normalize_product_name(request)) == first
+
+
+def test_local_result_has_model_path_shape(
+    service: ScalewayAIService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    request = ProductNormalizationRequest(declared_type="bien", raw_name="iphone 13")
+    local = asyncio.run(service.normalize_product_name(request))
+
+    ai_service._product_name_cache.clear()
+    monkeypatch.setattr(settings, "PRODUCT_NORMALIZATION_LOCAL_RULES", False)
+
+    async def _chat_completion(*_: Any, **__: Any) -> dict[str, Any]:
+        return _model_reply("un smartphone iPhone 13", "d’")
+
+    monkeypatch.setattr(service, "_chat_completion", _chat_completion)
+    from_model = asyncio.run(service.normalize_product_name(request))
+
+    assert local.model_dump() == from_model.model_dump()
+
+
+@pytest.mark.parametrize(
+    "ai_raw",
+    [
+        '{"group_noun":"un smartphone iPhone 13","acquisition_prefix":"d’"}',
+        '```json\n{"group_noun":"un smartphone iPhone 13",'
+        '"acquisition_prefix":"d\'"}\n```',
+        'Voici : {"group_noun":"un smartphone iPhone 13.",'
+        '"acquisition_prefix":"d’"} !',
+    ],
+)
+def test_parse_product_output_accepts_wrapped_json(ai_raw: str) -> None:
+    parsed = ScalewayAIService._parse_product_output(ai_raw)
+    assert parsed is not None
+    assert parsed.group_noun == "un smartphone iPhone 13"
+    assert parsed.acquisition_prefix == "d’"
+
+
+def test_parse_product_output_pads_prefix() -> None:
+    parsed = ScalewayAIService._parse_product_output(
+        '{"group_noun":"Windows Familial","acquisition_prefix":"de"}'
+    )
+    assert parsed is not None and parsed.acquisition_prefix == "de "
+
+
+@pytest.mark.parametrize(
+    "ai_raw",
+    [
+        "un smartphone iPhone 13",
+        '{"group_noun":"un smartphone iPhone 13"',
+        '{"group_noun":"","acquisition_prefix":"d’"}',
+        '{"group_noun":"un smartphone","acquisition_prefix":"pour "}',
+        '{"article":"un","nom":"smartphone"}',
+    ],
+)
+def test_parse_product_output_rejects_invalid_output(ai_raw: str) -> None:
+    assert ScalewayAIService._parse_product_output(ai_raw) is None
+
+
+def _scripted_model(
+    service: ScalewayAIService, monkeypatch: pytest.MonkeyPatch, *replies: str
+) -> list[list[dict[str, str]]]:
+    """Le modèle renvoie `replies` dans l'ordre ; renvoie les messages reçus."""
+    calls: list[list[dict[str, str]]] = []
+
+    async def _chat_completion(
+        _operation: str, messages: list[dict[str, str]], **__: Any
+    ) -> dict[str, Any]:
+        calls.append(messages)
+        return {"choices": [{"message": {"content": replies[len(calls) - 1]}}]}
+
+    monkeypatch.setattr(settings, "PRODUCT_NORMALIZATION_LOCAL_RULES", False)
+    monkeypatch.setattr(service, "_chat_completion", _chat_completion)
+    return calls
+
+
+def test_unparseable_output_is_repaired_once(
+    service: ScalewayAIService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls = _scripted_model(
+        service,
+        monkeypatch,
+        "un smartphone iPhone 13",
+        '{"group_noun":"un smartphone iPhone 13","acquisition_prefix":"d’"}',
+    )
+    request = ProductNormalizationRequest(declared_type="bien", raw_name="iphone 13")
+    result = asyncio.run(service.normalize_product_name(request))
+
+    assert result.success and result.group_noun == "un smartphone iPhone 13"
+    assert len(calls) == 2
+    # La sortie fautive est renvoyée au modèle avec la consigne de réparation
+    assert calls[1][-2] == {"role": "assistant", "content": "un smartphone iPhone 13"}
+    assert is_product_name_cached("bien", "iphone 13")
+
+
+def test_failed_repair_returns_an_error_without_caching(
+    service: ScalewayAIService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls = _scripted_model(service, monkeypatch, "désolé", "toujours pas")
+    request = ProductNormalizationRequest(declared_type="bien", raw_name="iphone 13")
+    result = asyncio.run(service.normalize_product_name(request))
+
+    assert not result.success and result.error
+    assert len(calls) == 2
+    assert not is_product_name_cached("bien", "iphone 13")
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from app.api.v1.endpoints import letters
+from app.config import settings
+from app.core import ai_service
+from app.core.ai_service import ReformulationRequest, ScalewayAIService
+
+STORED_TEXT = "Mon ordinateur portable chauffe après dix minutes d'utilisation"
+STORED_REFORMULATION = "L'ordinateur portable chauffe après dix minutes d'utilisation."
+
+
+@pytest.fixture
+def calls(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Textes envoyés au modèle ; chaque réponse est propre au texte reçu."""
+    ai_service._reformulation_index.clear()
+    monkeypatch.setattr(settings, "AI_REFORMULATION_DEDUP_ENABLED", True)
+    monkeypatch.setattr(settings, "AI_REFORMULATION_DEDUP_THRESHOLD", 0.95)
+    sent: list[str] = []
+
+    async def _chat_completion(
+        self: ScalewayAIService,
+        _operation: str,
+        messages: list[dict[str, str]],
+        **__: Any,
+    ) -> dict[str, Any]:
+        sent.append(messages[-1]["content"])
+        content = STORED_REFORMULATION if len(sent) == 1 else f"Réponse {len(sent)}."
+        return {"choices": [{"message": {"content": content}}]}
+
+    monkeypatch.setattr(ScalewayAIService, "_chat_completion", _chat_completion)
+    return sent
+
+
+def _reformulate(text: str) -> ai_service.ReformulationResponse:
+    service = ScalewayAIService()
+    service.api_key = "test-key"
+    return asyncio.run(service.reformulate_text(ReformulationRequest(text=text)))
+
+
+def test_same_words_are_served_without_model_call(calls: list[str]) -> None:
+    first = _reformulate(STORED_TEXT)
+    assert first.reformulated_text == STORED_REFORMULATION and not first.cached
+
+    again = _reformulate(
+        "  mon ordinateur portable chauffe après dix minutes d’utilisation !"
+    )
+    assert again.cached and again.reformulated_text == STORED_REFORMULATION
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        # Négation : proche en k-grammes, sens opposé
+        "Mon ordinateur portable ne chauffe pas après dix minutes d'utilisation",
+        # Un mot changé : similarité élevée, d'autres faits
+        "Mon ordinateur portable chauffe après deux minutes d'utilisation",
+        "Mon ordinateur portable chauffe avant dix minutes d'utilisation",
+        # Nombre différent
+        "Mon ordinateur portable chauffe après 10 minutes d'utilisation",
+    ],
+)
+def test_other_texts_never_receive_the_stored_reformulation(
+    calls: list[str], text: str
+) -> None:
+    _reformulate(STORED_TEXT)
+    result = _reformulate(text)
+    assert not result.cached
+    assert result.reformulated_text != STORED_REFORMULATION
+    assert len(calls) == 2
+
+
+def test_no_endpoint_exposes_stored_reformulations() -> None:
+    routes = letters.router.routes
+    paths = {route.path for route in routes}  # type: ignore[attr-defined]
+    assert "/reformulate-text" in paths
+    assert not any("suggestion" in path for path in paths)
+    assert not hasattr(ScalewayAIService, "suggest_reformulation")